@@ -0,0 +1,264 @@
+# analytics/compact_forest.py
+"""
+Array-based export of a fitted RandomForestRegressor, and a NumPy
+predictor over it.
+
+A joblib'd forest is 200 pickled tree objects that every API worker
+unpickles into its own memory. export_forest flattens all trees into a
+handful of node arrays saved as .npy files; CompactForest.load maps them
+read-only (np.load(mmap_mode="r")), so loading is near-instant and every
+worker on the host shares one copy through the page cache.
+
+    models/lbw_model.forest/
+        CURRENT                 name of the version folder in use
+        <version>/feature.npy   split feature per node (int32)
+                  threshold.npy split threshold (float64)
+                  left.npy      left child, -1 at leaves (int32, global node id)
+                  right.npy     right child
+                  missing_left.npy  NaNs go left at this split (bool)
+                  value.npy     node mean (float64)
+                  roots.npy     root node id of each tree (int32)
+                  meta.json     feature names, tree count, source model version
+
+Each export goes to a fresh version folder and CURRENT is switched
+atomically afterwards, so a worker still mapping the previous arrays is
+never handed a file that is being rewritten.
+
+CompactForest.predict follows sklearn's arithmetic exactly -- inputs cast
+to float32, `x <= threshold` against the float64 thresholds, per-tree
+leaf values summed tree by tree in order, then divided by the tree count
+-- so its outputs are bit-for-bit those of model.predict.
+CompactForest.contributions splits each prediction into per-feature
+tree-path contributions on the same traversal (analytics/explain.py).
+
+The NumPy walk wins for single rows and micro-batches; sklearn's per-tree
+traversal wins for large batches (for a 200-tree forest they cross at
+about 300 rows). RoutedForest serves both: small inputs on the arrays,
+large ones on the sklearn forest, with the same predictions either way.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots")
+CURRENT_NAME = "CURRENT"
+
+
+def compact_path(model_path) -> Path:
+    """models/lbw_model.joblib -> models/lbw_model.forest"""
+    return Path(model_path).with_suffix(".forest")
+
+
+def forest_arrays(model) -> dict:
+    """Flatten model.estimators_ into global node arrays (see module docstring)."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be exported.")
+
+    parts: dict = {name: [] for name in ARRAYS if name != "roots"}
+    roots = []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        # Leaves get feature 0 so gathers stay in bounds; they are never compared.
+        parts["feature"].append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        parts["threshold"].append(tree.threshold.astype(np.float64))
+        parts["left"].append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        parts["right"].append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        parts["missing_left"].append(
+            np.zeros(n, dtype=bool) if missing_left is None else np.asarray(missing_left, dtype=bool)
+        )
+        parts["value"].append(tree.value[:, 0, 0].astype(np.float64))
+        offset += n
+
+    arrays = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+    arrays["roots"] = np.asarray(roots, dtype=np.int32)
+    return arrays
+
+
+def _meta(model, source: str) -> dict:
+    names = getattr(model, "feature_names_in_", None)
+    return {
+        "source": source,
+        "n_trees": len(model.estimators_),
+        "n_features": int(model.n_features_in_),
+        "feature_names": None if names is None else [str(n) for n in names],
+    }
+
+
+def export_forest(model, folder, source: str) -> Path:
+    """
+    Write model's arrays to folder/<source>/ and point CURRENT at them.
+    `source` identifies the model they came from (the joblib file's
+    version), and is what readers compare to decide if the export is
+    current. Older version folders are removed. Returns the version folder.
+    """
+    folder = Path(folder)
+    version_dir = folder / source
+    tmp_dir = folder / f"{source}.partial"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, array in forest_arrays(model).items():
+        np.save(tmp_dir / f"{name}.npy", array)
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as fh:
+        json.dump(_meta(model, source), fh, indent=2)
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+
+    pointer = folder / f"{CURRENT_NAME}.tmp"
+    pointer.write_text(source, encoding="utf-8")
+    os.replace(pointer, folder / CURRENT_NAME)
+
+    # Unlinking is safe for workers still mapping an old version: their
+    # mappings stay valid until they drop them.
+    for old in folder.iterdir():
+        if old.is_dir() and old.name != source:
+            shutil.rmtree(old, ignore_errors=True)
+    return version_dir
+
+
+def current_export(folder) -> str | None:
+    """Source version of the export CURRENT points to, or None if there is none."""
+    try:
+        return (Path(folder) / CURRENT_NAME).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+class CompactForest:
+    def __init__(self, arrays: dict, meta: dict):
+        self.arrays = arrays  # the ARRAYS above, by name
+        self.meta = meta
+        self.n_estimators = meta["n_trees"]
+        self.n_features_in_ = meta["n_features"]
+        names = meta.get("feature_names")
+        if names is not None:
+            self.feature_names_in_ = np.asarray(names, dtype=object)
+
+    @classmethod
+    def from_model(cls, model, source: str = "in-memory") -> "CompactForest":
+        return cls(forest_arrays(model), _meta(model, source))
+
+    @classmethod
+    def load(cls, folder, mmap: bool = True) -> "CompactForest":
+        """Load the CURRENT export under folder (memory-mapped unless mmap=False)."""
+        source = current_export(folder)
+        if source is None:
+            raise FileNotFoundError(f"No compact forest export under {folder}")
+        version_dir = Path(folder) / source
+        with open(version_dir / "meta.json", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        arrays = {
+            name: np.load(version_dir / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in ARRAYS
+        }
+        return cls(arrays, meta)
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            names = self.meta.get("feature_names")
+            if names is not None:
+                missing = [n for n in names if n not in X.columns]
+                if missing:
+                    raise ValueError(f"Missing feature columns: {missing}")
+                X = X[names]
+            X = X.to_numpy()
+        X = np.asarray(X, dtype=np.float32)  # sklearn trees split on float32 inputs
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2-D input with {self.n_features_in_} features, got shape {X.shape}")
+        return X
+
+    def _descend(self, X: np.ndarray, visit=None) -> np.ndarray:
+        """
+        Walk every (sample, tree) pair from its root to its leaf, one level
+        per step; visit(pairs, parents, children) sees each step's moves
+        (pair i is sample i // n_trees, tree i % n_trees). Returns the
+        leaf id of each pair.
+        """
+        feature, threshold = self.arrays["feature"], self.arrays["threshold"]
+        left, right = self.arrays["left"], self.arrays["right"]
+        missing_left = self.arrays["missing_left"]
+
+        n_samples, n_features = X.shape
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        nodes = np.tile(self.arrays["roots"], n_samples)
+        row_start = np.repeat(np.arange(n_samples, dtype=np.intp) * n_features, self.n_estimators)
+        # Walk only the (sample, tree) pairs still at an internal node.
+        active = np.flatnonzero(left[nodes] != -1)
+        while active.size:
+            at = nodes[active]
+            x = flat[row_start[active] + feature[at]]
+            go_left = x <= threshold[at]
+            if has_nan:
+                go_left |= np.isnan(x) & missing_left[at]
+            step = np.where(go_left, left[at], right[at])
+            if visit is not None:
+                visit(active, at, step)
+            nodes[active] = step
+            active = active[left[step] != -1]
+        return nodes
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node id reached in each tree: (n_samples, n_trees)."""
+        X = self._matrix(X)
+        return self._descend(X).reshape(len(X), self.n_estimators)
+
+    def contributions(self, X) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Tree-path (Saabas) attributions: (bias, contributions), bias of
+        shape (n_samples,) and contributions (n_samples, n_features).
+
+        Every split on a sample's path moves the prediction from the
+        parent's value to the child's; that change is credited to the
+        split feature and averaged over the trees. bias is the mean root
+        value, so bias + contributions.sum(axis=1) is predict(X) up to
+        float rounding. All samples and trees go in the same pass as apply.
+        """
+        X = self._matrix(X)
+        n_samples, n_features = X.shape
+        value, feature = self.arrays["value"], self.arrays["feature"]
+        totals = np.zeros(n_samples * n_features, dtype=np.float64)
+
+        def credit(pairs, parents, children):
+            cells = (pairs // self.n_estimators) * n_features + feature[parents]
+            totals[:] += np.bincount(cells, weights=value[children] - value[parents], minlength=totals.size)
+
+        self._descend(X, credit)
+        bias = np.full(n_samples, value[self.arrays["roots"]].mean())
+        return bias, totals.reshape(n_samples, n_features) / self.n_estimators
+
+    def predict(self, X) -> np.ndarray:
+        leaf_values = self.arrays["value"][self.apply(X)]
+        # Same accumulation order as RandomForestRegressor.predict.
+        y = np.zeros(len(leaf_values), dtype=np.float64)
+        for t in range(self.n_estimators):
+            y += leaf_values[:, t]
+        y /= self.n_estimators
+        return y
+
+
+class RoutedForest(CompactForest):
+    """
+    A CompactForest that hands inputs of more than max_rows rows to the
+    sklearn forest it was exported from (see the module docstring).
+    """
+
+    def __init__(self, compact: CompactForest, model, max_rows: int):
+        super().__init__(compact.arrays, compact.meta)
+        self.model = model
+        self.max_rows = max_rows
+
+    def predict(self, X) -> np.ndarray:
+        if len(X) > self.max_rows:
+            return self.model.predict(X)
+        return super().predict(X)
@@ -0,0 +1,96 @@
+# analytics/explain.py
+"""
+Per-district explanations of the forests' predictions: how much each
+feature pushed a district's prediction above or below the forest's
+baseline (tree-path / Saabas contributions, CompactForest.contributions).
+
+All rows of a model are explained in one vectorized pass over its node
+arrays. models_runner saves the result for the current cube next to the
+prediction table, tagged with the model versions it belongs to:
+
+models/district_explanations.<ext>   District, Target, Feature, Value, Contribution, Bias, Prediction
+models/district_explanations.json    which cube + model files produced it
+
+The API serves that table while it matches the loaded models and cube,
+and otherwise computes the same table once when it loads them.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.compact_forest import CompactForest
+from analytics.predictions import load_versioned_table, save_versioned_table
+
+EXPLANATIONS_NAME = "district_explanations"
+EXPLANATION_COLUMNS = ["District", "Target", "Feature", "Value", "Contribution", "Bias", "Prediction"]
+
+
+def explain_rows(model, X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Long table of X's attributions under model (a fitted forest or a
+    CompactForest): one row per (row of X, feature) with Row (X's index
+    label), Feature, Value, Contribution, Bias and Prediction.
+    """
+    forest = model if isinstance(model, CompactForest) else CompactForest.from_model(model)
+    features = list(forest.feature_names_in_) if hasattr(forest, "feature_names_in_") else list(X.columns)
+    X = X[features]
+    bias, contributions = forest.contributions(X)
+    n_rows, n_features = contributions.shape
+    return pd.DataFrame({
+        "Row": X.index.repeat(n_features),
+        "Feature": features * n_rows,
+        "Value": X.to_numpy(dtype=float).ravel(),
+        "Contribution": contributions.ravel(),
+        "Bias": bias.repeat(n_features),
+        "Prediction": (bias + contributions.sum(axis=1)).repeat(n_features),
+    })
+
+
+def explanation_table(districts: pd.Series, explained: dict) -> pd.DataFrame:
+    """
+    EXPLANATION_COLUMNS table for {target name: (model, X)}, X's rows
+    labelled by district through districts (aligned on X's index).
+    """
+    parts = []
+    for target, (model, X) in explained.items():
+        rows = explain_rows(model, X)
+        rows.insert(0, "Target", target)
+        rows.insert(0, "District", districts.loc[rows.pop("Row")].to_numpy())
+        parts.append(rows)
+    if not parts:
+        return pd.DataFrame(columns=EXPLANATION_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[EXPLANATION_COLUMNS]
+
+
+def district_explanations(table: pd.DataFrame) -> dict:
+    """
+    {district: {target: {"prediction", "bias", "contributions": [{"feature",
+    "value", "contribution"}, ...]}}}, contributions largest first by size.
+    """
+    table = table.dropna(subset=["District"])
+    table = table.reindex(table["Contribution"].abs().sort_values(ascending=False, kind="stable").index)
+    result: dict = {}
+    for (district, target), group in table.groupby(["District", "Target"], sort=False):
+        result.setdefault(district, {})[target] = {
+            "prediction": round(float(group["Prediction"].iloc[0]), 4),
+            "bias": round(float(group["Bias"].iloc[0]), 4),
+            "contributions": [
+                {"feature": f, "value": None if pd.isna(v) else float(v), "contribution": round(float(c), 4)}
+                for f, v, c in zip(group["Feature"], group["Value"], group["Contribution"])
+            ],
+        }
+    return result
+
+
+def save_explanation_table(table: pd.DataFrame, folder, cube_name: str, model_paths: dict,
+                           fmt: str | None = None) -> Path:
+    """
+    Write table (see explanation_table) and the metadata naming cube_name
+    and the versions of model_paths ({"lbw": path, ...}). Returns the table path.
+    """
+    return save_versioned_table(table, folder, EXPLANATIONS_NAME, cube_name, model_paths, fmt)
+
+
+def load_explanation_table(folder) -> tuple[pd.DataFrame, dict] | None:
+    """(table, metadata) as saved by save_explanation_table, or None if there is none."""
+    return load_versioned_table(folder, EXPLANATIONS_NAME)
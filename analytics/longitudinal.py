@@ -0,0 +1,234 @@
+# analytics/longitudinal.py
+"""
+Longitudinal training: one forest per target over every monthly cube in
+warehouse/cubes (district_cube_<month>.*), updated month by month instead
+of retrained from scratch on the latest cube.
+
+Each month contributes its own block of trees (TREES_PER_MONTH) fitted
+on that month's rows only, seeded from the month tag. A monthly refresh
+fits trees for the new month(s) and appends them to the saved forest, so
+its cost tracks the new data, not the history. Once more than
+WINDOW_MONTHS months are in the forest (0: no limit), the oldest month's
+trees are dropped, keeping model size and predict time bounded.
+
+Since a month's trees depend only on that month's data, updating month by
+month gives exactly the forest a rebuild over the same months would.
+models/longitudinal.json records, per target, which months (and cube file
+digests) the saved forest holds; the forest is rebuilt over the window
+when that record no longer matches (a past cube was rewritten, a month
+older than the newest trained one appeared, the features or trees per
+month changed, or the model file was replaced by a regular run).
+
+Cubes are read through read_cube, so the warehouse's snake_case cubes
+(cubes/run_cube.py) train under the targets' column names, as do cubes
+that already use them.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+
+from analytics.models import MIN_TRAINING_ROWS, TARGETS, Target, from_warehouse_cube
+from analytics.predictions import model_version
+from analytics.training import TRAIN_CORES, plan_cores
+from etl.manifest import file_digest
+from utils.warehouse import list_tables, read_table, write_json
+
+CUBE_PREFIX = "district_cube_"
+CUBE_DIR = Path(os.getenv("WAREHOUSE_DIR", "warehouse")) / "cubes"
+TREES_PER_MONTH = int(os.getenv("LONGITUDINAL_TREES_PER_MONTH", "50"))
+WINDOW_MONTHS = int(os.getenv("LONGITUDINAL_WINDOW_MONTHS", "24"))
+STATE_NAME = "longitudinal.json"
+
+
+class MonthlyUpdate(NamedTuple):
+    target: Target
+    model: object
+    X: pd.DataFrame     # the latest month's feature rows
+    state: dict         # this target's entry for longitudinal.json (minus "model")
+    added: list         # months whose trees were fitted this run
+    dropped: list       # months whose trees aged out of the window
+    rebuilt: bool
+
+
+def cube_months(folder=CUBE_DIR) -> dict:
+    """{month tag: cube path} for every district_cube_* table in folder, oldest first."""
+    folder = Path(folder)
+    if not folder.is_dir():
+        return {}
+    return {
+        name[len(CUBE_PREFIX):]: path
+        for name, path in list_tables(folder).items()
+        if name.startswith(CUBE_PREFIX)
+    }
+
+
+def read_cube(path, columns: list | None = None) -> pd.DataFrame:
+    """The cube at path under the targets' column names (see from_warehouse_cube)."""
+    cube = from_warehouse_cube(read_table(path))
+    return cube if columns is None else cube[columns]
+
+
+def stack_cubes(folder=CUBE_DIR, months: list | None = None, columns: list | None = None) -> pd.DataFrame:
+    """
+    The monthly cubes (default: all, see read_cube) stacked into one frame
+    with a Month column, oldest month first. columns selects from each cube.
+    """
+    available = cube_months(folder)
+    frames = []
+    for month in (months if months is not None else list(available)):
+        df = read_cube(available[month], columns=columns)
+        frames.append(df.assign(Month=month))
+    if not frames:
+        raise FileNotFoundError(f"No {CUBE_PREFIX}* tables in {folder}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_state(model_dir) -> dict:
+    try:
+        with open(Path(model_dir) / STATE_NAME, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(model_dir, state: dict) -> Path:
+    return write_json(Path(model_dir) / STATE_NAME, state)
+
+
+def _month_seed(month: str) -> int:
+    return int(hashlib.sha256(f"42:{month}".encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _month_data(path: Path, features: list, target_col: str) -> tuple[pd.DataFrame, pd.Series]:
+    """A month's complete (features, target) rows; none if the cube lacks one of the columns."""
+    df = read_cube(path)
+    columns = features + [target_col]
+    if any(c not in df.columns for c in columns):
+        df = pd.DataFrame(columns=columns)
+    data = df[columns].dropna()
+    return data[features], data[target_col]
+
+
+def _still_valid(entry: dict | None, features: list, trees_per_month: int, window: int,
+                 model_path: Path, months: dict, digests: dict) -> bool:
+    """Whether the saved forest can be extended rather than rebuilt."""
+    if not entry or not entry.get("months"):
+        return False
+    if entry.get("features") != features or entry.get("trees_per_month") != trees_per_month:
+        return False
+    if entry.get("model") != model_version(model_path):
+        return False
+    if any(digests.get(m["month"]) != m["digest"] for m in entry["months"]):
+        return False
+    trained = [m["month"] for m in entry["months"]]
+    untrained = [month for month in months if month not in trained]
+    if any(trained[0] < month < trained[-1] for month in untrained):
+        return False
+    # Older months are only ignorable once they have aged out of a full window.
+    return not any(month < trained[0] for month in untrained) or bool(window and len(trained) >= window)
+
+
+def update_target(months: dict, target: Target, model_path, entry: dict | None = None,
+                  trees_per_month: int = TREES_PER_MONTH, window: int = WINDOW_MONTHS,
+                  n_jobs: int | None = None) -> MonthlyUpdate:
+    """
+    Bring target's longitudinal forest at model_path up to date with
+    months ({month: cube path}, see cube_months), given its previous
+    longitudinal.json entry. Only months not yet in the forest (and the
+    latest, for its feature rows) are read and fitted. Doesn't write anything; the caller saves the model and
+    then the returned state.
+    """
+    model_path = Path(model_path)
+    latest = list(months)[-1]
+    latest_cube = read_cube(months[latest])
+    if target.target_col not in latest_cube.columns:
+        raise ValueError(f"{months[latest].name} has no {target.target_col} column to train {target.name} on.")
+    features = [c for c in target.features if c in latest_cube.columns]
+    digests = {month: file_digest(path) for month, path in months.items()}
+
+    rebuilt = not _still_valid(entry, features, trees_per_month, window, model_path, months, digests)
+    if rebuilt:
+        model, blocks = None, []
+        todo = list(months)[-window:] if window else list(months)
+    else:
+        model, blocks = joblib.load(model_path), list((entry or {})["months"])
+        todo = [m for m in months if m > blocks[-1]["month"]]
+
+    added = []
+    for month in todo:
+        X, y = _month_data(months[month], features, target.target_col)
+        if len(X) < MIN_TRAINING_ROWS:
+            print(f"[LONGITUDINAL] {target.name}: {month} has {len(X)} usable rows, no trees added")
+            blocks.append({"month": month, "digest": digests[month], "rows": len(X), "trees": 0})
+            continue
+        scores = None
+        if model is not None:
+            # Out-of-time check: the forest so far, on a month it hasn't seen.
+            scores = {"month": month, "mae": float(mean_absolute_error(y, model.predict(X)))}
+            print(f"[LONGITUDINAL] {target.name}: MAE on unseen {month}: {scores['mae']:.3f}")
+
+        forest = RandomForestRegressor(n_estimators=trees_per_month, random_state=_month_seed(month),
+                                       n_jobs=n_jobs)
+        forest.fit(X, y)
+        if model is not None:
+            forest.estimators_ = model.estimators_ + forest.estimators_
+        forest.set_params(n_estimators=len(forest.estimators_), n_jobs=None)
+        if scores is not None:
+            forest.holdout_scores_ = scores  # as _train_model keeps its test-split scores
+        model = forest
+        blocks.append({"month": month, "digest": digests[month], "rows": len(X), "trees": trees_per_month})
+        added.append(month)
+
+    dropped = []
+    while window and len(blocks) > window:
+        oldest = blocks.pop(0)
+        dropped.append(oldest["month"])
+        if oldest["trees"] and model is not None:
+            model.estimators_ = model.estimators_[oldest["trees"]:]
+            model.set_params(n_estimators=len(model.estimators_))
+    if model is None or not model.estimators_:
+        raise ValueError(f"Insufficient data to train model for {target.target_col}: "
+                         f"no month in {list(months)} has {MIN_TRAINING_ROWS} usable rows.")
+
+    X_latest = latest_cube[features].dropna()
+    print(f"[LONGITUDINAL] {target.name}: {'rebuilt' if rebuilt else 'updated'}, "
+          f"+{len(added)} month(s), -{len(dropped)}, {len(model.estimators_)} trees over {len(blocks)} month(s)")
+    state = {"features": features, "trees_per_month": trees_per_month, "months": blocks}
+    return MonthlyUpdate(target, model, X_latest, state, added, dropped, rebuilt)
+
+
+def update_targets(folder=CUBE_DIR, model_dir=Path("models"), names: list | None = None,
+                   cores: int = TRAIN_CORES, trees_per_month: int = TREES_PER_MONTH,
+                   window: int = WINDOW_MONTHS, model_paths: dict | None = None) -> dict:
+    """
+    update_target for the named targets (default: all registered), in
+    parallel within a budget of cores as train_targets does. Each forest
+    is extended from model_paths[name] (default: model_dir/<model_name>.joblib);
+    the state is read from model_dir. Returns {name: MonthlyUpdate} in
+    registration order.
+    """
+    months = cube_months(folder)
+    if not months:
+        raise FileNotFoundError(f"No {CUBE_PREFIX}* tables in {folder}")
+    state = load_state(model_dir)
+    targets = [TARGETS[name] for name in (names if names is not None else list(TARGETS))]
+    processes, n_jobs = plan_cores(len(targets), cores)
+
+    def args(t: Target) -> tuple:
+        path = (model_paths or {}).get(t.name) or Path(model_dir) / f"{t.model_name}.joblib"
+        return (months, t, path, state.get(t.name),
+                trees_per_month, window, n_jobs)
+
+    if processes == 1:
+        return {t.name: update_target(*args(t)) for t in targets}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {t.name: pool.submit(update_target, *args(t)) for t in targets}
+        return {name: future.result() for name, future in futures.items()}
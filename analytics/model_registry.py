@@ -0,0 +1,163 @@
+# analytics/model_registry.py
+"""
+Local, content-addressed model registry.
+
+    models/registry/
+        index.json                  per model name: versions + aliases
+        objects/<sha256>.joblib     the pickled model, named by its content hash
+        objects/<sha256>.forest/    its compact export (analytics/compact_forest.py)
+
+A version is the first 16 hex digits of the object's sha256 -- the same
+id model_version() gives for the file, so prediction tables, caches and
+the API all agree on it. Registering a model whose bytes are already
+stored adds no new object. Each version carries metadata: the training
+cube and its hash, features, metrics, training time, and the key of its
+training inputs (input_key), so a run with identical inputs can reuse the
+registered model instead of training again.
+
+Aliases ("production", ...) name one version per model; models_runner
+points "production" at what it just trained and the API serves whatever
+"production" points at. index.json is replaced atomically and re-read
+only when its mtime/size change, so lookups are dict reads.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+from analytics.compact_forest import compact_path, export_forest
+from etl.manifest import file_digest
+from utils.warehouse import write_json
+
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", "models/registry"))
+INDEX_NAME = "index.json"
+PRODUCTION = "production"
+
+
+def input_key(**parts) -> str:
+    """Hash of everything that determines a trained model (cube hash, features, parameters, ...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ModelRegistry:
+    def __init__(self, root: Path | str = REGISTRY_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self._lock = threading.Lock()
+        self._index: dict = {"models": {}}
+        self._index_stat: tuple | None = None
+        self._loaded: dict = {}  # version -> model, for load()
+
+    # -- index -----------------------------------------------------------
+    def _read_index(self) -> dict:
+        path = self.root / INDEX_NAME
+        try:
+            st = path.stat()
+        except OSError:
+            return {"models": {}}
+        stat = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stat != self._index_stat:
+                with open(path, encoding="utf-8") as fh:
+                    self._index = json.load(fh)
+                self._index_stat = stat
+            return self._index
+
+    def _write_index(self, index: dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_json(self.root / INDEX_NAME, index)
+
+    def _entry(self, name: str) -> dict:
+        return self._read_index()["models"].get(name, {"versions": {}, "aliases": {}})
+
+    # -- lookups ---------------------------------------------------------
+    def versions(self, name: str) -> dict:
+        """{version: metadata} for name, oldest first."""
+        return dict(self._entry(name)["versions"])
+
+    def resolve(self, name: str, ref: str = PRODUCTION) -> str | None:
+        """Version for ref (an alias, a version, or a unique version prefix); None if unknown."""
+        entry = self._entry(name)
+        if ref in entry["aliases"]:
+            return entry["aliases"][ref]
+        if ref in entry["versions"]:
+            return ref
+        matches = [v for v in entry["versions"] if v.startswith(ref)] if ref else []
+        return matches[0] if len(matches) == 1 else None
+
+    def metadata(self, name: str, ref: str = PRODUCTION) -> dict | None:
+        version = self.resolve(name, ref)
+        return None if version is None else self._entry(name)["versions"][version]
+
+    def path(self, name: str, ref: str = PRODUCTION, default: Path | None = None) -> Path | None:
+        """Object file of ref, or default when the registry has no such version."""
+        meta = self.metadata(name, ref)
+        return default if meta is None else self.root / meta["object"]
+
+    def object_path(self, name: str, version: str) -> Path:
+        meta = self.metadata(name, version)
+        if meta is None:
+            raise KeyError(f"No {name} version {version} in the registry at {self.root}")
+        return self.root / meta["object"]
+
+    def find(self, name: str, key: str) -> str | None:
+        """Newest version of name trained from inputs with this input_key."""
+        for version, meta in reversed(list(self._entry(name)["versions"].items())):
+            if meta.get("input_key") == key and (self.root / meta["object"]).exists():
+                return version
+        return None
+
+    def load(self, name: str, ref: str = PRODUCTION):
+        """The model for ref; a version already loaded by this registry is not unpickled again."""
+        version = self.resolve(name, ref)
+        if version is None:
+            raise KeyError(f"No {name} model '{ref}' in the registry at {self.root}")
+        if version not in self._loaded:
+            self._loaded[version] = joblib.load(self.object_path(name, version))
+        return self._loaded[version]
+
+    # -- writes ----------------------------------------------------------
+    def register(self, name: str, model, metadata: dict | None = None) -> str:
+        """
+        Store model (once per distinct content) with its compact export and
+        record it as a version of name. Returns the version. Registering
+        the same bytes again keeps the first registration's metadata.
+        """
+        self.objects.mkdir(parents=True, exist_ok=True)
+        tmp = self.objects / f".{name}.{os.getpid()}.partial"
+        joblib.dump(model, tmp)
+        sha = file_digest(tmp)
+        version = sha[:16]
+        obj = self.objects / f"{sha}.joblib"
+        if obj.exists():
+            tmp.unlink()
+        else:
+            os.replace(tmp, obj)
+        if not (compact_path(obj) / version).is_dir():
+            export_forest(model, compact_path(obj), version)
+
+        index = self._read_index()
+        entry = index["models"].setdefault(name, {"versions": {}, "aliases": {}})
+        if version not in entry["versions"]:
+            entry["versions"][version] = {
+                **(metadata or {}),
+                "object": obj.relative_to(self.root).as_posix(),
+                "registered": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._write_index(index)
+        self._loaded.setdefault(version, model)
+        return version
+
+    def set_alias(self, name: str, alias: str, version: str):
+        index = self._read_index()
+        entry = index["models"].get(name)
+        if entry is None or version not in entry["versions"]:
+            raise KeyError(f"No {name} version {version} in the registry at {self.root}")
+        if entry["aliases"].get(alias) != version:
+            entry["aliases"][alias] = version
+            self._write_index(index)
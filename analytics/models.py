@@ -1,14 +1,21 @@
 # analytics/models.py
 
+from dataclasses import replace
+from typing import NamedTuple
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score, mean_absolute_error
 
+from analytics import tuning
+from etl.indicators import IndicatorSpec, Ratio, evaluate
+
 MIN_TRAINING_ROWS = 10
 
 
-def _train_model(df: pd.DataFrame, feature_cols: list, target_col: str):
+def _train_model(df: pd.DataFrame, feature_cols: list, target_col: str, n_jobs: int | None = None,
+                 tune: bool = False):
     data = df.dropna(subset=feature_cols + [target_col]).copy()
     if len(data) < MIN_TRAINING_ROWS:
         raise ValueError(
@@ -22,16 +29,33 @@ def _train_model(df: pd.DataFrame, feature_cols: list, target_col: str):
         X, y, test_size=0.3, random_state=42
     )
 
+    params: dict = {"n_estimators": 200}
+    if tune:
+        # CV search (analytics/tuning.py) on the training split only, so the
+        # test rows stay unseen; a district's rows stay in one fold.
+        groups = data.loc[X_train.index, "District"] if "District" in data.columns else None
+        result = tuning.tune_forest(X_train, y_train, groups=groups, n_jobs=n_jobs or tuning.TUNE_WORKERS,
+                                    cache_dir=tuning.TUNE_CACHE_DIR)
+        params = result.best_params
+        print(f"\n=== Tuning {target_col}: best CV MAE {result.best_mae:.3f} with {params} "
+              f"({result.fits} fold fits, {result.cache_hits} from cache) ===")
+
+    # n_jobs only changes how many cores build the trees, not the trees.
     model = RandomForestRegressor(
-        n_estimators=200,
-        random_state=42
+        **params,
+        random_state=42,
+        n_jobs=n_jobs
     )
     model.fit(X_train, y_train)
+    # Serving predicts single-threaded, with a fixed summation order.
+    model.set_params(n_jobs=None)
 
     y_pred = model.predict(X_test)
+    # Kept with the model (like sklearn's oob_score_), for the model registry.
+    model.holdout_scores_ = {"r2": float(r2_score(y_test, y_pred)), "mae": float(mean_absolute_error(y_test, y_pred))}
     print(f"\n=== Model for {target_col} ===")
-    print(f"R²: {r2_score(y_test, y_pred):.3f}")
-    print(f"MAE: {mean_absolute_error(y_test, y_pred):.3f}")
+    print(f"R²: {model.holdout_scores_['r2']:.3f}")
+    print(f"MAE: {model.holdout_scores_['mae']:.3f}")
 
     # Feature importance
     fi = sorted(
@@ -46,34 +70,122 @@ def _train_model(df: pd.DataFrame, feature_cols: list, target_col: str):
     return model, X, y
 
 
+# ---------------------------------------------------------
+# Target registry: every model models_runner trains
+# ---------------------------------------------------------
+class Target(NamedTuple):
+    name: str              # short key, e.g. "lbw"
+    target_col: str        # cube column to predict
+    features: tuple        # candidate feature columns (absent ones are skipped)
+    model_name: str        # saved as models/<model_name>.joblib
+    prediction_col: str    # column models_runner adds to the cube
+
+
+TARGETS: dict = {}
+
+
+def register_target(name: str, target_col: str, features, model_name: str | None = None,
+                    prediction_col: str | None = None) -> Target:
+    """
+    Add a model to train. models_runner trains every registered target
+    (see analytics/training.py), e.g.
+
+        register_target("sam", "SAM_Rate_%", ["Measurement_Efficiency", "HV_Percentage"])
+    """
+    target = Target(
+        name=name,
+        target_col=target_col,
+        features=tuple(features),
+        model_name=model_name or f"{name}_model",
+        prediction_col=prediction_col or f"{name.upper()}_Predicted",
+    )
+    TARGETS[name] = target
+    return target
+
+
+def train_target(df: pd.DataFrame, target: Target, n_jobs: int | None = None, tune: bool = False):
+    """_train_model on target's features that df actually has."""
+    features = [c for c in target.features if c in df.columns]
+    return _train_model(df, features, target.target_col, n_jobs=n_jobs, tune=tune)
+
+
+# LBW_Rate_% from maternal & service indicators.
+# Adjust feature list based on actual cube columns.
+register_target("lbw", "LBW_Rate_%", [
+    "PW_Anaemia_Rate",
+    "Optimum_WG_Latest_%",
+    "PW_Hb_Measured_%",
+    "Measurement_Efficiency",
+    "HV_Percentage",
+    "SAM_Rate_%",
+    "SUW_Rate_%",
+], prediction_col="LBW_Predicted")
+
+# Stunting_Total_% from SNP, ME, AWC, etc.
+register_target("stunting", "Stunting_Total_%", [
+    "Measurement_Efficiency",
+    "SAM_Rate_%",
+    "SUW_Rate_%",
+    "Active_AWC_%",
+    "HV_Percentage",
+    "LBW_Rate_%",
+], prediction_col="Stunting_Predicted")
+
+
+# ---------------------------------------------------------
+# Warehouse cubes -> the targets' column names
+# ---------------------------------------------------------
+# The targets above use the pipeline cube's names (LBW_Rate_%, ...). The
+# warehouse cubes (cubes/run_cube.py) keep the ETL's snake_case names and
+# store most rates as fractions rounded to 2 decimals, so those are
+# recomputed as percentages from the counts; the rest are plain renames.
+WAREHOUSE_CUBE = IndicatorSpec(
+    key="model_features",
+    title="Model features from a warehouse cube",
+    source=r"district_cube_.+",
+    renames={
+        "district": "District",
+        "stunting_total_pct": "Stunting_Total_%",
+        "measurement_efficiency": "Measurement_Efficiency",
+        "visit_coverage_pct": "HV_Percentage",
+    },
+    derived=tuple(
+        # Missing counts (a district absent from a source) stay missing.
+        Ratio(out, num, den, scale=100, nan=None) for out, num, den in (
+            ("LBW_Rate_%", "lbw_children_0_6m", "total_children_0_6m"),
+            ("PW_Anaemia_Rate", "anaemic_pw", "hb_measured_pw"),
+            ("Optimum_WG_Latest_%", "pw_optimum_latest", "gwg_total_pw"),
+            ("PW_Hb_Measured_%", "pw_hb_measured", "gwg_total_pw"),
+            ("SAM_Rate_%", "sam_total", "total_beneficiary"),
+            ("SUW_Rate_%", "suw_total", "total_beneficiary"),
+            ("Active_AWC_%", "active_awc", "total_awc"),
+        )
+    ),
+    title_case_district=False,
+)
+
+
+def from_warehouse_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """
+    cube with the targets' column names: a warehouse cube (snake_case
+    "district" column) is mapped through WAREHOUSE_CUBE, skipping rates
+    whose counts it lacks; any other cube is returned as it is.
+    """
+    if "district" not in cube.columns or "District" in cube.columns:
+        return cube
+    derived = tuple(op for op in WAREHOUSE_CUBE.derived if {op.num, op.den} <= set(cube.columns))
+    # A consolidated copy: the cubes are wide, and evaluate adds columns to it.
+    return evaluate(replace(WAREHOUSE_CUBE, derived=derived), cube.copy())
+
+
 def predict_lbw(df: pd.DataFrame):
     """
     Predict LBW_Rate_% using maternal & service indicators.
-    Adjust feature list based on actual cube columns.
     """
-    features = [
-        "PW_Anaemia_Rate",
-        "Optimum_WG_Latest_%",
-        "PW_Hb_Measured_%",
-        "Measurement_Efficiency",
-        "HV_Percentage",
-        "SAM_Rate_%",
-        "SUW_Rate_%",
-    ]
-    features = [c for c in features if c in df.columns]
-    return _train_model(df, features, "LBW_Rate_%")
+    return train_target(df, TARGETS["lbw"])
 
 def predict_stunting(df: pd.DataFrame):
     """
     Predict Stunting_Total_% from SNP, ME, AWC, etc.
     """
-    features = [
-        "Measurement_Efficiency",
-        "SAM_Rate_%",
-        "SUW_Rate_%",
-        "Active_AWC_%",
-        "HV_Percentage",
-        "LBW_Rate_%",
-    ]
-    features = [c for c in features if c in df.columns]
-    return _train_model(df, features, "Stunting_Total_%")
+    return train_target(df, TARGETS["stunting"])
@@ -0,0 +1,113 @@
+# analytics/predictions.py
+"""
+Per-district predictions at each district's current indicator values,
+persisted by models_runner next to the models so the API can serve them
+with a lookup instead of running the forests per request.
+
+models/district_predictions.<ext>   District, LBW_Predicted, Stunting_Predicted
+models/district_predictions.json    which cube + model files produced it
+
+The metadata ties the table to the exact model files (sha prefix, as in
+model_version) and cube it was computed from; a reader holding different
+models treats the table as stale. save_versioned_table / load_versioned_table
+/ is_current implement that for any such table (the explanations in
+analytics/explain.py are the other one).
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from etl.manifest import file_digest
+from utils.warehouse import read_table, write_json, write_table
+
+PREDICTIONS_NAME = "district_predictions"
+PREDICTION_COLUMNS = ["LBW_Predicted", "Stunting_Predicted"]
+
+
+def model_version(path) -> str:
+    """Short content hash identifying a saved model file ("unknown" if unreadable)."""
+    try:
+        return file_digest(path)[:16]
+    except OSError:
+        return "unknown"
+
+
+def metadata_path(folder, name: str = PREDICTIONS_NAME) -> Path:
+    return Path(folder) / f"{name}.json"
+
+
+def save_versioned_table(table: pd.DataFrame, folder, name: str, cube_name: str, model_paths: dict,
+                         fmt: str | None = None) -> Path:
+    """
+    Write table as folder/<name>.<ext> plus the metadata naming cube_name
+    and the versions of model_paths ({"lbw": path, ...}). Returns the table path.
+    """
+    folder = Path(folder)
+    path = write_table(table, folder, name, fmt)
+
+    # Metadata last: a reader never sees it pointing at a table not yet written.
+    write_json(metadata_path(folder, name), {
+        "table": path.name,
+        "cube": cube_name,
+        "models": {key: model_version(p) for key, p in model_paths.items()},
+        "rows": len(table),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    })
+    return path
+
+
+def load_versioned_table(folder, name: str) -> tuple[pd.DataFrame, dict] | None:
+    """(table, metadata) as saved by save_versioned_table, or None if there is none."""
+    try:
+        with open(metadata_path(folder, name), encoding="utf-8") as fh:
+            metadata = json.load(fh)
+    except FileNotFoundError:
+        return None
+    return read_table(Path(folder) / metadata["table"]), metadata
+
+
+def is_current(metadata: dict, versions: dict) -> bool:
+    """
+    Whether a table with this metadata was made from the cube and model
+    versions in versions ({"cube": name, "lbw": version, ...}).
+    """
+    made_from = metadata.get("models") or {}
+    if not made_from or metadata.get("cube") != versions.get("cube"):
+        return False
+    return all(versions.get(key) == version for key, version in made_from.items())
+
+
+def save_prediction_table(df: pd.DataFrame, folder, cube_name: str, model_paths: dict,
+                          fmt: str | None = None) -> Path:
+    """
+    Write df's District + *_Predicted columns (one row per district) and
+    the metadata naming cube_name and the versions of model_paths
+    ({"lbw": path, "stunting": path}). Returns the table path.
+    """
+    table = (
+        df[["District", *PREDICTION_COLUMNS]]
+        .dropna(subset=["District"])
+        .drop_duplicates("District")
+        .reset_index(drop=True)
+    )
+    return save_versioned_table(table, folder, PREDICTIONS_NAME, cube_name, model_paths, fmt)
+
+
+def prediction_lookup(table: pd.DataFrame) -> dict:
+    """{district name: {"LBW_Predicted": x, "Stunting_Predicted": y}}; missing predictions are None."""
+    values = table[PREDICTION_COLUMNS].astype(object).where(table[PREDICTION_COLUMNS].notna(), None)
+    return dict(zip(table["District"].astype(str), values.to_dict("records")))
+
+
+def load_prediction_table(folder) -> tuple[dict, dict] | None:
+    """
+    (prediction_lookup of the saved table, metadata), or None when no
+    table has been saved.
+    """
+    loaded = load_versioned_table(folder, PREDICTIONS_NAME)
+    if loaded is None:
+        return None
+    table, metadata = loaded
+    return prediction_lookup(table), metadata
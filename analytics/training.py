@@ -0,0 +1,79 @@
+# analytics/training.py
+"""
+Train every registered target (analytics.models.TARGETS) at once.
+
+Targets are independent, so they train in parallel worker processes, and
+each forest also builds its trees on several cores (n_jobs). Both share
+one core budget (TRAIN_CORES, default: all cores): with B cores and T
+targets, min(T, B) targets train at once, each forest getting
+B // min(T, B) cores. Retraining all models then scales with cores rather
+than with the number of models.
+
+Trees don't depend on n_jobs or on which process fits them
+(random_state=42 seeds every tree up front), so the models are the same
+as training one after the other.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import pandas as pd
+
+from analytics.models import TARGETS, Target, train_target
+
+TRAIN_CORES = int(os.getenv("TRAIN_CORES", str(os.cpu_count() or 1)))
+
+
+class TrainedTarget(NamedTuple):
+    target: Target
+    model: object
+    X: pd.DataFrame
+    y: pd.Series
+    train_seconds: float = 0.0
+
+
+def plan_cores(n_targets: int, cores: int) -> tuple[int, int]:
+    """(targets trained at once, n_jobs per forest) within a budget of cores."""
+    cores = max(1, cores)
+    processes = max(1, min(n_targets, cores))
+    return processes, max(1, cores // processes)
+
+
+def _fit(df: pd.DataFrame, target: Target, n_jobs: int, tune: bool = False) -> TrainedTarget:
+    start = time.perf_counter()
+    model, X, y = train_target(df, target, n_jobs=n_jobs, tune=tune)
+    return TrainedTarget(target, model, X, y, time.perf_counter() - start)
+
+
+def reuse_target(df: pd.DataFrame, target: Target, model) -> TrainedTarget:
+    """TrainedTarget for an already trained model of target: df's training rows, no fitting."""
+    features = [c for c in target.features if c in df.columns]
+    data = df.dropna(subset=features + [target.target_col])
+    return TrainedTarget(target, model, data[features], data[target.target_col])
+
+
+def train_targets(df: pd.DataFrame, names: list | None = None,
+                  cores: int = TRAIN_CORES, tune: bool = False) -> dict:
+    """
+    Train the named targets (default: all registered) on df within a
+    budget of `cores`. tune=True runs each target's CV search first (its
+    folds share that target's cores). Returns {name: TrainedTarget} in
+    registration order. A target that fails to train raises, as it would
+    sequentially.
+    """
+    targets = [TARGETS[name] for name in (names if names is not None else list(TARGETS))]
+    processes, n_jobs = plan_cores(len(targets), cores)
+    print(f"[TRAIN] {len(targets)} target(s), {processes} at a time, {n_jobs} core(s) per forest")
+
+    if processes == 1:
+        return {t.name: _fit(df, t, n_jobs, tune) for t in targets}
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            # Each worker only needs its own columns.
+            t.name: pool.submit(_fit, df[[c for c in ("District", *t.features, t.target_col) if c in df.columns]],
+                                t, n_jobs, tune)
+            for t in targets
+        }
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,184 @@
+# analytics/tuning.py
+"""
+Cross-validated hyperparameter search for the RandomForest models
+(_train_model(..., tune=True)).
+
+tune_forest scores every candidate in a parameter grid with k-fold CV --
+grouped (GroupKFold) when groups are given, so several rows of the same
+district never sit on both sides of a split -- using successive halving:
+every candidate starts with a small forest (min_estimators trees), the
+best 1/factor by mean absolute error advance, and the survivors' forests
+grow by `factor` each round up to max_estimators. Weak settings are
+dropped after cheap rounds instead of being fitted at full size.
+
+A round's (candidate, fold) fits run in parallel worker processes. Every
+fitted fold model is cached on disk (TUNE_CACHE_DIR), keyed on a hash of
+its training rows (feature + target values only) and its parameters:
+
+- a survivor's next round grows its cached forest with warm_start rather
+  than refitting; sklearn seeds the extra trees so the result is the same
+  forest a fresh fit would give;
+- re-tuning after a change that leaves a fold's training rows identical
+  (a new cube column, a wider grid, an extra round) reuses that work.
+"""
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import GroupKFold, KFold
+
+TUNE_WORKERS = int(os.getenv("TUNE_WORKERS", str(os.cpu_count() or 1)))
+TUNE_CACHE_DIR = Path(os.getenv("TUNE_CACHE_DIR", "models/.tune_cache"))
+
+PARAM_GRID = {
+    "max_depth": [None, 4, 8],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": [1.0, "sqrt"],
+}
+
+
+class TuneResult(NamedTuple):
+    best_params: dict      # includes n_estimators
+    best_mae: float        # mean CV MAE of best_params
+    rounds: list           # per round: {"n_estimators", "scores": [(params, mae), ...]}
+    cache_hits: int
+    fits: int
+
+
+def _candidates(grid: dict) -> list:
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _folds(n_rows: int, k: int, groups) -> list:
+    """[(train_idx, test_idx), ...], deterministic for the same data."""
+    if groups is not None:
+        groups = np.asarray(groups)
+        k = min(k, len(np.unique(groups)))
+        return list(GroupKFold(n_splits=k).split(np.zeros(n_rows), groups=groups))
+    k = min(k, n_rows)
+    return list(KFold(n_splits=k, shuffle=True, random_state=42).split(np.zeros(n_rows)))
+
+
+def _data_hash(X: np.ndarray, y: np.ndarray, columns: tuple) -> str:
+    h = hashlib.sha256()
+    h.update("|".join(columns).encode("utf-8"))
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _fold_key(data_hash: str, params: dict, n_estimators: int) -> str:
+    payload = json.dumps({"data": data_hash, "params": params, "n_estimators": n_estimators,
+                          "random_state": 42}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+# Training data for the fold fits, set once per worker process.
+_DATA: dict = {}
+
+
+def _set_data(X: np.ndarray, y: np.ndarray, columns: tuple, cache_dir):
+    _DATA.update(X=X, y=y, columns=columns, cache_dir=None if cache_dir is None else Path(cache_dir))
+
+
+def _fit_fold(params: dict, n_estimators: int, grown_from: int | None,
+              train_idx: np.ndarray, test_idx: np.ndarray) -> tuple[float, bool]:
+    """(fold MAE, whether the fitted model came from the cache)."""
+    X, y, cache_dir = _DATA["X"], _DATA["y"], _DATA["cache_dir"]
+    X_train = pd.DataFrame(X[train_idx], columns=list(_DATA["columns"]))
+    X_test = pd.DataFrame(X[test_idx], columns=list(_DATA["columns"]))
+    data_hash = _data_hash(X[train_idx], y[train_idx], _DATA["columns"])
+
+    path = None
+    if cache_dir is not None:
+        path = cache_dir / f"{_fold_key(data_hash, params, n_estimators)}.joblib"
+        if path.exists():
+            model = joblib.load(path)
+            return mean_absolute_error(y[test_idx], model.predict(X_test)), True
+
+    model = None
+    if cache_dir is not None and grown_from is not None:
+        smaller = cache_dir / f"{_fold_key(data_hash, params, grown_from)}.joblib"
+        if smaller.exists():
+            model = joblib.load(smaller)
+            model.set_params(warm_start=True, n_estimators=n_estimators)
+    if model is None:
+        model = RandomForestRegressor(n_estimators=n_estimators, random_state=42, **params)
+    model.fit(X_train, y[train_idx])
+    model.set_params(warm_start=False)
+
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.partial")
+        joblib.dump(model, tmp)
+        os.replace(tmp, path)
+    return mean_absolute_error(y[test_idx], model.predict(X_test)), False
+
+
+def tune_forest(X: pd.DataFrame, y: pd.Series, groups=None, param_grid: dict | None = None,
+                k: int = 5, factor: int = 3, min_estimators: int = 25, max_estimators: int = 200,
+                n_jobs: int = TUNE_WORKERS, cache_dir=None) -> TuneResult:
+    """
+    Successive-halving CV search over param_grid (default PARAM_GRID) for
+    a RandomForestRegressor on X, y. Fold models are cached under
+    cache_dir (_train_model passes TUNE_CACHE_DIR); None disables caching.
+    """
+    X_values = X.to_numpy(dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    columns = tuple(str(c) for c in X.columns)
+    folds = _folds(len(X_values), k, groups)
+    candidates = _candidates(param_grid or PARAM_GRID)
+
+    # Tree counts per round, e.g. 25 -> 75 -> 200.
+    schedule = [min_estimators]
+    while schedule[-1] < max_estimators:
+        schedule.append(min(schedule[-1] * factor, max_estimators))
+
+    workers = max(1, min(n_jobs, len(candidates) * len(folds)))
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_set_data,
+                                   initargs=(X_values, y_values, columns, cache_dir))
+    else:
+        _set_data(X_values, y_values, columns, cache_dir)
+
+    rounds: list = []
+    hits, fits = 0, 0
+    try:
+        for i, n_estimators in enumerate(schedule):
+            grown_from = schedule[i - 1] if i else None
+            tasks = [(params, n_estimators, grown_from, train_idx, test_idx)
+                     for params in candidates for train_idx, test_idx in folds]
+            if pool is not None:
+                results = list(pool.map(_fit_fold, *zip(*tasks)))
+            else:
+                results = [_fit_fold(*task) for task in tasks]
+
+            hits += sum(cached for _, cached in results)
+            fits += sum(not cached for _, cached in results)
+            maes = np.array([mae for mae, _ in results]).reshape(len(candidates), len(folds)).mean(axis=1)
+            order = np.argsort(maes, kind="stable")
+            rounds.append({
+                "n_estimators": n_estimators,
+                "scores": [(candidates[j], float(maes[j])) for j in order],
+            })
+
+            if i < len(schedule) - 1:
+                keep = max(1, int(np.ceil(len(candidates) / factor)))
+                candidates = [candidates[j] for j in order[:keep]]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best_params, best_mae = rounds[-1]["scores"][0]
+    return TuneResult({**best_params, "n_estimators": schedule[-1]}, best_mae, rounds, hits, fits)
@@ -4,6 +4,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from utils.warehouse import read_table
+
 # Use non-interactive backend
 plt.switch_backend("Agg")
 
@@ -18,7 +20,7 @@ print(f"[DEBUG] Plots will be saved to: {PLOT_DIR}")
 def load_cube(path: str) -> pd.DataFrame:
     """Load the district intelligence cube."""
     print(f"[DEBUG] Loading cube from: {path}")
-    return pd.read_csv(path)
+    return read_table(path)
 
 
 # ------------------------------------------------------------
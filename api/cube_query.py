@@ -0,0 +1,135 @@
+# api/cube_query.py
+"""
+Bulk queries over the in-memory district cube for POST /cube/query.
+
+run_query applies a CubeQuery (projection, ANDed predicates, sort, limit)
+with one vectorized boolean mask over the filter columns, sorts only the
+rows that passed, and copies out only the requested rows and columns. The
+encoders stream the result in row chunks as JSON (an array of records,
+NaN -> null, encoded with orjson like the /district/{name} responses, so
+a value reads the same from both), CSV or an Arrow IPC stream.
+"""
+import io
+import operator
+from typing import Iterator
+
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+
+from api.district_index import json_records
+from api.schemas import CubeFilter, CubeQuery
+
+CHUNK_ROWS = 1000
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class QueryError(ValueError):
+    """A query that can't run against this cube (unknown column, bad value type)."""
+
+
+def _check_columns(cube: pd.DataFrame, columns) -> None:
+    unknown = [c for c in columns if c not in cube.columns]
+    if unknown:
+        raise QueryError(f"Unknown cube column(s): {', '.join(unknown)}")
+
+
+def _matches(column: pd.Series, f: CubeFilter) -> np.ndarray:
+    """Boolean mask of rows where column satisfies f; missing values never match."""
+    numeric = pd.api.types.is_numeric_dtype(column)
+    values = f.value if isinstance(f.value, list) else [f.value]
+    if numeric and not all(isinstance(v, (int, float)) for v in values):
+        raise QueryError(f"{f.column} is numeric; filter values must be numbers.")
+    if f.op == "contains" and numeric:
+        raise QueryError(f"'contains' needs a text column, {f.column} is numeric.")
+    if f.op != "in" and isinstance(f.value, list):
+        raise QueryError(f"'{f.op}' takes a single value, not a list.")
+
+    present = column.notna().to_numpy()
+    if f.op == "contains":
+        hits = column.str.contains(str(f.value), case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+    elif f.op == "in":
+        hits = column.isin(values).to_numpy()
+    elif numeric:
+        hits = _COMPARE[f.op](column.to_numpy(dtype=float), float(values[0]))
+    else:
+        hits = _COMPARE[f.op](column.astype(str).to_numpy(), str(values[0]))
+    return present & hits
+
+
+def run_query(cube: pd.DataFrame, query: CubeQuery) -> pd.DataFrame:
+    """The rows and columns of cube selected by query, in query order."""
+    columns = list(dict.fromkeys(query.columns)) if query.columns is not None else list(cube.columns)
+    _check_columns(cube, columns)
+    _check_columns(cube, [f.column for f in query.filters])
+    _check_columns(cube, [s.column for s in query.sort])
+
+    mask = np.ones(len(cube), dtype=bool)
+    for f in query.filters:
+        mask &= _matches(cube[f.column], f)
+    positions = np.flatnonzero(mask)
+
+    if query.sort:
+        keys = cube.iloc[positions][[s.column for s in query.sort]].reset_index(drop=True)
+        order = keys.sort_values(
+            [s.column for s in query.sort],
+            ascending=[not s.descending for s in query.sort],
+            kind="stable", na_position="last",
+        ).index.to_numpy()
+        positions = positions[order]
+    if query.limit is not None:
+        positions = positions[:query.limit]
+
+    col_positions = [cube.columns.get_loc(c) for c in columns]
+    return cube.iloc[positions, col_positions].reset_index(drop=True)
+
+
+def _chunks(df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[start:start + CHUNK_ROWS]
+
+
+def stream_json(df: pd.DataFrame) -> Iterator[bytes]:
+    yield b"["
+    for i, chunk in enumerate(_chunks(df)):
+        records = orjson.dumps(json_records(chunk))[1:-1]
+        yield (b"," if i else b"") + records
+    yield b"]"
+
+
+def stream_csv(df: pd.DataFrame) -> Iterator[bytes]:
+    if df.empty:
+        yield df.to_csv(index=False).encode("utf-8")
+        return
+    for i, chunk in enumerate(_chunks(df)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode("utf-8")
+
+
+def stream_arrow(df: pd.DataFrame) -> Iterator[bytes]:
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in _chunks(df):
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # end-of-stream marker
+
+
+ENCODERS = {"json": stream_json, "csv": stream_csv, "arrow": stream_arrow}
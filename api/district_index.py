@@ -0,0 +1,116 @@
+# api/district_index.py
+"""
+District lookup for the /district endpoints, built once when the cube is
+loaded instead of re-normalizing the whole District column per request.
+
+Matching is unchanged: case/whitespace-insensitive exact match first,
+otherwise the first row (in cube order) whose name contains the query.
+The one difference: a row with no district name never matches (the
+per-request version matched it as "nan" under pandas 2).
+Exact matches are a dict lookup. The substring fallback runs one C-level
+str.find over the unique names joined into a single string, rather than
+a pandas str.contains over every row.
+
+Both district responses (the flat row and the structured view) are also
+serialized once here, with orjson, so an endpoint only has to look up the
+position and write the bytes.
+"""
+from bisect import bisect_right
+
+import orjson
+import pandas as pd
+
+# Separates names in the joined search string; can't occur in a query
+# that came through a URL path segment.
+_SEP = "\x00"
+
+
+def json_records(df: pd.DataFrame) -> list[dict]:
+    """df's rows as JSON-safe dicts, converted in bulk: NaN -> None, numpy scalars -> int/float."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+class DistrictIndex:
+    def __init__(self, cube: pd.DataFrame, column: str = "District"):
+        districts = cube[column]
+        normalized = districts.astype(str).str.strip().str.lower().where(districts.notna()).tolist()
+
+        # First row position for each normalized name, in cube order. Rows
+        # with no name are skipped, so nothing matches them; under pandas 2
+        # astype(str) alone would index them as "nan" / "none".
+        self._positions: dict[str, int] = {}
+        for pos, name in enumerate(normalized):
+            if isinstance(name, str):
+                self._positions.setdefault(name, pos)
+
+        names = list(self._positions)
+        self._search = _SEP.join(names)
+        self._starts = []
+        offset = 0
+        for name in names:
+            self._starts.append(offset)
+            offset += len(name) + len(_SEP)
+        self._names = names
+
+        # Every row converted to JSON-safe Python values once, ready to return as-is.
+        self.rows: list[dict] = json_records(cube)
+        self.available = sorted(cube[column].dropna().astype(str).unique())
+
+        # Response bodies for /district/{name} and /district_structured/{name}.
+        self.row_json = [orjson.dumps(row) for row in self.rows]
+        self.structured_json = [orjson.dumps(structured_view(row)) for row in self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, name: str) -> int | None:
+        """Row position for name, or None when nothing matches."""
+        key = name.strip().lower()
+        pos = self._positions.get(key)
+        if pos is not None:
+            return pos
+
+        hit = self._search.find(key)
+        while hit != -1:
+            i = bisect_right(self._starts, hit) - 1
+            # A hit spanning the separator isn't inside one name.
+            if hit + len(key) <= self._starts[i] + len(self._names[i]):
+                return self._positions[self._names[i]]
+            hit = self._search.find(key, hit + 1)
+        return None
+
+    def find(self, name: str) -> dict | None:
+        """JSON-safe row for name, or None."""
+        pos = self.lookup(name)
+        return None if pos is None else self.rows[pos]
+
+
+def structured_view(row: dict) -> dict:
+    """The /district_structured/{name} response for one cube row."""
+    return {
+        "district": row.get("District"),
+
+        "stunting_5_6": {
+            "stunting_pct": row.get("Stunting_Total_%"),
+            "underweight_pct": row.get("Underweight_Total_%"),
+            "measurement_efficiency": row.get("Measurement_Efficiency"),
+        },
+
+        "stunting_0_5": {
+            "stunting_pct": row.get("Stunting_Total_Pct_0_5"),
+            "underweight_pct": row.get("Underweight_Total_Pct_0_5"),
+            "measurement_coverage": row.get("Measurement_Coverage_Pct_0_5"),
+        },
+
+        "maternal_indicators": {
+            "pw_anaemia_rate": row.get("PW_Anaemia_Rate"),
+            "optimum_weight_gain": row.get("Optimum_WG_Latest_%"),
+        },
+
+        "service_delivery": {
+            "home_visit_pct": row.get("HV_Percentage"),
+            "active_awc_pct": row.get("Active_AWC_%"),
+        },
+
+        "raw": row  # returns all 150+ fields
+    }
@@ -0,0 +1,94 @@
+# api/inference.py
+"""
+Model inference off the request threadpool.
+
+Plain `def` endpoints run on Starlette's shared threadpool, so a burst of
+predict calls can hold every thread and stall cheap endpoints like
+/district/{name}. InferenceExecutor gives model.predict its own bounded
+thread pool (sklearn's forest traversal releases the GIL, and a thread
+pool avoids pickling the model and inputs for every call), sized
+independently of the request pool; the endpoints await it from async
+handlers.
+
+Single-row predictions are micro-batched: rows for the same model that
+arrive within `max_wait` seconds of each other are stacked into one
+predict call (at most `max_batch` rows). The first row of a batch arms a
+timer on the event loop, and the batch is dispatched when the timer fires
+or as soon as it is full. Nothing runs on the loop between batches.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+class _Batch:
+    __slots__ = ("model", "columns", "rows", "futures", "timer")
+
+    def __init__(self, model, columns: tuple):
+        self.model = model
+        self.columns = columns
+        self.rows: list = []
+        self.futures: list = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class InferenceExecutor:
+    def __init__(self, workers: int, max_batch: int = 32, max_wait: float = 0.002):
+        self.workers = workers
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        # Open batch per (event loop, model, feature order).
+        self._open: dict = {}
+
+    def _run(self, model, X: np.ndarray, columns: tuple) -> np.ndarray:
+        return np.asarray(model.predict(pd.DataFrame(X, columns=list(columns))), dtype=float)
+
+    async def predict(self, model, X: np.ndarray, columns) -> np.ndarray:
+        """Predict a whole matrix (rows x columns, in training order) in one call."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._run, model, X, tuple(columns))
+
+    async def predict_one(self, model, row, columns) -> float:
+        """Predict one row, sharing a predict call with concurrent rows for the same model."""
+        loop = asyncio.get_running_loop()
+        key = (loop, id(model), tuple(columns))
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch(model, key[2])
+            batch.timer = loop.call_later(self.max_wait, self._dispatch, key, batch)
+
+        future = loop.create_future()
+        batch.rows.append(row)
+        batch.futures.append(future)
+        if len(batch.rows) >= self.max_batch:
+            self._dispatch(key, batch)
+        return await future
+
+    def _dispatch(self, key, batch: _Batch):
+        if self._open.get(key) is not batch:
+            return  # already dispatched (full before the timer fired)
+        del self._open[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        loop = key[0]
+        X = np.asarray(batch.rows, dtype=float)
+        done = loop.run_in_executor(self._pool, self._run, batch.model, X, batch.columns)
+        done.add_done_callback(lambda result: self._deliver(batch, result))
+
+    @staticmethod
+    def _deliver(batch: _Batch, result: asyncio.Future):
+        error = result.exception()
+        for i, future in enumerate(batch.futures):
+            if future.done():  # the request went away meanwhile
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(float(result.result()[i]))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -1,33 +1,128 @@
 # api/main.py
 
+import json
+import os
+from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
-import joblib
-import pandas as pd
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+import numpy as np
+import orjson
 from pathlib import Path
 
-from api.schemas import PredictRequest
+from analytics.model_registry import PRODUCTION, ModelRegistry
+from api.cube_query import ENCODERS, MEDIA_TYPES, QueryError, run_query
+from api.district_index import DistrictIndex
+from api.inference import InferenceExecutor
+from api.metrics import Metrics, MetricsMiddleware
+from api.prediction_cache import PredictionCache, SqliteStore, cache_key
+from api.registry import ArtifactRegistry, Snapshot, artifact_signature, load_snapshot, snapshot_version
+from api.schemas import CubeQuery, PredictRequest
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RELOAD_INTERVAL > 0:
+        registry.start_watcher(RELOAD_INTERVAL)
+    yield
+    registry.stop_watcher()
+    inference.shutdown()
+    prediction_cache.close()
+
 
 app = FastAPI(
     title="Poshan Intelligence ML API",
     description="Predict LBW & Stunting using trained models",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
 )
 
-# Load models
+# Models + cube, reloadable without a restart (see api/registry.py).
+# Models are the API_MODEL_ALIAS versions in the model registry
+# (analytics/model_registry.py); the fixed files below are used for a
+# model the registry doesn't have.
 LBW_MODEL_PATH = Path("models/lbw_model.joblib")
 STUNTING_MODEL_PATH = Path("models/stunting_model.joblib")
+PREDICTIONS_DIR = LBW_MODEL_PATH.parent
+CUBE_DIR = Path(os.getenv("API_CUBE_DIR", "."))
+MODEL_REGISTRY = ModelRegistry()
+MODEL_ALIAS = os.getenv("API_MODEL_ALIAS", PRODUCTION)
+
+# Seconds between checks for new artifacts; 0 disables the watcher
+# (POST /admin/reload still works).
+RELOAD_INTERVAL = float(os.getenv("API_RELOAD_INTERVAL", "30"))
+
+# "auto", "joblib" or "compact" (see api/registry.py MODEL_FORMATS).
+MODEL_FORMAT = os.getenv("API_MODEL_FORMAT", "auto")
+# With "auto", inputs of up to this many rows run on the compact arrays.
+COMPACT_MAX_ROWS = int(os.getenv("API_COMPACT_MAX_ROWS", "256"))
+
+# If set, POST /admin/reload requires a matching X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("API_ADMIN_TOKEN")
+
+
+def _model_paths() -> tuple[Path, Path]:
+    # A cheap lookup: the registry index is only re-read when it changes.
+    return (MODEL_REGISTRY.path("lbw", MODEL_ALIAS) or LBW_MODEL_PATH,
+            MODEL_REGISTRY.path("stunting", MODEL_ALIAS) or STUNTING_MODEL_PATH)
+
+
+# Moving the alias changes the resolved paths, so the watcher reloads.
+registry = ArtifactRegistry(
+    load=lambda: load_snapshot(*_model_paths(), CUBE_DIR, PREDICTIONS_DIR, model_format=MODEL_FORMAT,
+                               compact_max_rows=COMPACT_MAX_ROWS),
+    signature=lambda: artifact_signature(*_model_paths(), CUBE_DIR, PREDICTIONS_DIR),
+)
+
+# model.predict runs on its own thread pool (see api/inference.py), not on
+# the threadpool that serves the other endpoints. Concurrent single-row
+# predictions are batched: up to API_BATCH_MAX_SIZE rows, waiting at most
+# API_BATCH_MAX_WAIT_MS for more to arrive.
+inference = InferenceExecutor(
+    workers=int(os.getenv("API_INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_batch=int(os.getenv("API_BATCH_MAX_SIZE", "32")),
+    max_wait=float(os.getenv("API_BATCH_MAX_WAIT_MS", "2")) / 1000,
+)
+
+# Single-row prediction results, keyed on model version + feature values
+# (see api/prediction_cache.py). API_PREDICTION_CACHE_SIZE=0 disables it;
+# API_PREDICTION_CACHE_DB adds a sqlite file shared by all workers.
+CACHE_DB = os.getenv("API_PREDICTION_CACHE_DB")
+prediction_cache = PredictionCache(
+    maxsize=int(os.getenv("API_PREDICTION_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("API_PREDICTION_CACHE_TTL", "600")),
+    store=SqliteStore(Path(CACHE_DB)) if CACHE_DB else None,
+)
+registry.on_reload(
+    lambda snapshot: prediction_cache.clear(keep_versions=(snapshot.versions["lbw"], snapshot.versions["stunting"]))
+)
+
+# Request latency / throughput / in-flight and per-stage handler timings,
+# served at GET /metrics (see api/metrics.py). API_METRICS=0 turns all of
+# it off: no middleware, and stage timers are a shared no-op.
+metrics = Metrics(enabled=os.getenv("API_METRICS", "1") != "0")
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+
+def _cache_metrics():
+    stats = prediction_cache.stats()
+    return [
+        ("api_prediction_cache_hits_total", "counter", "Prediction cache hits (memory or shared store).",
+         stats["hits"]),
+        ("api_prediction_cache_disk_hits_total", "counter", "Prediction cache hits served by the shared store.",
+         stats["disk_hits"]),
+        ("api_prediction_cache_misses_total", "counter", "Prediction cache misses.", stats["misses"]),
+        ("api_prediction_cache_entries", "gauge", "Entries in the in-process prediction cache.", stats["size"]),
+    ]
+
 
-if not LBW_MODEL_PATH.exists() or not STUNTING_MODEL_PATH.exists():
-    raise RuntimeError("❌ Trained models not found. Run models_runner.py first.")
+metrics.collect(_cache_metrics)
 
-lbw_model = joblib.load(LBW_MODEL_PATH)
-stunting_model = joblib.load(STUNTING_MODEL_PATH)
 
-# Load cube (for district insights)
-cube_files = sorted(Path(".").glob("district_cube_*.csv"))
-cube = pd.read_csv(cube_files[-1]) if cube_files else None
+def _json(payload) -> Response:
+    return Response(orjson.dumps(payload), media_type="application/json")
 
 
 @app.get("/")
@@ -68,6 +163,7 @@ STUNTING_MAPPING = {
     "LBW_Rate_": "LBW_Rate_%"
 }
 
+# Model’s expected feature order (MUST MATCH training)
 STUNTING_FEATURE_ORDER = [
     "Measurement_Efficiency",
     "SAM_Rate_%",
@@ -78,191 +174,360 @@ STUNTING_FEATURE_ORDER = [
 ]
 
 
+async def _predict_row(model, version: str, row: list, feature_order: list) -> float:
+    # A model whose file couldn't be hashed has no version to key on.
+    if version == "unknown":
+        return await inference.predict_one(model, row, feature_order)
+
+    key = cache_key(version, row)
+    y_pred = await prediction_cache.get_async(key)
+    if y_pred is None:
+        y_pred = await inference.predict_one(model, row, feature_order)
+        prediction_cache.put_async(key, y_pred)
+    return y_pred
+
+
 # ---------------------------------------------------------
 # Predict LBW
 # ---------------------------------------------------------
 @app.post("/predict/lbw")
-def predict_lbw(req: PredictRequest):
-
-    req_dict = req.dict()
-
-    # Convert request → proper model feature names
-    model_input = {}
-    for req_key, value in req_dict.items():
-        if value is not None and req_key in LBW_MAPPING:
-            model_feature = LBW_MAPPING[req_key]
-            model_input[model_feature] = value
-
-    if not model_input:
-        raise HTTPException(400, "No valid LBW features provided.")
-
-    # Build input row in correct model training order
-    input_row = {col: model_input.get(col, 0) for col in LBW_FEATURE_ORDER}
+async def predict_lbw(req: PredictRequest):
+    stage = metrics.stage
+
+    with stage("/predict/lbw", "features"):
+        req_dict = req.dict()
+
+        # Convert request → proper model feature names
+        model_input = {}
+        for req_key, value in req_dict.items():
+            if value is not None and req_key in LBW_MAPPING:
+                model_feature = LBW_MAPPING[req_key]
+                model_input[model_feature] = value
+
+        if not model_input:
+            raise HTTPException(400, "No valid LBW features provided.")
+
+        # Build input row in correct model training order
+        input_row = {col: model_input.get(col, 0) for col in LBW_FEATURE_ORDER}
+
+    with stage("/predict/lbw", "predict"):
+        snapshot = registry.current
+        y_pred = await _predict_row(
+            snapshot.lbw_model, snapshot.versions["lbw"], [input_row[col] for col in LBW_FEATURE_ORDER],
+            LBW_FEATURE_ORDER
+        )
 
-    df = pd.DataFrame([input_row])
-    y_pred = lbw_model.predict(df)[0]
-
-    return {
-        "LBW_Predicted": round(float(y_pred), 2),
-        "features_used": [k for k, v in input_row.items() if v != 0]
-    }
+    with stage("/predict/lbw", "serialize"):
+        return _json({
+            "LBW_Predicted": round(float(y_pred), 2),
+            "features_used": [k for k, v in input_row.items() if v != 0]
+        })
 
 
 # ---------------------------------------------------------
 # Predict Stunting (Corrected Mapping Version)
 # ---------------------------------------------------------
 @app.post("/predict/stunting")
-def predict_stunting(req: PredictRequest):
-
-    req_dict = req.dict()
-
-    # Request → Cube column mapping
-    mapping = {
-        "Measurement_Efficiency": "Measurement_Efficiency",
-        "SAM_Rate_": "SAM_Rate_%",
-        "SUW_Rate_": "SUW_Rate_%",
-        "Active_AWC_": "Active_AWC_%",
-        "HV_Percentage": "HV_Percentage",
-        "LBW_Rate_": "LBW_Rate_%"
-    }
-
-    # Model’s expected feature order (MUST MATCH training)
-    feature_order = [
-        "Measurement_Efficiency",
-        "SAM_Rate_%",
-        "SUW_Rate_%",
-        "Active_AWC_%",
-        "HV_Percentage",
-        "LBW_Rate_%"
-    ]
+async def predict_stunting(req: PredictRequest):
+    stage = metrics.stage
+
+    with stage("/predict/stunting", "features"):
+        req_dict = req.dict()
+
+        # Map request → proper model features
+        model_input = {}
+        for req_key, req_value in req_dict.items():
+            if req_value is not None and req_key in STUNTING_MAPPING:
+                model_feature = STUNTING_MAPPING[req_key]
+                model_input[model_feature] = req_value
+
+        if not model_input:
+            raise HTTPException(400, "No valid features provided for Stunting prediction.")
+
+        # Build row in correct training order
+        input_row = {
+            col: model_input.get(col, 0)  # missing features become 0
+            for col in STUNTING_FEATURE_ORDER
+        }
+
+    with stage("/predict/stunting", "predict"):
+        snapshot = registry.current
+        y_pred = await _predict_row(
+            snapshot.stunting_model, snapshot.versions["stunting"],
+            [input_row[col] for col in STUNTING_FEATURE_ORDER], STUNTING_FEATURE_ORDER
+        )
 
-    # Map request → proper model features
-    model_input = {}
-    for req_key, req_value in req_dict.items():
-        if req_value is not None and req_key in mapping:
-            model_feature = mapping[req_key]
-            model_input[model_feature] = req_value
+    with stage("/predict/stunting", "serialize"):
+        return _json({
+            "Stunting_Predicted": round(float(y_pred), 2),
+            "features_used": [key for key, value in input_row.items() if value != 0]
+        })
 
-    if not model_input:
-        raise HTTPException(400, "No valid features provided for Stunting prediction.")
 
-    # Build row in correct training order
-    input_row = {
-        col: model_input.get(col, 0)  # missing features become 0
-        for col in feature_order
-    }
+# ---------------------------------------------------------
+# Batch prediction (scenario planning: many what-if rows per call)
+# ---------------------------------------------------------
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
 
-    df = pd.DataFrame([input_row])
-    y_pred = stunting_model.predict(df)[0]
 
-    return {
-        "Stunting_Predicted": round(float(y_pred), 2),
-        "features_used": [key for key, value in input_row.items() if value != 0]
-    }
+def _parse_batch(body: bytes, content_type: str) -> tuple[dict, int]:
+    """
+    Batch request body -> ({request field: [value per row]}, n_rows).
 
+    Accepted bodies:
+      - JSON array of records:  [{"SAM_Rate_": 3.5, ...}, ...]
+      - columnar JSON object:   {"SAM_Rate_": [3.5, 4.1], ...}
+      - NDJSON, one record per line (Content-Type application/x-ndjson)
 
-@app.get("/district/{name}")
-def district_insights(name: str):
-    if cube is None:
+    Field names are PredictRequest's; unknown fields are ignored, as they
+    are by the single-row endpoints.
+    """
+    fields = PredictRequest.model_fields
+    try:
+        if content_type.split(";")[0].strip().lower() in NDJSON_TYPES:
+            payload: Any = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(400, f"Malformed batch body: {e}")
+
+    if isinstance(payload, list):
+        if not all(isinstance(record, dict) for record in payload):
+            raise HTTPException(400, "Every batch record must be a JSON object.")
+        columns = {
+            field: [record.get(field) for record in payload]
+            for field in fields
+            if any(field in record for record in payload)
+        }
+        return columns, len(payload)
+
+    if isinstance(payload, dict):
+        columns = {field: values for field, values in payload.items() if field in fields}
+        if not all(isinstance(values, list) for values in columns.values()):
+            raise HTTPException(400, "Columnar batch fields must be arrays.")
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(400, "Columnar batch arrays must all have the same length.")
+        return columns, lengths.pop() if lengths else 0
+
+    raise HTTPException(400, "Batch body must be an array of records or an object of arrays.")
+
+
+def _feature_matrix(columns: dict, n_rows: int, mapping: dict, feature_order: list) -> tuple:
+    """
+    One (n_rows x features) float matrix in training order. Missing
+    features and null values become 0, as in the single-row endpoints;
+    nested arrays and infinite values are rejected with a 400.
+    Returns (X, names of the features provided with at least one non-zero value).
+    """
+    X = np.zeros((n_rows, len(feature_order)))
+    used = []
+    for req_key, feature in mapping.items():
+        if req_key not in columns:
+            continue
+        try:
+            values = np.array(columns[req_key], dtype=float)
+        except (TypeError, ValueError):
+            raise HTTPException(400, f"Non-numeric value in {req_key}.")
+        if values.ndim != 1:
+            raise HTTPException(400, f"{req_key} values must be numbers, not arrays.")
+        if np.isinf(values).any():
+            raise HTTPException(400, f"Non-finite value in {req_key}.")
+        values = np.where(np.isnan(values), 0.0, values)
+        col = feature_order.index(feature)
+        X[:, col] = values
+        if values.any():
+            used.append(feature)
+    return X, [f for f in feature_order if f in used]
+
+
+async def _predict_batch(request: Request, model, mapping: dict, feature_order: list, label: str):
+    endpoint = request.scope["route"].path
+    stage = metrics.stage
+
+    with stage(endpoint, "parse"):
+        columns, n_rows = _parse_batch(await request.body(), request.headers.get("content-type", ""))
+        if n_rows == 0:
+            raise HTTPException(400, "Batch is empty.")
+
+    with stage(endpoint, "features"):
+        X, used = _feature_matrix(columns, n_rows, mapping, feature_order)
+        if not used:
+            raise HTTPException(400, f"No valid {label} features provided.")
+
+    # One predict call for the whole batch, on the inference pool.
+    with stage(endpoint, "predict"):
+        y_pred = await inference.predict(model, X, feature_order)
+
+    with stage(endpoint, "serialize"):
+        return _json({
+            f"{label}_Predicted": [round(v, 2) for v in y_pred.tolist()],
+            "count": n_rows,
+            "features_used": used,
+        })
+
+
+@app.post("/predict/lbw/batch")
+async def predict_lbw_batch(request: Request):
+    return await _predict_batch(request, registry.current.lbw_model, LBW_MAPPING, LBW_FEATURE_ORDER, "LBW")
+
+
+@app.post("/predict/stunting/batch")
+async def predict_stunting_batch(request: Request):
+    return await _predict_batch(request, registry.current.stunting_model, STUNTING_MAPPING, STUNTING_FEATURE_ORDER,
+                                "Stunting")
+
+
+def _locate_district(name: str, snapshot: Snapshot) -> tuple[DistrictIndex, int]:
+    district_index = snapshot.district_index
+
+    if snapshot.cube is None:
         raise HTTPException(500, "Cube not loaded.")
 
-    name_clean = name.strip().lower()
-
-    if "District" not in cube.columns:
+    if district_index is None:
         raise HTTPException(500, "District column not found in cube.")
 
-    normalized = cube["District"].astype(str).str.strip().str.lower()
+    pos = district_index.lookup(name)
 
-    matches = cube[normalized == name_clean]
-
-    if matches.empty:
-        matches = cube[normalized.str.contains(name_clean, na=False)]
-
-    if matches.empty:
-        available = sorted(cube["District"].dropna().unique())
+    if pos is None:
         raise HTTPException(
             404,
-            f"District '{name}' not found. Available districts: {', '.join(available)}"
+            f"District '{name}' not found. Available districts: {', '.join(district_index.available)}"
         )
 
-    row = matches.iloc[0].to_dict()
+    return district_index, pos
+
+
+def _find_district(name: str, snapshot: Snapshot | None = None) -> dict:
+    district_index, pos = _locate_district(name, snapshot or registry.current)
+    return district_index.rows[pos]
+
+
+# The district responses are serialized once per cube load (see
+# api/district_index.py); a request is a lookup and a bytes write.
+@app.get("/district/{name}")
+async def district_insights(name: str):
+    district_index, pos = _locate_district(name, registry.current)
+    return Response(district_index.row_json[pos], media_type="application/json")
+
+
+@app.get("/district/{name}/predictions")
+async def district_predictions(name: str):
+    """
+    LBW / stunting predictions at the district's current indicator values.
+    Served from the table models_runner precomputes for the loaded models
+    and cube; only if that table is missing or stale are the models run
+    (on the district's cube row, through the prediction cache).
+    """
+    snapshot = registry.current
+    row = _find_district(name, snapshot)
+    district = row.get("District")
+
+    if snapshot.predictions is not None and district in snapshot.predictions:
+        predicted = snapshot.predictions[district]
+        source = "precomputed"
+    else:
+        predicted = {
+            "LBW_Predicted": await _predict_district(
+                row, snapshot.lbw_model, snapshot.versions["lbw"], LBW_FEATURE_ORDER),
+            "Stunting_Predicted": await _predict_district(
+                row, snapshot.stunting_model, snapshot.versions["stunting"], STUNTING_FEATURE_ORDER),
+        }
+        source = "online"
+
+    return {
+        "district": district,
+        **{key: None if value is None else round(float(value), 2) for key, value in predicted.items()},
+        "source": source,
+        "versions": snapshot.versions,
+    }
+
+
+@app.get("/district/{name}/explain")
+async def district_explain(name: str):
+    """
+    Why the district's LBW / stunting predictions are what they are: the
+    models' baseline plus each feature's contribution, largest first.
+    Computed for every district when the models and cube load (or by
+    models_runner), so a request is a lookup.
+    """
+    snapshot = registry.current
+    district = _find_district(name, snapshot).get("District")
+
+    if snapshot.explanations is None:
+        raise HTTPException(503, "District explanations are not available for the loaded models.")
+    explanation = snapshot.explanations.get(district)
+    if explanation is None:
+        raise HTTPException(404, f"No explanation for '{district}': it is missing model features in the cube.")
+    return Response(explanation, media_type="application/json")
+
+
+async def _predict_district(row: dict, model, version: str, feature_order: list) -> float | None:
+    # Like the runner, no prediction for a district missing any feature.
+    values = [row.get(col) for col in feature_order]
+    if any(v is None for v in values):
+        return None
+    return await _predict_row(model, version, values, feature_order)
 
-    # ⭐ FIX: Convert all values into JSON-safe types
-    clean_row: dict[str, Any] = {}
-    for key, value in row.items():
-        if pd.isna(value):
-            clean_row[key] = None
-        elif hasattr(value, "item"):  # numpy types
-            clean_row[key] = value.item()
-        else:
-            clean_row[key] = value
 
-    return clean_row
 # ---------------------------------------------------------
-# NEW: Structured District Insights (Includes 0–5 Data)
+# Bulk cube query: many districts, only the columns asked for
 # ---------------------------------------------------------
-@app.get("/district_structured/{name}")
-def district_structured(name: str):
+@app.post("/cube/query")
+def cube_query(query: CubeQuery):
+    cube = registry.current.cube
     if cube is None:
         raise HTTPException(500, "Cube not loaded.")
 
-    # Normalize input name
-    name_clean = name.strip().lower()
-    normalized = cube["District"].astype(str).str.strip().str.lower()
+    try:
+        result = run_query(cube, query)
+    except QueryError as e:
+        raise HTTPException(400, str(e))
 
-    # Exact match
-    matches = cube[normalized == name_clean]
+    return StreamingResponse(
+        ENCODERS[query.format](result),
+        media_type=MEDIA_TYPES[query.format],
+        headers={"X-Result-Rows": str(len(result))},
+    )
 
-    # Partial match fallback
-    if matches.empty:
-        matches = cube[normalized.str.contains(name_clean, na=False)]
 
-    if matches.empty:
-        available = sorted(cube["District"].dropna().unique())
-        raise HTTPException(
-            404,
-            f"District '{name}' not found. Available districts: {', '.join(available)}"
-        )
+# ---------------------------------------------------------
+# NEW: Structured District Insights (Includes 0–5 Data)
+# ---------------------------------------------------------
+@app.get("/district_structured/{name}")
+async def district_structured(name: str):
+    district_index, pos = _locate_district(name, registry.current)
+    return Response(district_index.structured_json[pos], media_type="application/json")
 
-    row = matches.iloc[0].to_dict()
 
-    # JSON-safe type conversion
-    clean_row = {
-        k: (None if pd.isna(v) else (v.item() if hasattr(v, "item") else v))
-        for k, v in row.items()
-    }
+@app.get("/cache/stats")
+def cache_stats():
+    return prediction_cache.stats()
 
-    # ---------------------------
-    # STRUCTURED OUTPUT FORMAT
-    # ---------------------------
-    response = {
-        "district": clean_row.get("District"),
-
-        "stunting_5_6": {
-            "stunting_pct": clean_row.get("Stunting_Total_%"),
-            "underweight_pct": clean_row.get("Underweight_Total_%"),
-            "measurement_efficiency": clean_row.get("Measurement_Efficiency"),
-        },
-
-        "stunting_0_5": {
-            "stunting_pct": clean_row.get("Stunting_Total_Pct_0_5"),
-            "underweight_pct": clean_row.get("Underweight_Total_Pct_0_5"),
-            "measurement_coverage": clean_row.get("Measurement_Coverage_Pct_0_5"),
-        },
-
-        "maternal_indicators": {
-            "pw_anaemia_rate": clean_row.get("PW_Anaemia_Rate"),
-            "optimum_weight_gain": clean_row.get("Optimum_WG_Latest_%"),
-        },
-
-        "service_delivery": {
-            "home_visit_pct": clean_row.get("HV_Percentage"),
-            "active_awc_pct": clean_row.get("Active_AWC_%"),
-        },
-
-        "raw": clean_row  # returns all 150+ fields
-    }
 
-    return response
+@app.get("/metrics")
+def metrics_endpoint():
+    if not metrics.enabled:
+        raise HTTPException(404, "Metrics are disabled (API_METRICS=0).")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
+# ---------------------------------------------------------
+# Admin: pick up new models / cube without a restart
+# ---------------------------------------------------------
+@app.post("/admin/reload")
+def admin_reload(force: bool = False, x_admin_token: str | None = Header(default=None)):
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(403, "Invalid admin token.")
+
+    try:
+        reloaded = registry.reload(force=force)
+    except Exception as e:
+        raise HTTPException(500, f"Reload failed, still serving the previous version: {e}")
+
+    snapshot = registry.current
+    return {
+        "reloaded": reloaded,
+        "version": snapshot_version(snapshot),
+        "artifacts": snapshot.versions,
+    }
@@ -0,0 +1,204 @@
+# api/metrics.py
+"""
+Request and stage metrics for the API, served at GET /metrics in the
+Prometheus text format (version 0.0.4).
+
+- MetricsMiddleware (plain ASGI) records, per route template, a request
+  counter by status, a latency histogram, and the number of requests in
+  flight. Latency covers the whole response, streamed bodies included.
+- Metrics.stage(endpoint, stage) times one step of a handler
+  ("parse", "features", "predict", "serialize") into a histogram.
+- Metrics.collect(fn) registers a callback read at scrape time, for
+  values kept elsewhere (e.g. the prediction cache's hit/miss counters).
+
+With Metrics(enabled=False) the middleware isn't installed, stage() hands
+back one shared no-op context manager, and nothing is recorded.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Iterable
+
+# Seconds; the API's requests run from tens of microseconds (cached
+# lookups) to a second or so (large batches).
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_NO_OP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)  # first bucket with value <= bound
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: list = []
+        self._collectors: list = []
+
+        self.requests = self.add(Counter(
+            "api_requests_total", "Requests handled, by route and status.", ("method", "endpoint", "status")))
+        self.latency = self.add(Histogram(
+            "api_request_duration_seconds", "Time to send the full response.", ("method", "endpoint")))
+        self.in_flight = self.add(Gauge(
+            "api_requests_in_flight", "Requests currently being handled."))
+        self.stages = self.add(Histogram(
+            "api_stage_duration_seconds", "Time spent in one stage of a handler.", ("endpoint", "stage")))
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self, fn: Callable[[], Iterable[tuple]]):
+        """
+        Register fn, called at scrape time, returning
+        (name, kind, help, value) tuples for unlabelled counters/gauges.
+        """
+        self._collectors.append(fn)
+
+    def stage(self, endpoint: str, stage: str):
+        """Context manager timing one handler stage (a shared no-op when disabled)."""
+        if not self.enabled:
+            return _NO_OP
+        return _StageTimer(self.stages, (endpoint, stage))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            for name, kind, help, value in fn():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests into metrics."""
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # if the app fails before starting a response
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_flight.dec()
+            # Route template, not the raw path: one series per endpoint.
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            metrics.requests.inc(scope["method"], endpoint, str(status))
+            metrics.latency.observe(elapsed, scope["method"], endpoint)
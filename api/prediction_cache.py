@@ -0,0 +1,210 @@
+# api/prediction_cache.py
+"""
+Cache of single-row prediction results.
+
+Dashboards send the same district feature vectors to /predict/* over and
+over; a forest's output for a given model and input never changes, so it
+is computed once. Entries are keyed on the model version (the sha of the
+model file, from the registry snapshot) plus the feature values in
+training order, and kept in an in-process LRU with a TTL.
+
+With a SqliteStore behind it, misses in this process fall through to a
+local sqlite file that every uvicorn worker on the machine shares, so a
+vector computed by one worker is a hit for the others. The async
+endpoints use get_async / put_async, which never touch sqlite on the event
+loop: store reads are awaited on a dedicated store thread, and store
+writes are queued to it without waiting (write-back), so a slow or locked
+database delays only the predictions that missed memory, not the loop.
+
+The API clears the cache whenever the registry swaps in new models; keys
+carry the model version regardless, so an entry written by a worker that
+hasn't reloaded yet can never be served for a different model.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def cache_key(version: str, row) -> tuple:
+    """(model version, feature values as floats): 3, 3.0 and np.float64(3) share a key."""
+    return (version, tuple(float(v) for v in row))
+
+
+class SqliteStore:
+    """Prediction results in a sqlite file, shared between processes."""
+
+    def __init__(self, path: Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " version TEXT NOT NULL, features TEXT NOT NULL, value REAL NOT NULL,"
+                " expires REAL NOT NULL, PRIMARY KEY (version, features))"
+            )
+
+    @staticmethod
+    def _features(key: tuple) -> str:
+        return ",".join(repr(v) for v in key[1])
+
+    def get(self, key: tuple) -> float | None:
+        with self._lock:
+            hit = self._conn.execute(
+                "SELECT value FROM predictions WHERE version = ? AND features = ? AND expires > ?",
+                (key[0], self._features(key), time.time()),
+            ).fetchone()
+        return None if hit is None else hit[0]
+
+    def put(self, key: tuple, value: float, expires: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                (key[0], self._features(key), value, expires),
+            )
+
+    def prune(self, keep_versions=()):
+        """Drop expired entries and entries for model versions not in keep_versions."""
+        keep = list(keep_versions)
+        marks = ",".join("?" * len(keep))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM predictions WHERE expires <= ? OR version NOT IN ({marks})",
+                [time.time(), *keep],
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _write_back(store: SqliteStore, key: tuple, value: float, expires: float):
+    try:
+        store.put(key, value, expires)
+    except sqlite3.Error as e:  # the entry is still cached in memory
+        print(f"[API] Prediction cache store write failed: {e}")
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0, store: SqliteStore | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        # One thread: the store serializes on its single connection anyway.
+        self._store_thread = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="prediction-store") if store is not None else None
+        )
+        self._entries: OrderedDict = OrderedDict()  # key -> (value, expires), LRU first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _get_memory(self, key: tuple) -> float | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            if self.store is None:
+                self.misses += 1
+        return None
+
+    def _stored(self, key: tuple, value: float | None) -> float | None:
+        """Account for (and remember) the store's answer to a memory miss."""
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value, time.time() + self.ttl)
+        return value
+
+    def get(self, key: tuple) -> float | None:
+        if not self.enabled:
+            return None
+        value = self._get_memory(key)
+        if value is not None or self.store is None:
+            return value
+        return self._stored(key, self.store.get(key))
+
+    async def get_async(self, key: tuple) -> float | None:
+        """get, reading the store on the store thread instead of the event loop."""
+        if not self.enabled:
+            return None
+        value = self._get_memory(key)
+        if value is not None or self.store is None:
+            return value
+        loop = asyncio.get_running_loop()
+        return self._stored(key, await loop.run_in_executor(self._store_thread, self.store.get, key))
+
+    def put(self, key: tuple, value: float):
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires)
+        if self.store is not None:
+            self.store.put(key, value, expires)
+
+    def put_async(self, key: tuple, value: float):
+        """put, queueing the store write to the store thread without waiting for it."""
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires)
+        if self.store is not None and self._store_thread is not None:
+            self._store_thread.submit(_write_back, self.store, key, value, expires)
+
+    def close(self):
+        """Finish queued store writes and close the store."""
+        if self._store_thread is not None:
+            self._store_thread.shutdown(wait=True)
+        if self.store is not None:
+            self.store.close()
+
+    def _remember(self, key: tuple, value: float, expires: float):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self, keep_versions=()):
+        """
+        Forget everything in memory; the shared store keeps only entries
+        for keep_versions (the model versions now being served).
+        """
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.prune(keep_versions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "shared_store": self.store is not None,
+            }
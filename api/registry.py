@@ -0,0 +1,279 @@
+# api/registry.py
+"""
+Hot-reloadable models + cube for the API.
+
+Everything a request needs (both models, the cube, its district index) is
+loaded together into one immutable Snapshot. ArtifactRegistry.current is
+a plain attribute read, and a reload builds the next Snapshot completely
+before replacing that one reference, so:
+
+- a request that has taken `registry.current` keeps using that version
+  for its whole lifetime, even if a reload lands meanwhile;
+- no request ever waits on (or sees) a half-loaded model or cube.
+
+Reloads happen from a watcher thread polling the artifacts' mtimes/sizes
+(start_watcher) or on demand (POST /admin/reload).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import joblib
+import orjson
+import pandas as pd
+
+from analytics.compact_forest import CompactForest, RoutedForest, compact_path, current_export
+from analytics.explain import EXPLANATIONS_NAME, district_explanations, explanation_table
+from analytics.predictions import (PREDICTIONS_NAME, is_current, load_versioned_table, metadata_path,
+                                   model_version, prediction_lookup)
+from api.district_index import DistrictIndex
+from utils.warehouse import latest_table, read_table
+
+
+class Snapshot(NamedTuple):
+    lbw_model: Any
+    stunting_model: Any
+    cube: pd.DataFrame | None
+    district_index: DistrictIndex | None
+    predictions: dict | None  # {District: {"LBW_Predicted", "Stunting_Predicted"}}, if current
+    explanations: dict | None  # {District: /district/{name}/explain response bytes}
+    versions: dict      # {"lbw"/"stunting": sha, "cube": file name, "predictions": created, "explanations": source}
+    signature: tuple    # artifact stats this snapshot was loaded from
+    loaded_at: float
+
+
+def _stat(path: Path | None):
+    if path is None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+# How models are loaded: "joblib" (the pickled sklearn forest), "compact"
+# (the memory-mapped arrays models_runner exports, see
+# analytics/compact_forest.py) or "auto" (when the export is of the current
+# joblib file, both: the arrays predict inputs of up to COMPACT_MAX_ROWS
+# rows, sklearn larger batches; joblib alone otherwise).
+MODEL_FORMATS = ("auto", "joblib", "compact")
+COMPACT_MAX_ROWS = 256
+
+
+def _model_stats(path: Path) -> tuple:
+    return (_stat(path), _stat(compact_path(path) / "CURRENT"))
+
+
+def artifact_signature(lbw_path: Path, stunting_path: Path, cube_dir: Path,
+                       predictions_dir: Path | None = None) -> tuple:
+    """Cheap fingerprint of what load_snapshot would load: path, mtime, size per artifact."""
+    cube_file = latest_table(cube_dir, "district_cube_")
+    predictions_dir = predictions_dir or lbw_path.parent
+    return (_model_stats(lbw_path), _model_stats(stunting_path), _stat(cube_file), *_table_stats(predictions_dir))
+
+
+def _table_stats(predictions_dir: Path) -> tuple:
+    return tuple(_stat(metadata_path(predictions_dir, name)) for name in (PREDICTIONS_NAME, EXPLANATIONS_NAME))
+
+
+# Models already loaded, by (kind, content version). Versions are content
+# hashes, so a reload that lands on a version still held (only the cube
+# changed, an alias moved back) reuses the object instead of loading it
+# again. Holds about two snapshots' worth.
+_LOADED: OrderedDict = OrderedDict()
+_LOADED_MAX = 4
+
+
+def _load_once(kind: str, version: str, load: Callable[[], Any]) -> Any:
+    if version == "unknown":  # nothing to key on
+        return load()
+    key = (kind, version)
+    if key in _LOADED:
+        _LOADED.move_to_end(key)
+    else:
+        _LOADED[key] = load()
+        while len(_LOADED) > _LOADED_MAX:
+            _LOADED.popitem(last=False)
+    return _LOADED[key]
+
+
+def load_model(path: Path, model_format: str = "auto", compact_max_rows: int = COMPACT_MAX_ROWS) -> tuple[Any, str]:
+    """(model, version) for the model saved at path, in the given MODEL_FORMATS format."""
+    if model_format not in MODEL_FORMATS:
+        raise ValueError(f"Unknown model format: {model_format} (expected one of {MODEL_FORMATS})")
+
+    exported = current_export(compact_path(path))
+    if model_format == "compact":
+        if exported is None:
+            raise RuntimeError(f"❌ No compact export of {path.name}. Run models_runner.py first.")
+        return _load_once("compact", exported, lambda: CompactForest.load(compact_path(path))), exported
+
+    if not path.exists():
+        raise RuntimeError("❌ Trained models not found. Run models_runner.py first.")
+    version = model_version(path)
+    model = _load_once("joblib", version, lambda: joblib.load(path))
+    if model_format == "auto" and exported is not None and exported == version:
+        compact = _load_once("compact", exported, lambda: CompactForest.load(compact_path(path)))
+        model = RoutedForest(compact, model, compact_max_rows)
+    return model, version
+
+
+def _current_table(predictions_dir: Path, name: str, versions: dict) -> tuple[pd.DataFrame, dict] | None:
+    """The runner's saved table name, if there is one made from exactly these models and cube."""
+    loaded = load_versioned_table(predictions_dir, name)
+    if loaded is not None and not is_current(loaded[1], versions):
+        print(f"[API] Precomputed {name} table is stale for the loaded models/cube; computing online instead.")
+        return None
+    return loaded
+
+
+def _current_predictions(predictions_dir: Path, versions: dict) -> tuple[dict | None, str | None]:
+    """The runner's precomputed predictions, if made from exactly these models and cube."""
+    loaded = _current_table(predictions_dir, PREDICTIONS_NAME, versions)
+    if loaded is None:
+        return None, None
+    table, metadata = loaded
+    return prediction_lookup(table), metadata.get("created")
+
+
+def _explanations(predictions_dir: Path, versions: dict, models: dict,
+                  cube: pd.DataFrame | None) -> tuple[dict | None, str | None]:
+    """
+    {District: explain response bytes} and where they came from: the
+    runner's table when it was made from exactly these models and cube,
+    otherwise one pass of the models over the cube's rows.
+    """
+    loaded = _current_table(predictions_dir, EXPLANATIONS_NAME, versions)
+    if loaded is not None:
+        table, source = loaded[0], "precomputed"
+    elif cube is not None and "District" in cube.columns:
+        try:
+            explained = {}
+            for name, model in models.items():
+                features = [str(f) for f in model.feature_names_in_]
+                explained[name] = (model, cube[features].dropna())
+            table = explanation_table(cube["District"], explained)
+        except Exception as e:  # e.g. a model that isn't a forest
+            print(f"[API] District explanations unavailable: {e}")
+            return None, None
+        source = "online"
+    else:
+        return None, None
+
+    versions = {**versions, "explanations": source}
+    return {
+        district: orjson.dumps({"district": district, **{t: by_target.get(t) for t in models},
+                                "source": source, "versions": versions})
+        for district, by_target in district_explanations(table).items()
+    }, source
+
+
+def load_snapshot(lbw_path: Path, stunting_path: Path, cube_dir: Path,
+                  predictions_dir: Path | None = None, model_format: str = "auto",
+                  compact_max_rows: int = COMPACT_MAX_ROWS) -> Snapshot:
+    """
+    Load both models (see MODEL_FORMATS), the newest district_cube_* table
+    under cube_dir and the runner's precomputed district predictions and
+    explanations (predictions_dir, default: the models' folder).
+    """
+    lbw_model, lbw_version = load_model(lbw_path, model_format, compact_max_rows)
+    stunting_model, stunting_version = load_model(stunting_path, model_format, compact_max_rows)
+
+    # Load cube (for district insights)
+    cube_file = latest_table(cube_dir, "district_cube_")
+    cube = read_table(cube_file) if cube_file is not None else None
+    district_index = (
+        DistrictIndex(cube) if cube is not None and "District" in cube.columns else None
+    )
+
+    versions = {
+        "lbw": lbw_version,
+        "stunting": stunting_version,
+        "cube": cube_file.name if cube_file is not None else None,
+    }
+    predictions_dir = predictions_dir or lbw_path.parent
+    predictions, versions["predictions"] = _current_predictions(predictions_dir, versions)
+    explanations, versions["explanations"] = _explanations(
+        predictions_dir, versions, {"lbw": lbw_model, "stunting": stunting_model}, cube)
+
+    return Snapshot(
+        lbw_model=lbw_model,
+        stunting_model=stunting_model,
+        cube=cube,
+        district_index=district_index,
+        predictions=predictions,
+        explanations=explanations,
+        versions=versions,
+        signature=(_model_stats(lbw_path), _model_stats(stunting_path), _stat(cube_file),
+                   *_table_stats(predictions_dir)),
+        loaded_at=time.time(),
+    )
+
+
+def snapshot_version(snapshot: Snapshot) -> str:
+    """One short id for a whole snapshot (models + cube)."""
+    payload = "|".join(f"{k}={v}" for k, v in sorted(snapshot.versions.items()))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class ArtifactRegistry:
+    def __init__(self, load: Callable[[], Snapshot], signature: Callable[[], tuple]):
+        self._load = load
+        self._signature = signature
+        self._reload_lock = threading.Lock()
+        self._listeners: list[Callable[[Snapshot], None]] = []
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._snapshot = load()
+
+    @property
+    def current(self) -> Snapshot:
+        return self._snapshot
+
+    def on_reload(self, listener: Callable[[Snapshot], None]):
+        """Call listener(new_snapshot) after every successful swap."""
+        self._listeners.append(listener)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load the artifacts again and swap them in. Without force, nothing
+        happens unless an artifact changed on disk. Returns whether a new
+        snapshot was swapped in; a failed load raises and leaves the
+        current snapshot serving.
+        """
+        with self._reload_lock:  # one reload at a time; readers never take it
+            if not force and self._signature() == self._snapshot.signature:
+                return False
+            snapshot = self._load()
+            self._snapshot = snapshot
+
+        for listener in self._listeners:
+            listener(snapshot)
+        return True
+
+    def start_watcher(self, interval: float):
+        """Poll for changed artifacts every `interval` seconds on a daemon thread."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.reload():
+                        print(f"[API] Reloaded artifacts: {self._snapshot.versions}")
+                except Exception as e:
+                    print(f"[API] Reload failed, still serving the previous version: {e}")
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name="artifact-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -1,6 +1,8 @@
 # api/schemas.py
 
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 class PredictRequest(BaseModel):
     PW_Anaemia_Rate: float | None = None
@@ -12,3 +14,25 @@ class PredictRequest(BaseModel):
     SUW_Rate_: float | None = None
     Active_AWC_: float | None = None
     LBW_Rate_: float | None = None
+
+
+# ---------------------------------------------------------
+# /cube/query
+# ---------------------------------------------------------
+class CubeFilter(BaseModel):
+    column: str
+    op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "contains"]
+    value: float | str | list[float | str]
+
+
+class CubeSort(BaseModel):
+    column: str
+    descending: bool = False
+
+
+class CubeQuery(BaseModel):
+    columns: list[str] | None = None        # projection; None = every column
+    filters: list[CubeFilter] = []          # ANDed together
+    sort: list[CubeSort] = []
+    limit: int | None = Field(default=None, ge=0)
+    format: Literal["json", "csv", "arrow"] = "json"
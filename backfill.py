@@ -0,0 +1,179 @@
+"""
+Multi-month backfill.
+
+etl.run_month, cubes.run_cube and pipeline.py each process the latest
+month only. run_backfill runs the single-pass pipeline
+(pipeline.run_pipeline_for_month) for a range of months, one month per
+worker process:
+
+    python backfill.py                         # every month under data/
+    python backfill.py --from 2024-01 --to 2025-11
+    python backfill.py --missing               # months without a cube yet
+
+Months are isolated from each other: a month that fails (bad export,
+worker crash) is retried up to --retries times in a fresh process and
+reported at the end without stopping the rest. Every table is written
+under a temporary name and moved into place (utils.warehouse.write_table),
+and a month's manifests are written only after its tables, so a month
+interrupted mid-write is simply reprocessed by the next run.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+import argparse
+import os
+
+import etl.run_month as run_month
+from cubes.run_cube import record_cube
+from etl.manifest import inputs_digest, load_manifest
+from etl.run_month import RAW_DATA_DIR, WAREHOUSE_DIR
+from pipeline import run_pipeline_for_month
+from utils.files import MONTH_PATTERN, get_month_folders
+from utils.warehouse import table_path
+
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", str(os.cpu_count() or 1)))
+BACKFILL_RETRIES = int(os.getenv("BACKFILL_RETRIES", "2"))
+
+
+class MonthOutcome(NamedTuple):
+    month: str
+    ok: bool
+    attempts: int
+    changed: list      # ETL sources reprocessed for this month
+    error: str | None
+
+
+def select_months(raw_root: Path, start: str | None = None, end: str | None = None,
+                  missing_only: bool = False, cubes_out_dir: Path | None = None,
+                  fmt: str | None = None) -> list:
+    """
+    Month tags (YYYY-MM) under raw_root, oldest first, limited to
+    start..end inclusive. missing_only keeps the months that have no cube
+    in cubes_out_dir yet.
+    """
+    for bound in (start, end):
+        if bound is not None and not MONTH_PATTERN.match(bound):
+            raise ValueError(f"Expected a YYYY-MM month, got {bound!r}")
+
+    months = sorted(p.name for p in get_month_folders(Path(raw_root)))
+    months = [
+        m for m in months
+        if (start is None or m >= start) and (end is None or m <= end)
+    ]
+    if missing_only:
+        if cubes_out_dir is None:
+            raise ValueError("missing_only needs cubes_out_dir")
+        months = [
+            m for m in months
+            if not table_path(cubes_out_dir, f"district_cube_{m}", fmt).exists()
+        ]
+    return months
+
+
+def _init_worker():
+    # Months are the unit of parallelism: don't also fan each month's file
+    # loads out across every core.
+    run_month.LOAD_WORKERS = 1
+
+
+def _backfill_month(month: str, raw_root, warehouse_dir, fmt, force) -> list:
+    warehouse_dir = Path(warehouse_dir)
+    run = run_pipeline_for_month(
+        Path(raw_root) / month, warehouse_dir / "etl" / month, warehouse_dir / "cubes",
+        fmt, force, record_cube=False,
+    )
+    run.wait()
+    return run.changed
+
+
+def _run_round(months: list, args: tuple, workers: int):
+    """Yield (month, changed, error) for each month, as months finish."""
+    if workers <= 1 or len(months) <= 1:
+        for month in months:
+            try:
+                yield month, _backfill_month(month, *args), None
+            except Exception as e:
+                yield month, [], f"{type(e).__name__}: {e}"
+        return
+
+    # A fresh pool per round, so a worker crash (which breaks the whole
+    # pool) only costs the months still in flight one attempt.
+    with ProcessPoolExecutor(max_workers=min(workers, len(months)),
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(_backfill_month, month, *args): month for month in months}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], [], f"{type(e).__name__}: {e}"
+
+
+def run_backfill(months: list, raw_root: Path = RAW_DATA_DIR, warehouse_dir: Path = WAREHOUSE_DIR,
+                 fmt: str | None = None, force: bool = False,
+                 workers: int = BACKFILL_WORKERS, retries: int = BACKFILL_RETRIES) -> dict:
+    """
+    Run the pipeline for every month in months, `workers` months at a time
+    (1 = sequentially, in this process). Failed months are retried up to
+    `retries` more times. Returns {month: MonthOutcome}, in months order.
+    """
+    cubes_out_dir = Path(warehouse_dir) / "cubes"
+    args = (str(raw_root), str(warehouse_dir), fmt, force)
+    outcomes: dict = {}
+    pending = list(months)
+
+    for attempt in range(1, retries + 2):
+        if not pending:
+            break
+        if attempt > 1:
+            print(f"[BACKFILL] Retrying {len(pending)} month(s), attempt {attempt} of {retries + 1}")
+
+        failed = []
+        for month, changed, error in _run_round(pending, args, workers):
+            if error is None:
+                # Workers leave the shared cube manifest alone; recorded
+                # here, one month at a time.
+                digest = inputs_digest(load_manifest(Path(warehouse_dir) / "etl" / month))
+                out_name = table_path(cubes_out_dir, f"district_cube_{month}", fmt).name
+                record_cube(cubes_out_dir, month, digest, out_name)
+                print(f"[BACKFILL] {month} done ({len(changed)} sources reprocessed)")
+            else:
+                print(f"[BACKFILL] {month} failed: {error}")
+                failed.append(month)
+            outcomes[month] = MonthOutcome(month, error is None, attempt, changed, error)
+        pending = sorted(failed)
+
+    return {month: outcomes[month] for month in months}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ETL + cube for many months in parallel.")
+    parser.add_argument("--from", dest="start", help="first month to process (YYYY-MM)")
+    parser.add_argument("--to", dest="end", help="last month to process (YYYY-MM)")
+    parser.add_argument("--missing", action="store_true",
+                        help="only months that don't have a cube yet")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS,
+                        help="months processed at once (default: BACKFILL_WORKERS or CPU count)")
+    parser.add_argument("--retries", type=int, default=BACKFILL_RETRIES,
+                        help="extra attempts for a failed month")
+    parser.add_argument("--force", action="store_true",
+                        help="reprocess every source and rebuild every cube")
+    args = parser.parse_args()
+
+    months = select_months(RAW_DATA_DIR, args.start, args.end, args.missing, WAREHOUSE_DIR / "cubes")
+    if not months:
+        print("[BACKFILL] No months to process.")
+        return
+    print(f"[BACKFILL] {len(months)} month(s): {months[0]} .. {months[-1]}")
+
+    outcomes = run_backfill(months, force=args.force, workers=args.workers, retries=args.retries)
+
+    failed = [o for o in outcomes.values() if not o.ok]
+    print(f"[BACKFILL] {len(outcomes) - len(failed)} succeeded, {len(failed)} failed")
+    for o in failed:
+        print(f"  {o.month}: {o.error} (after {o.attempts} attempts)")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
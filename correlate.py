@@ -1,5 +1,5 @@
-import pandas as pd
 from analytics.correlations import correlation_report
+from utils.warehouse import read_table
 
 CUBE = "district_cube_2025_11.csv"
 
@@ -19,7 +19,7 @@ cols = [
 
 
 def main():
-    df = pd.read_csv(CUBE)
+    df = read_table(CUBE, columns=cols)
     correlation_report(df, cols)
 
 if __name__ == "__main__":
@@ -1,30 +1,17 @@
-import os
 import pandas as pd
 
-from etl.gm_0_5 import analyze_gm_0_5
-from etl.gm_5_6 import analyze_gm_5_6
-from etl.anaemia import analyze_anaemia
-from etl.lbw import analyze_lbw
-from etl.gwg import analyze_gwg
-from etl.adolescent_girls import analyze_adolescent_girls
-from etl.measuring_efficiency import analyze_me
-from etl.home_visit import analyze_home_visit
-from etl.snp import analyze_snp
-from etl.awc_summary import analyze_awc_summary
+from utils.cleaner import normalize_columns
+from utils.warehouse import list_tables
+
+from etl.indicators import analyze, evaluate, match_sources
+from etl.specs import SPECS
 
 
 # ---------------------------------------------------
 # Helper to standardize columns for district-level merges
 # ---------------------------------------------------
 def standardize_columns(df):
-    df = df.copy()
-    df.columns = (
-        df.columns.str.strip()
-                  .str.lower()
-                  .str.replace(" ", "_")
-                  .str.replace("__", "_")
-    )
-    return df
+    return normalize_columns(df.copy(deep=False))
 
 
 def clean_district(df):
@@ -50,48 +37,93 @@ def clean_district(df):
 # ---------------------------------------------------
 # Build Cube
 # ---------------------------------------------------
+def _resolve_sources(names, where) -> dict:
+    sources = match_sources(SPECS, names)
+    missing = [spec.key for spec in SPECS if spec.key not in sources]
+    if missing:
+        raise FileNotFoundError(f"No source table for {missing} in {where}")
+    return sources
+
+
+def align_join(tables: dict, on: str = "district") -> pd.DataFrame:
+    """
+    Left-join every table in `tables` ({"source": DataFrame}, in order) onto
+    the first one by `on`, in a single aligned concat rather than one merge
+    (and one full copy of the growing cube) per table.
+
+    Each table is keyed by a categorical index sharing the anchor's
+    categories, so aligning it to the anchor's rows is a lookup on integer
+    codes. Column names that appear in more than one table are prefixed
+    with their source ("snp_total_pw", "gwg_total_pw") instead of picking
+    up merge's _x/_y suffixes. Apart from those names the result is what
+    chained `merge(how="left")` calls would produce, except that a
+    non-anchor table with repeated keys is an error rather than a silent
+    row multiplication.
+    """
+    (anchor_name, anchor), *rest = tables.items()
+
+    seen: dict = {}
+    for df in tables.values():
+        for col in df.columns.drop(on):
+            seen[col] = seen.get(col, 0) + 1
+    collisions = {col for col, n in seen.items() if n > 1}
+
+    def prefixed(name, df):
+        return df.rename(columns={c: f"{name}_{c}" for c in collisions if c in df.columns})
+
+    categories = pd.Index(anchor[on]).unique()
+    index = pd.CategoricalIndex(anchor[on], categories=categories, name=on)
+    aligned = [prefixed(anchor_name, anchor).set_axis(index)]
+
+    for name, df in rest:
+        print(f"Joining {name} …")
+        df = df[df[on].isin(categories)]
+        if df[on].duplicated().any():
+            raise ValueError(f"{name} has more than one row per {on}; cannot align it to the cube")
+        keyed = prefixed(name, df).drop(columns=on).set_axis(
+            pd.CategoricalIndex(df[on], categories=categories, name=on)
+        )
+        aligned.append(keyed.reindex(index))
+
+    cube = pd.concat(aligned, axis=1)
+    cube.index = pd.RangeIndex(len(cube))
+    return cube
+
+
+def _join(dfs: dict) -> pd.DataFrame:
+    # First spec is the anchor: its districts are the cube's rows
+    cube = align_join({spec.key: dfs[spec.key] for spec in SPECS})
+    print("\n=== District Intelligence Cube Built Successfully ===")
+    return cube
+
+
 def build_district_cube(month_folder):
     print("\n=== Building District Intelligence Cube ===")
 
-    # Get list of available cleaned CSV files dynamically
-    files = {f.lower(): os.path.join(month_folder, f) for f in os.listdir(month_folder)}
-
-    # Mapping cleaned filenames to analyses
-    paths = {
-        "gm_0_5": files.get("(0_to_5_years)_growth_monitoring_11_2025.csv".lower()),
-        "gm_5_6": files.get("(5_to_6_years)_growth_monitoring_11_2025.csv".lower()),
-        "anaemia": files.get("anaemia_11_2025.csv".lower()),
-        "lbw": files.get("low_birth_weight_11_2025.csv".lower()),
-        "gwg": files.get("gestational_weight_gain_report_11_2025.csv".lower()),
-        "ag": files.get("adolescent_girls_(14_18_years)_11_2025.csv".lower()),
-        "me": files.get("measuring_efficiency_children_0_to_6_years_11_2025.csv".lower()),
-        "hv": files.get("home_visit_11_2025.csv".lower()),
-        "snp": files.get("snp_projections_12_2025.csv".lower()),
-        "awc": files.get("awc_11_2025.csv".lower()),
-    }
+    # Available tables, whatever format they were written in, paired with
+    # the indicator spec whose source pattern they match
+    tables = list_tables(month_folder, extra_extensions=(".xlsx", ".xls"))
+    sources = _resolve_sources(tables, month_folder)
 
     # Load and clean datasets
     dfs = {
-        "gm_5_6": clean_district(analyze_gm_5_6(paths["gm_5_6"])),
-        "gm_0_5": clean_district(analyze_gm_0_5(paths["gm_0_5"])),
-        "anaemia": clean_district(analyze_anaemia(paths["anaemia"])),
-        "lbw": clean_district(analyze_lbw(paths["lbw"])),
-        "gwg": clean_district(analyze_gwg(paths["gwg"])),
-        "ag": clean_district(analyze_adolescent_girls(paths["ag"])),
-        "me": clean_district(analyze_me(paths["me"])),
-        "hv": clean_district(analyze_home_visit(paths["hv"])),
-        "snp": clean_district(analyze_snp(paths["snp"])),
-        "awc": clean_district(analyze_awc_summary(paths["awc"])),
+        spec.key: clean_district(analyze(spec, str(tables[sources[spec.key]])))
+        for spec in SPECS
     }
+    return _join(dfs)
 
-    # Start merging on district
-    cube = dfs["gm_5_6"]
 
-    for key, df in dfs.items():
-        if key == "gm_5_6":
-            continue
-        print(f"Merging {key} …")
-        cube = cube.merge(df, on="district", how="left")
+def build_cube_from_frames(frames: dict):
+    """
+    build_district_cube over tables already in memory, {"name": DataFrame}
+    keyed by source/table name (e.g. etl.run_month.prepare_month's cleaned
+    frames), so nothing is re-read from disk. The frames are not modified.
+    """
+    print("\n=== Building District Intelligence Cube (in memory) ===")
 
-    print("\n=== District Intelligence Cube Built Successfully ===")
-    return cube
+    sources = _resolve_sources(frames, "the given tables")
+    dfs = {
+        spec.key: clean_district(evaluate(spec, frames[sources[spec.key]]))
+        for spec in SPECS
+    }
+    return _join(dfs)
@@ -1,14 +1,93 @@
 from pathlib import Path
+import argparse
 import os
-import pandas as pd
 
 from utils.files import get_latest_month_folder
+from utils.warehouse import table_path, write_table
 from cubes.district_cube import build_district_cube
+from etl.manifest import inputs_digest, load_manifest, save_manifest
 
 WAREHOUSE_DIR = Path(os.getenv("WAREHOUSE_DIR", "warehouse"))
 
 
+def cube_is_current(cubes_out_dir: Path, month_tag: str, digest: str | None,
+                    fmt: str | None = None) -> bool:
+    """
+    True when cubes_out_dir already holds month_tag's cube, built from ETL
+    inputs with this digest (etl.manifest.inputs_digest). A None digest
+    (inputs that can't be proven unchanged) is never current.
+    """
+    cubes_out_dir = Path(cubes_out_dir)
+    out_name = table_path(cubes_out_dir, f"district_cube_{month_tag}", fmt).name
+    previous = load_manifest(cubes_out_dir)["files"].get(month_tag, {})
+    return (
+        digest is not None and
+        previous.get("inputs") == digest and
+        previous.get("output") == out_name and
+        (cubes_out_dir / out_name).exists()
+    )
+
+
+def record_cube(cubes_out_dir: Path, month_tag: str, digest: str | None, out_name: str):
+    """Note in the cube manifest that out_name was built from inputs with this digest."""
+    cube_manifest = load_manifest(cubes_out_dir)
+    cube_manifest["files"][month_tag] = {"inputs": digest, "output": out_name}
+    save_manifest(cubes_out_dir, cube_manifest)
+
+
+def save_cube(cube_df, cubes_out_dir: Path, month_tag: str, digest: str | None,
+              fmt: str | None = None, record: bool = True) -> Path:
+    """
+    Write the cube and (record=True) record the inputs it was built from in
+    the cube manifest. The manifest is shared by every month, so callers
+    writing several months concurrently pass record=False and call
+    record_cube from a single process.
+    """
+    cubes_out_dir = Path(cubes_out_dir)
+    # Where cube output will be stored
+    cubes_out_dir.mkdir(parents=True, exist_ok=True)
+
+    out_file = write_table(cube_df, cubes_out_dir, f"district_cube_{month_tag}", fmt)
+    print(f"[CUBE] Cube exported: {out_file}")
+
+    if record:
+        record_cube(cubes_out_dir, month_tag, digest, out_file.name)
+    return out_file
+
+
+def run_cube_for_month(etl_folder: Path, cubes_out_dir: Path, fmt: str | None = None,
+                       force: bool = False):
+    """
+    Build the district cube for one ETL month folder and write it to
+    cubes_out_dir/district_cube_<month>.
+
+    The rebuild is skipped when the month's ETL manifest is unchanged since
+    the cube was last built and that cube is still on disk (force=True
+    rebuilds anyway). Returns the cube path, or None if it was skipped.
+    """
+    etl_folder = Path(etl_folder)
+    month_tag = etl_folder.name
+
+    etl_manifest = load_manifest(etl_folder)
+    # An ETL folder without a manifest (e.g. hand-copied CSVs) can't be
+    # proven unchanged, so it always rebuilds.
+    digest = inputs_digest(etl_manifest) if etl_manifest["files"] else None
+
+    if not force and cube_is_current(cubes_out_dir, month_tag, digest, fmt):
+        print(f"[CUBE] Upstream tables unchanged for {month_tag} — keeping the existing cube")
+        return None
+
+    print(f"[CUBE] Building district cube using {etl_folder}")
+    cube_df = build_district_cube(str(etl_folder))
+    return save_cube(cube_df, cubes_out_dir, month_tag, digest, fmt)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Build the district cube for the latest ETL month.")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild even if no upstream table changed")
+    args = parser.parse_args()
+
     etl_root = WAREHOUSE_DIR / "etl"
 
     print("[CUBE] Detecting latest ETL output month...")
@@ -16,17 +95,7 @@ def main():
     month_tag = latest_etl_folder.name
     print(f"[CUBE] Latest ETL month: {month_tag}")
 
-    print(f"[CUBE] Building district cube using {latest_etl_folder}")
-    cube_df = build_district_cube(str(latest_etl_folder))
-
-    # Where cube output will be stored
-    cubes_out_dir = WAREHOUSE_DIR / "cubes"
-    cubes_out_dir.mkdir(parents=True, exist_ok=True)
-
-    out_file = cubes_out_dir / f"district_cube_{month_tag}.csv"
-
-    cube_df.to_csv(out_file, index=False)
-    print(f"[CUBE] Cube exported: {out_file}")
+    run_cube_for_month(latest_etl_folder, WAREHOUSE_DIR / "cubes", force=args.force)
 
 
 if __name__ == "__main__":
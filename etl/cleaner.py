@@ -1,20 +1,38 @@
+import numpy as np
 import pandas as pd
 
+from utils.cleaner import normalize_columns
+from utils.warehouse import open_table_writer
+
+# Rows per chunk for clean_file_streaming.
+STREAM_CHUNK_ROWS = 100_000
+
+# Geography columns that repeat a handful of values across every row.
+CATEGORY_COLUMNS = ("district", "block", "project", "sector")
+
+# Any other string column whose distinct/total ratio is at or below this
+# is stored as category too.
+CATEGORY_MAX_RATIO = 0.5
+
+
 def standardize_column_names(df: pd.DataFrame):
     """
-    Normalize column names:
-    - lower case
-    - replace spaces with underscores
-    - strip whitespace
-    """
-    df = df.copy()
-    df.columns = (
-        df.columns.str.strip()
-                  .str.lower()
-                  .str.replace(" ", "_")
-                  .str.replace("__", "_")
-    )
-    return df
+    Normalize column names (utils.cleaner.normalize_header):
+    - strip whitespace, lower case
+    - "%" -> "pct", other punctuation and spaces -> single underscores
+    """
+    return normalize_columns(df.copy(deep=False))
+
+
+def _strip_string_columns(df: pd.DataFrame):
+    """
+    Strip whitespace in every string column, in place. Missing cells stay
+    missing rather than becoming the text "nan", so a column read as all-NaN
+    float in one chunk and as strings in the next holds the same values.
+    """
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        values = df[col]
+        df[col] = values.astype(str).str.strip().where(values.notna())
 
 
 def basic_clean(df: pd.DataFrame):
@@ -25,25 +43,121 @@ def basic_clean(df: pd.DataFrame):
     """
     df = standardize_column_names(df)
 
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].astype(str).str.strip()
+    _strip_string_columns(df)
 
     df = df.drop_duplicates()
 
     return df
 
 
-def clean_all(raw_dict: dict):
+def optimize_dtypes(df: pd.DataFrame, category_columns=CATEGORY_COLUMNS,
+                    max_category_ratio: float = CATEGORY_MAX_RATIO):
+    """
+    Shrink a cleaned table's in-memory footprint:
+    - string columns in category_columns, or with few distinct values
+      relative to their length, become `category`
+    - integer columns whose range fits become int32
+
+    Floats are left as float64: downcasting them to float32 would change
+    the ratios the analyze_* step derives from them, not just their size.
+    Returns a new frame; the input is not modified.
+    """
+    converted = {}
+
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        values = df[col]
+        if col in category_columns or (
+            len(values) > 0 and values.nunique(dropna=False) / len(values) <= max_category_ratio
+        ):
+            converted[col] = values.astype("category")
+
+    int32 = np.iinfo(np.int32)
+    for col in df.select_dtypes(include=["integer"]).columns:
+        values = df[col]
+        if values.dtype.itemsize > 4 and (
+            values.empty or (values.min() >= int32.min and values.max() <= int32.max)
+        ):
+            nullable = isinstance(values.dtype, pd.api.extensions.ExtensionDtype)
+            converted[col] = values.astype("Int32" if nullable else "int32")
+
+    if not converted:
+        return df
+    return df.assign(**converted)
+
+
+def _row_digests(df: pd.DataFrame) -> pd.Series:
+    """
+    64-bit hash per row, stable across chunks. Numeric columns are hashed as
+    float64 so a count column read as int64 in one chunk and float64 in the
+    next (because of a NaN) still hashes equal values identically, and every
+    missing cell hashes to the same value whatever its column's dtype -- an
+    empty text column is float NaN in a chunk where it has no values at all.
+    """
+    numeric = set(df.select_dtypes(include="number").columns)
+    cells = {}
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        if col in numeric:
+            values = values.astype("float64")
+        cells[i] = pd.util.hash_pandas_object(values, index=False).mask(values.isna(), 0)
+    return pd.util.hash_pandas_object(pd.DataFrame(cells), index=False)
+
+
+def clean_file_streaming(path, out_folder, name: str, fmt: str | None = None,
+                         chunksize: int = STREAM_CHUNK_ROWS):
+    """
+    basic_clean for CSVs too large to hold in memory.
+
+    Reads path in chunks of `chunksize` rows, standardizes column names and
+    strips string columns chunk by chunk, drops full-duplicate rows across
+    the whole file using a set of 64-bit row digests (one int per distinct
+    row, not the rows themselves), and appends each cleaned chunk to
+    out_folder/<name> as it goes. Peak memory is one chunk plus the digest
+    set, regardless of file size.
+
+    Returns (rows_written, first_raw_chunk) -- the latter is an empty frame
+    with the source's raw columns and dtypes, for schema fingerprinting.
+    """
+    seen: set[int] = set()
+    rows = 0
+    raw_schema = None
+
+    with open_table_writer(out_folder, name, fmt) as writer:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            if raw_schema is None:
+                raw_schema = chunk.iloc[:0]
+
+            normalize_columns(chunk)
+            _strip_string_columns(chunk)
+
+            digests = _row_digests(chunk)
+            already_seen = np.fromiter((d in seen for d in digests), dtype=bool, count=len(digests))
+            keep = ~digests.duplicated().to_numpy() & ~already_seen
+            seen.update(digests[keep].tolist())
+
+            chunk = chunk[keep]
+            writer.write(chunk)
+            rows += len(chunk)
+
+    print(f"[CLEANER] Streamed {name}: {rows} distinct rows written")
+    return rows, raw_schema if raw_schema is not None else pd.DataFrame()
+
+
+def clean_all(raw_dict: dict, optimize: bool = True):
     """
     Process all loaded files with a safe, generic cleaning pipeline.
     raw_dict = {"filename": DataFrame, ...}
     Returns cleaned_dict with same keys.
+
+    optimize=True also runs optimize_dtypes on every cleaned table.
     """
     cleaned = {}
 
     for name, df in raw_dict.items():
         print(f"[CLEANER] Cleaning {name} ...")
         cleaned[name] = basic_clean(df)
+        if optimize:
+            cleaned[name] = optimize_dtypes(cleaned[name])
 
     print(f"[CLEANER] Cleaned {len(cleaned)} tables.")
     return cleaned
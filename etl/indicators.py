@@ -0,0 +1,292 @@
+"""
+Declarative indicator specs and the engine that evaluates them.
+
+Every monthly report goes through the same steps: normalize headers, map
+them to internal names, derive ratios / sums / shares, tidy the district
+column. An IndicatorSpec describes those steps as data (see etl/specs.py
+for the ten reports the cube uses); `evaluate` runs one spec over one
+table in a single pass. Consecutive ratio-style indicators are computed
+together as one NumPy array operation rather than one pandas expression
+(and set of temporary Series) per column.
+
+Adding a report = adding a spec entry to etl/specs.py.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from etl.loader import load_file
+from utils.cleaner import normalize_header, normalize_name
+
+Columns = Union[str, tuple]
+
+
+# ---------------------------------------------------
+# Derived indicator types
+# ---------------------------------------------------
+@dataclass(frozen=True)
+class Ratio:
+    """
+    out = num / den * scale
+
+    num may be a tuple of columns, summed first. Division by zero gives
+    +/-inf (replaced by `inf` unless None) and 0/0 or missing inputs give
+    NaN (replaced by `nan` unless None); the result is rounded to
+    `decimals`. The default (inf=0, nan=0) is the pipeline's usual
+    "num / den.replace(0, pd.NA) ... fillna(0)" safe ratio.
+
+    prefer_source=True keeps a value the source already reports under
+    `out` (coerced to numeric) instead of recomputing it.
+    """
+    out: str
+    num: Columns
+    den: str
+    scale: float = 1.0
+    decimals: Optional[int] = 2
+    inf: Optional[float] = 0.0
+    nan: Optional[float] = 0.0
+    prefer_source: bool = False
+
+
+@dataclass(frozen=True)
+class Share:
+    """out = col / col.sum(), i.e. each row's share of the table total."""
+    out: str
+    col: str
+    decimals: Optional[int] = 2
+
+
+@dataclass(frozen=True)
+class Sum:
+    """out = sum of cols (NaN propagates unless fillna, which treats missing as 0)."""
+    out: str
+    cols: tuple
+    decimals: Optional[int] = None
+    fillna: bool = False
+
+
+@dataclass(frozen=True)
+class Score:
+    """
+    out = sum of col * weight over terms, where a column listed in
+    `invert` contributes (1 - col) * weight instead.
+    """
+    out: str
+    terms: tuple
+    invert: tuple = ()
+    decimals: Optional[int] = 3
+
+
+@dataclass(frozen=True)
+class Coerce:
+    """Coerce an existing column to numeric, filling unparseable/missing values."""
+    col: str
+    decimals: Optional[int] = 2
+    fill: float = 0.0
+
+
+Derived = Union[Ratio, Share, Sum, Score, Coerce]
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """
+    key          short name used in the cube build ("gm_0_5", "lbw", ...)
+    title        banner printed when the spec runs
+    source       regex (full match) on the normalized file name stem
+    renames      normalized source column -> internal name
+    rename_patterns  (regex, internal name) pairs for headers that embed
+                 a date or other varying text
+    derived      indicators to compute, in order
+    required     internal columns that must exist after renaming
+    drop_total_row      drop a state-level "Total" rollup row
+    title_case_district strip + title-case the district column
+    """
+    key: str
+    title: str
+    source: str
+    renames: dict = field(default_factory=dict)
+    rename_patterns: tuple = ()
+    derived: tuple = ()
+    required: tuple = ()
+    drop_total_row: bool = False
+    title_case_district: bool = True
+
+    def matches(self, name: str) -> bool:
+        return re.fullmatch(self.source, normalize_name(name)) is not None
+
+
+# ---------------------------------------------------
+# Engine
+# ---------------------------------------------------
+def _as_float(s: pd.Series) -> np.ndarray:
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _as_array(s: pd.Series) -> np.ndarray:
+    # Native numpy dtypes pass through untouched, so integer sums stay integer.
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+        return s.to_numpy(dtype="float64", na_value=np.nan)
+    return s.to_numpy()
+
+
+def _finish(values: np.ndarray, inf=None, nan=None, decimals=None) -> np.ndarray:
+    if inf is not None:
+        values = np.where(np.isinf(values), inf, values)
+    if nan is not None:
+        values = np.where(np.isnan(values), nan, values)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return values
+
+
+def _ratio_batch(df: pd.DataFrame, ops: list):
+    """Evaluate a run of Ratio/Share ops as a single (rows x ops) array computation."""
+    n = len(df)
+    num = np.empty((n, len(ops)))
+    den = np.empty((n, len(ops)))
+    scale = np.ones(len(ops))
+
+    for j, op in enumerate(ops):
+        if isinstance(op, Share):
+            col = _as_float(df[op.col])
+            num[:, j] = col
+            den[:, j] = np.nansum(col)
+        else:
+            cols = (op.num,) if isinstance(op.num, str) else op.num
+            total = _as_float(df[cols[0]])
+            for c in cols[1:]:
+                total = total + _as_float(df[c])
+            num[:, j] = total
+            den[:, j] = _as_float(df[op.den])
+            scale[j] = op.scale
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = num / den * scale
+
+    for j, op in enumerate(ops):
+        inf, nan = (0.0, 0.0) if isinstance(op, Share) else (op.inf, op.nan)
+        result[:, j] = _finish(result[:, j], inf, nan, op.decimals)
+
+    df[[op.out for op in ops]] = result
+
+
+def _apply(df: pd.DataFrame, op):
+    if isinstance(op, Sum):
+        arrays = [_as_array(df[c]) for c in op.cols]
+        if op.fillna:
+            arrays = [np.where(np.isnan(a), 0, a) if a.dtype.kind == "f" else a for a in arrays]
+        total = arrays[0]
+        for a in arrays[1:]:
+            total = total + a
+        df[op.out] = _finish(total, decimals=op.decimals)
+
+    elif isinstance(op, Score):
+        score = np.zeros(0)
+        for i, (col, weight) in enumerate(op.terms):
+            values = _as_float(df[col])
+            term = (1 - values) * weight if col in op.invert else values * weight
+            score = term if i == 0 else score + term
+        df[op.out] = _finish(score, decimals=op.decimals)
+
+    elif isinstance(op, Coerce):
+        df[op.col] = _finish(_as_float(df[op.col]), nan=op.fill, decimals=op.decimals)
+
+    else:
+        raise TypeError(f"Unknown derived indicator: {op!r}")
+
+
+def _is_batchable(op) -> bool:
+    return isinstance(op, Share) or (isinstance(op, Ratio) and not op.prefer_source)
+
+
+def _inputs(op) -> set:
+    if isinstance(op, Share):
+        return {op.col}
+    cols = (op.num,) if isinstance(op.num, str) else op.num
+    return set(cols) | {op.den}
+
+
+def _target_names(spec: IndicatorSpec, columns) -> list:
+    """Normalized + renamed header, resolved in one pass."""
+    names = []
+    for name in normalize_header(tuple(columns)):
+        target = spec.renames.get(name)
+        if target is None:
+            for pattern, internal in spec.rename_patterns:
+                if re.fullmatch(pattern, name):
+                    target = internal
+                    break
+        names.append(target or name)
+    return names
+
+
+def evaluate(spec: IndicatorSpec, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Run spec over a raw (or loader-cleaned) table. The input frame is not
+    modified; a new frame with the internal column names and all derived
+    indicators is returned.
+    """
+    df = df.copy(deep=False)
+    df.columns = _target_names(spec, df.columns)
+
+    if spec.drop_total_row:
+        # Some monthly exports append a state-level "Total" rollup row
+        # after the last district; it isn't a district.
+        df = df[~df["district"].astype(str).str.strip().str.lower().eq("total")]
+
+    missing = [c for c in spec.required if c not in df.columns]
+    if missing:
+        raise KeyError(f"Required {spec.key} columns not found in the dataset: {missing}")
+
+    pending: list = []
+    for op in spec.derived:
+        if isinstance(op, Ratio) and op.prefer_source and op.out in df.columns:
+            op = Coerce(op.out, decimals=op.decimals, fill=op.nan if op.nan is not None else np.nan)
+
+        if _is_batchable(op) and not (_inputs(op) & {p.out for p in pending}):
+            pending.append(op)
+            continue
+
+        if pending:
+            _ratio_batch(df, pending)
+            pending = []
+        if _is_batchable(op):
+            pending.append(op)
+        elif isinstance(op, Ratio):
+            _ratio_batch(df, [op])
+        else:
+            _apply(df, op)
+
+    if pending:
+        _ratio_batch(df, pending)
+
+    if spec.title_case_district:
+        df["district"] = df["district"].astype(str).str.strip().str.title()
+
+    return df
+
+
+def analyze(spec: IndicatorSpec, path: str) -> pd.DataFrame:
+    """Load the file at path and evaluate spec over it."""
+    print(f"\n=== {spec.title} ===")
+    return evaluate(spec, load_file(path))
+
+
+def match_sources(specs, names) -> dict:
+    """
+    Pair each spec with the one table name it matches.
+    Returns {spec.key: name}; specs with no match are left out, and a spec
+    matching several names is an error rather than a silent pick.
+    """
+    matched = {}
+    for spec in specs:
+        hits = [name for name in names if spec.matches(name)]
+        if len(hits) > 1:
+            raise ValueError(f"Several tables match the {spec.key} spec: {hits}")
+        if hits:
+            matched[spec.key] = hits[0]
+    return matched
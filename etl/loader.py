@@ -1,12 +1,22 @@
 import os
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 
+from utils.warehouse import is_table_file, read_table
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls")
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+
 def load_file(path: str):
     ext = os.path.splitext(path)[1].lower()
     if ext == ".csv":
         return pd.read_csv(path)
     elif ext in [".xlsx", ".xls"]:
         return pd.read_excel(path)
+    elif is_table_file(path):
+        return read_table(path)
     else:
         raise ValueError(f"Unsupported file type: {ext}")
 
@@ -19,20 +29,70 @@ def inspect_df(df: pd.DataFrame):
         "preview": df.head().to_dict()
     }
 
-def load_all_files(folder):
+def list_source_files(folder):
     """
-    Load all CSV/XLSX files inside the given month folder.
-    Returns a dict: {"filename_without_ext": DataFrame}
+    Return {"filename_without_ext": path} for every CSV/XLSX in folder,
+    sorted by filename so every run sees the same order.
     """
     folder = str(folder)
-    data = {}
+    files = {}
 
-    for fname in os.listdir(folder):
-        if fname.lower().endswith((".csv", ".xlsx", ".xls")):
-            fpath = os.path.join(folder, fname)
+    for fname in sorted(os.listdir(folder)):
+        if fname.lower().endswith(SUPPORTED_EXTENSIONS):
             key = os.path.splitext(fname)[0]  # remove extension
-            print(f"[LOADER] Loading {fname} ...")
+            files[key] = os.path.join(folder, fname)
+
+    return files
+
+
+def load_files(files: dict, max_workers: int = 1):
+    """
+    Load {"name": path} into {"name": DataFrame}, preserving the input order.
+
+    With max_workers > 1, CSVs are read on a thread pool (pandas' C parser
+    releases the GIL) and Excel files on a process pool (openpyxl parsing is
+    pure Python and CPU-bound), so wall time tracks the slowest file rather
+    than the sum of all of them.
+    """
+    if max_workers <= 1 or len(files) <= 1:
+        data = {}
+        for key, fpath in files.items():
+            print(f"[LOADER] Loading {os.path.basename(fpath)} ...")
             data[key] = load_file(fpath)
+        return data
+
+    excel = {k: p for k, p in files.items() if p.lower().endswith(EXCEL_EXTENSIONS)}
+
+    with ExitStack() as stack:
+        threads = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+        procs = None
+        if excel:
+            procs = stack.enter_context(
+                ProcessPoolExecutor(max_workers=min(max_workers, len(excel)))
+            )
+
+        futures = {}
+        for key, fpath in files.items():
+            pool = procs if (procs is not None and key in excel) else threads
+            print(f"[LOADER] Loading {os.path.basename(fpath)} ...")
+            futures[key] = pool.submit(load_file, fpath)
+
+        # Collected in submission order, so the dict order is stable
+        # regardless of which file finishes first.
+        data = {key: fut.result() for key, fut in futures.items()}
+
+    return data
+
+
+def load_all_files(folder, max_workers: int = 1):
+    """
+    Load all CSV/XLSX files inside the given month folder.
+    Returns a dict: {"filename_without_ext": DataFrame}, ordered by filename.
+
+    max_workers > 1 enables concurrent loading (see load_files).
+    """
+    files = list_source_files(folder)
+    data = load_files(files, max_workers=max_workers)
 
     print(f"[LOADER] Loaded {len(data)} files from {folder}")
     return data
@@ -0,0 +1,117 @@
+"""
+Run manifests for incremental ETL.
+
+warehouse/etl/<month>/_manifest.json records, per raw source file, the
+content hash, size, mtime and schema fingerprint it was last processed
+with, plus the warehouse table it produced. A re-run only reloads and
+re-cleans sources whose content changed (or whose output is missing).
+
+warehouse/cubes/_manifest.json records, per month, a digest of the ETL
+manifest the cube was built from, so run_cube can skip a rebuild when no
+upstream table changed.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.warehouse import write_json
+
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's bytes, read in chunks so large exports stay cheap on memory."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """Short hash of a frame's column names and dtypes, in order."""
+    schema = "|".join(f"{col}:{dtype}" for col, dtype in df.dtypes.astype(str).items())
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(folder) -> dict:
+    path = Path(folder) / MANIFEST_NAME
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "files": {}}
+    with open(path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    if manifest.get("version") != MANIFEST_VERSION:
+        # Unknown layout: treat as empty so everything is reprocessed once.
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+
+def save_manifest(folder, manifest: dict):
+    """Write the manifest atomically, so an interrupted run never leaves half a file."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    write_json(folder / MANIFEST_NAME, manifest)
+
+
+def plan_changes(files: dict, manifest: dict, out_folder, output_names: dict):
+    """
+    Compare raw sources against the manifest.
+
+    files        = {"name": raw path}
+    output_names = {"name": expected warehouse filename}
+
+    Returns (changed, entries, removed):
+      changed -> names that must be reprocessed
+      entries -> fresh size/mtime/sha256 for every current source
+      removed -> names in the manifest whose raw file is gone
+
+    Size + mtime matching the manifest is taken as unchanged without
+    hashing; otherwise the file is hashed, so a touched-but-identical
+    export is still skipped.
+    """
+    previous = manifest.get("files", {})
+    out_folder = Path(out_folder)
+    changed, entries = [], {}
+
+    for name, path in files.items():
+        stat = os.stat(path)
+        old = previous.get(name, {})
+        entry = {
+            "source": os.path.basename(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+        if old.get("size") == entry["size"] and old.get("mtime") == entry["mtime"]:
+            entry["sha256"] = old.get("sha256")
+        else:
+            entry["sha256"] = file_digest(path)
+
+        output_ok = (
+            old.get("output") == output_names[name] and
+            (out_folder / output_names[name]).exists()
+        )
+        if entry["sha256"] != old.get("sha256") or not output_ok:
+            changed.append(name)
+        else:
+            entry["schema"] = old.get("schema")
+            entry["output"] = old["output"]
+
+        entries[name] = entry
+
+    removed = [name for name in previous if name not in files]
+    return changed, entries, removed
+
+
+def inputs_digest(manifest: dict) -> str:
+    """Digest of everything a cube build depends on in one month's ETL manifest."""
+    files = manifest.get("files", {})
+    payload = json.dumps(
+        {name: [e.get("sha256"), e.get("schema"), e.get("output")] for name, e in files.items()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -1,9 +1,16 @@
+from concurrent.futures import Executor
 from pathlib import Path
+from typing import NamedTuple
+import argparse
 import os
 
 from utils.files import get_latest_month_folder
-from etl.loader import load_all_files
-from etl.cleaner import clean_all
+from etl.loader import list_source_files, load_files
+from etl.cleaner import clean_all, clean_file_streaming
+from etl.manifest import (
+    MANIFEST_VERSION, load_manifest, plan_changes, save_manifest, schema_fingerprint,
+)
+from utils.warehouse import schema_path, table_path, write_table
 
 # Optional metadata step — safe fallback if file or function does not exist
 try:
@@ -16,17 +23,67 @@ except Exception:
 WAREHOUSE_DIR = Path(os.getenv("WAREHOUSE_DIR", "warehouse"))
 RAW_DATA_DIR = Path("data")
 
+# Concurrent file loading (see etl.loader.load_files); 1 = sequential.
+LOAD_WORKERS = int(os.getenv("ETL_LOAD_WORKERS", str(os.cpu_count() or 1)))
 
-def run_etl_for_month(raw_folder: Path, out_folder: Path):
+# CSVs at or above this size are cleaned chunk by chunk straight to the
+# warehouse (etl.cleaner.clean_file_streaming) instead of being loaded whole.
+STREAM_THRESHOLD_BYTES = int(float(os.getenv("ETL_STREAM_THRESHOLD_MB", "256")) * 1024 * 1024)
+
+
+class MonthChanges(NamedTuple):
+    """What prepare_month found and computed for one month."""
+    changed: list     # names of sources that were (re)processed
+    removed: list     # names whose raw source is gone
+    entries: dict     # manifest entries for every current source
+    cleaned: dict     # {"name": cleaned DataFrame} for the changed, non-streamed sources
+
+
+def prepare_month(raw_folder: Path, out_folder: Path, fmt: str | None = None,
+                  force: bool = False) -> MonthChanges:
     """
-    Core ETL logic:
-    1) Loads all monthly CSVs
-    2) Cleans & harmonizes
-    3) Adds metadata (optional)
-    4) Saves cleaned tables to out_folder
+    Everything run_etl_for_month does except writing the in-memory results:
+    plans changes against the manifest, removes outputs of deleted sources,
+    streams large CSVs straight to the warehouse, and loads, cleans and
+    enriches the rest. The cleaned frames are returned, for save_month (or
+    a caller that wants to use them before they reach disk).
     """
-    print(f"[ETL] Loading data from: {raw_folder}")
-    data_dict = load_all_files(raw_folder)
+    out_folder = Path(out_folder)
+    files = list_source_files(raw_folder)
+    output_names = {name: table_path(out_folder, name, fmt).name for name in files}
+
+    manifest: dict = {"version": MANIFEST_VERSION, "files": {}} if force else load_manifest(out_folder)
+    changed, entries, removed = plan_changes(files, manifest, out_folder, output_names)
+
+    for name in removed:
+        stale = manifest["files"][name].get("output")
+        if stale and (out_folder / stale).exists():
+            print(f"[ETL] Source for {name} is gone — removing {stale}")
+            (out_folder / stale).unlink()
+            schema_path(out_folder / stale).unlink(missing_ok=True)
+
+    if not changed:
+        print(f"[ETL] No source changes in {raw_folder} — nothing to do.")
+        return MonthChanges([], removed, entries, {})
+
+    print(f"[ETL] {len(changed)} of {len(files)} sources changed; loading from: {raw_folder}")
+    out_folder.mkdir(parents=True, exist_ok=True)
+
+    streamed = [
+        name for name in changed
+        if files[name].lower().endswith(".csv") and entries[name]["size"] >= STREAM_THRESHOLD_BYTES
+    ]
+    for name in streamed:
+        # Too large to load whole: cleaned in bounded memory and written as
+        # it goes. The in-memory metadata step doesn't apply to these.
+        print(f"[ETL] Streaming {name} ({entries[name]['size'] / 1e6:.0f} MB) ...")
+        _, raw_schema = clean_file_streaming(files[name], out_folder, name, fmt)
+        entries[name]["schema"] = schema_fingerprint(raw_schema)
+        entries[name]["output"] = output_names[name]
+
+    in_memory = [name for name in changed if name not in streamed]
+    data_dict = load_files({name: files[name] for name in in_memory}, max_workers=LOAD_WORKERS)
+    schemas = {name: schema_fingerprint(df) for name, df in data_dict.items()}
 
     print("[ETL] Cleaning + harmonizing...")
     cleaned = clean_all(data_dict)
@@ -40,24 +97,90 @@ def run_etl_for_month(raw_folder: Path, out_folder: Path):
     else:
         print("[ETL] No metadata enrich step found — skipping.")
 
-    # Save cleaned output
-    out_folder.mkdir(parents=True, exist_ok=True)
+    for name in cleaned:
+        if name in entries:
+            entries[name]["schema"] = schemas[name]
+            entries[name]["output"] = output_names[name]
 
-    print(f"[ETL] Writing cleaned data to {out_folder}")
-    for name, df in cleaned.items():
-        df.to_csv(out_folder / f"{name}.csv", index=False)
+    return MonthChanges(changed, removed, entries, cleaned)
 
-    print(f"[ETL] Completed ETL for {raw_folder.name}")
+
+def _save_after(futures, out_folder, manifest):
+    for future in futures:
+        future.result()
+    save_manifest(out_folder, manifest)
+
+
+def save_month(out_folder: Path, changes: MonthChanges, fmt: str | None = None,
+               executor: Executor | None = None) -> list:
+    """
+    Write prepare_month's cleaned tables to out_folder, then the manifest.
+
+    Without an executor this writes synchronously and returns []. With one,
+    the table writes are submitted to it and their futures returned at once;
+    the manifest is saved (as the last future) only after every table write
+    succeeded, so a failed write is retried on the next run.
+    """
+    out_folder = Path(out_folder)
+    if not changes.changed and not changes.removed:
+        return []
+
+    manifest = {"version": MANIFEST_VERSION, "files": changes.entries}
+    if changes.cleaned:
+        print(f"[ETL] Writing cleaned data to {out_folder}")
+
+    if executor is None:
+        for name, df in changes.cleaned.items():
+            # Sidecar schema keeps optimize_dtypes' choices for CSV exports too.
+            write_table(df, out_folder, name, fmt, schema=True)
+        save_manifest(out_folder, manifest)
+        return []
+
+    writes = [
+        executor.submit(write_table, df, out_folder, name, fmt, schema=True)
+        for name, df in changes.cleaned.items()
+    ]
+    # Queued after the writes: executors start jobs in submission order, so
+    # by the time this one gets a worker every write is already running.
+    return writes + [executor.submit(_save_after, writes, out_folder, manifest)]
+
+
+def run_etl_for_month(raw_folder: Path, out_folder: Path, fmt: str | None = None,
+                      force: bool = False):
+    """
+    Core ETL logic:
+    1) Loads the monthly CSVs that changed since the last run
+    2) Cleans & harmonizes (incl. dtype optimization, etl.cleaner.optimize_dtypes)
+    3) Adds metadata (optional)
+    4) Saves cleaned tables to out_folder (WAREHOUSE_FORMAT, Parquet by
+       default; pass fmt="csv" for a CSV export)
+    5) Records what was processed in out_folder/_manifest.json
+
+    Sources whose content hash matches the manifest (and whose output is
+    still present) are skipped; force=True reprocesses everything.
+    Returns the names of the tables that were (re)written.
+    """
+    changes = prepare_month(raw_folder, out_folder, fmt, force)
+    save_month(out_folder, changes, fmt)
+
+    if changes.changed:
+        print(f"[ETL] Completed ETL for {Path(raw_folder).name}")
+    return changes.changed
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the ETL for the latest month.")
+    parser.add_argument("--force", action="store_true",
+                        help="reprocess every source, ignoring the manifest")
+    args = parser.parse_args()
+
     print("[ETL] Detecting latest month folder...")
     latest_folder = get_latest_month_folder(RAW_DATA_DIR)
     month_tag = latest_folder.name
     print(f"[ETL] Latest month detected: {month_tag}")
 
     out_folder = WAREHOUSE_DIR / "etl" / month_tag
-    run_etl_for_month(latest_folder, out_folder)
+    run_etl_for_month(latest_folder, out_folder, force=args.force)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+"""
+Indicator specs for the ten monthly reports that make up the district cube.
+
+SPECS is in cube merge order: the first entry is the left-join anchor.
+Source patterns match the normalized file stem with any month suffix
+(e.g. "Low_Birth_Weight_11_2025" -> "low_birth_weight_11_2025").
+"""
+from etl.indicators import IndicatorSpec, Ratio, Score, Share, Sum, Coerce
+
+_MONTH = r"_\d{1,2}_\d{4}"
+
+
+def _growth_monitoring(key: str, title: str, source: str, suffix: str, **options) -> IndicatorSpec:
+    """gm_0_5 and gm_5_6 share a layout; only the internal suffix differs."""
+    def s(name):
+        return f"{name}{suffix}"
+
+    return IndicatorSpec(
+        key=key,
+        title=title,
+        source=source,
+        renames={
+            "total_active_children_registered_in_the_awc_for_the_month": s("total_children"),
+            "total_active_children_measured_height_weight_for_the_month": s("measured_children"),
+            "measurement_efficiency_pct": s("measurement_efficiency"),
+            "severely_stunted_n": s("stunted_severe_n"),
+            "severely_stunted_pct": s("stunted_severe_pct"),
+            "moderately_stunted_n": s("stunted_moderate_n"),
+            "moderately_stunted_pct": s("stunted_moderate_pct"),
+            "not_stunted_n": s("stunted_normal_n"),
+            "not_stunted_pct": s("stunted_normal_pct"),
+            "severely_underweight_n": s("underweight_severe_n"),
+            "severely_underweight_pct": s("underweight_severe_pct"),
+            "moderately_underweight_n": s("underweight_moderate_n"),
+            "moderately_underweight_pct": s("underweight_moderate_pct"),
+            "not_underweight_n": s("underweight_normal_n"),
+            "not_underweight_pct": s("underweight_normal_pct"),
+        },
+        derived=(
+            Sum(s("stunting_total_pct"), (s("stunted_severe_pct"), s("stunted_moderate_pct")), decimals=2),
+            Sum(s("underweight_total_pct"), (s("underweight_severe_pct"), s("underweight_moderate_pct")),
+                decimals=2),
+            Ratio(s("measurement_coverage_pct"), s("measured_children"), s("total_children"),
+                  scale=100, inf=None, nan=None),
+            Ratio(s("normal_stunting_ratio"), s("stunted_normal_pct"), s("stunting_total_pct"), nan=None),
+            Ratio(s("normal_underweight_ratio"), s("underweight_normal_pct"), s("underweight_total_pct"),
+                  nan=None),
+        ),
+        **options,
+    )
+
+
+GM_5_6 = _growth_monitoring(
+    "gm_5_6", "Growth Monitoring (5–6 Years) Analysis",
+    rf"5_to_6_years_growth_monitoring{_MONTH}", "",
+    title_case_district=False,
+)
+
+GM_0_5 = _growth_monitoring(
+    "gm_0_5", "Growth Monitoring (0–5 Years) Analysis",
+    rf"0_to_5_years_growth_monitoring{_MONTH}", "_0_5",
+    drop_total_row=True,
+)
+
+ANAEMIA = IndicatorSpec(
+    key="anaemia",
+    title="Anaemia Report Analysis",
+    source=rf"anaemia{_MONTH}",
+    renames={
+        "anaemic": "anaemic_pw",
+        "anaemic_1": "anaemic_lm",
+        "anaemic_2": "anaemic_child",
+        "haemoglobin_measured_of_pw": "hb_measured_pw",
+        "haemoglobin_measured_of_lm": "hb_measured_lm",
+        "haemoglobin_measured_of_children_6months_5_years": "hb_measured_child",
+    },
+    derived=(
+        Ratio("pw_anaemia_rate", "anaemic_pw", "hb_measured_pw"),
+        Ratio("lm_anaemia_rate", "anaemic_lm", "hb_measured_lm"),
+        Ratio("child_anaemia_rate", "anaemic_child", "hb_measured_child"),
+    ),
+)
+
+LBW = IndicatorSpec(
+    key="lbw",
+    title="Low Birth Weight (LBW) Analysis",
+    source=rf"low_birth_weight{_MONTH}",
+    renames={"low_birth_weight_children_0_6m": "lbw_children_0_6m"},
+    required=("total_children_0_6m", "lbw_children_0_6m"),
+    derived=(
+        Ratio("lbw_rate_pct", "lbw_children_0_6m", "total_children_0_6m"),
+    ),
+)
+
+GWG = IndicatorSpec(
+    key="gwg",
+    title="Gestational Weight Gain (GWG) Analysis",
+    source=rf"gestational_weight_gain_report{_MONTH}",
+    renames={
+        "total_active_pregnant_women": "total_pw",
+        "no_of_pw_due_anc_1": "pw_due_anc1",
+        "no_of_pw_completed_anc_1": "pw_completed_anc1",
+        "no_of_pw_due_anc_2": "pw_due_anc2",
+        "no_of_pw_completed_anc_2": "pw_completed_anc2",
+        "no_of_pw_gained_optimum_weight_in_anc_2": "pw_optimum_anc2",
+        "no_of_pw_due_anc_3": "pw_due_anc3",
+        "no_of_pw_completed_anc_3": "pw_completed_anc3",
+        "no_of_pw_gained_optimum_weight_in_anc_3": "pw_optimum_anc3",
+        "no_of_pw_due_anc_4": "pw_due_anc4",
+        "no_of_pw_completed_anc_4": "pw_completed_anc4",
+        "no_of_pw_gained_optimum_weight_in_anc_4": "pw_optimum_anc4",
+        "total_no_of_pw_gained_optimum_weight_as_per_latest_anc": "pw_optimum_latest",
+        "total_haemoglobin_measured_as_per_latest_anc": "pw_hb_measured",
+        "total_anaemic_as_per_latest_anc": "pw_anaemic_latest",
+    },
+    derived=(
+        Ratio("anc1_completion_pct", "pw_completed_anc1", "pw_due_anc1"),
+        Ratio("anc2_completion_pct", "pw_completed_anc2", "pw_due_anc2"),
+        Ratio("anc3_completion_pct", "pw_completed_anc3", "pw_due_anc3"),
+        Ratio("anc4_completion_pct", "pw_completed_anc4", "pw_due_anc4"),
+        Ratio("optimum_wg_latest_pct", "pw_optimum_latest", "total_pw"),
+        Ratio("pw_hb_measured_pct", "pw_hb_measured", "total_pw"),
+        Ratio("pw_anaemia_latest_pct", "pw_anaemic_latest", "pw_hb_measured"),
+    ),
+)
+
+ADOLESCENT_GIRLS = IndicatorSpec(
+    key="ag",
+    title="Adolescent Girls (14–18) Analysis",
+    source=rf"adolescent_girls_14_18_years{_MONTH}",
+    renames={
+        "total_active_ag": "total_ag",
+        "active_ag_measured_height_weight": "ag_measured",
+        "pct_of_ag_measured": "ag_measured_pct",
+        "severely_thin": "ag_severely_thin",
+        "thin": "ag_thin",
+        "normal": "ag_normal",
+        "overweight": "ag_overweight",
+        "obese": "ag_obese",
+        "haemoglobin_measured": "ag_hb_measured",
+        "anaemic": "ag_anaemic",
+    },
+    derived=(
+        Ratio("ag_measured_pct", "ag_measured", "total_ag", prefer_source=True),
+        Sum("ag_underweight", ("ag_severely_thin", "ag_thin"), fillna=True),
+        Ratio("ag_underweight_pct", "ag_underweight", "total_ag"),
+        Ratio("ag_anaemia_rate", "ag_anaemic", "ag_hb_measured"),
+    ),
+)
+
+MEASURING_EFFICIENCY = IndicatorSpec(
+    key="me",
+    title="Measuring Efficiency (0–6 years) Analysis",
+    source=rf"measuring_efficiency_children_0_to_6_years{_MONTH}",
+    renames={
+        "total_active_children": "children_total",
+        "total_active_children_measured": "children_measured",
+        "pct_children_measured": "children_measured_pct",
+        "aww_completed_80pct_of_me": "aww_completed_80pct_me",
+    },
+    derived=(
+        Ratio("measurement_coverage_pct", "children_measured", "children_total"),
+        Share("aww_80pct_me_share", "aww_completed_80pct_me"),
+    ),
+)
+
+HOME_VISIT = IndicatorSpec(
+    key="hv",
+    title="Home Visit Analysis",
+    source=rf"home_visit{_MONTH}",
+    # Home visit headers carry the reporting window
+    # ("..._between_01_30_nov_2025"), so they are matched by prefix.
+    rename_patterns=(
+        (r"total_aww_between_.+", "total_aww"),
+        (r"total_targeted_visits_between_.+", "target_visits"),
+        (r"total_visits_made_between_.+", "visits_made"),
+        (r"pct_of_visits_made_between_.+", "visit_coverage_pct"),
+        (r"aww_completed_60pct_hv_between_.+", "aww_60pct_hv"),
+    ),
+    derived=(
+        Coerce("visit_coverage_pct"),
+        Ratio("aww_60pct_hv_pct", "aww_60pct_hv", "total_aww"),
+    ),
+)
+
+SNP = IndicatorSpec(
+    key="snp",
+    title="SNP Projections Analysis",
+    source=rf"snp_projections{_MONTH}",
+    renames={
+        "total_children_6m_to_3yr": "children_6m_3y",
+        "total_children_3yr_to_5yr": "children_3y_5y",
+        "total_children_5yr_to_6yr": "children_5y_6y",
+        "total_sam_children_6m_to_3yr": "sam_6m_3y",
+        "total_sam_children_3_yr_to_5_yr": "sam_3y_5y",
+        "total_suw_children_6m_to_3yr": "suw_6m_3y",
+        "total_suw_children_3yr_to_6yr": "suw_3y_6y",
+        "total_sam_with_suw_children_6m_3y": "sam_suw_6m_3y",
+        "total_sam_with_suw_children_3y_5y": "sam_suw_3y_5y",
+        "adolescent_girls": "total_ag",
+    },
+    derived=(
+        Sum("children_total", ("children_6m_3y", "children_3y_5y", "children_5y_6y")),
+        Sum("sam_total", ("sam_6m_3y", "sam_3y_5y")),
+        Sum("suw_total", ("suw_6m_3y", "suw_3y_6y")),
+        Sum("sam_suw_total", ("sam_suw_6m_3y", "sam_suw_3y_5y")),
+        Ratio("sam_ratio", "sam_total", "children_total", decimals=3),
+        Ratio("suw_ratio", "suw_total", "children_total", decimals=3),
+        Ratio("sam_suw_ratio", "sam_suw_total", "children_total", decimals=3),
+        Ratio("pw_share_pct", "total_pw", "total_beneficiary"),
+        Ratio("lm_share_pct", "total_lm", "total_beneficiary"),
+        Ratio("ag_share_pct", "total_ag", "total_beneficiary"),
+        Ratio("children_share_pct", "children_total", "total_beneficiary"),
+    ),
+)
+
+AWC_SUMMARY = IndicatorSpec(
+    key="awc",
+    title="AWC Summary Analysis",
+    source=rf"awc{_MONTH}",
+    renames={
+        "total_active_awc": "active_awc",
+        "total_inactive_awc": "inactive_awc",
+        "newly_added_awc_during_month": "new_awc_month",
+        "inactive_awc_during_month": "inactive_awc_month",
+    },
+    derived=(
+        Ratio("active_awc_pct", "active_awc", "total_awc"),
+        Ratio("inactive_awc_pct", "inactive_awc", "total_awc"),
+        # Churn: AWC opening/closing movement relative to the AWC base
+        Ratio("awc_churn_rate", ("new_awc_month", "inactive_awc_month"), "total_awc", decimals=3),
+        # Operational readiness (custom indicator)
+        Score("awc_readiness_score", (("active_awc_pct", 0.8), ("inactive_awc_pct", 0.2)),
+              invert=("inactive_awc_pct",)),
+    ),
+)
+
+SPECS = (
+    GM_5_6,
+    GM_0_5,
+    ANAEMIA,
+    LBW,
+    GWG,
+    ADOLESCENT_GIRLS,
+    MEASURING_EFFICIENCY,
+    HOME_VISIT,
+    SNP,
+    AWC_SUMMARY,
+)
+
+SPECS_BY_KEY = {spec.key: spec for spec in SPECS}
@@ -4,12 +4,24 @@ Run predictive models using district_cube_*.csv
 Cube file exists in the project root (not in /cubes/).
 """
 
+import argparse
+
 import pandas as pd
-import joblib
+import sklearn
 from pathlib import Path
 from datetime import datetime
 
-from analytics.models import predict_lbw, predict_stunting
+from analytics import tuning
+from analytics.explain import explanation_table, save_explanation_table
+from analytics.longitudinal import CUBE_DIR, cube_months, load_state, read_cube, save_state, update_targets
+from analytics.model_registry import PRODUCTION, ModelRegistry, input_key
+from analytics.models import TARGETS
+from analytics.predictions import save_prediction_table
+from analytics.training import reuse_target, train_targets
+from etl.manifest import file_digest
+from utils.warehouse import latest_table, read_table
+
+MODEL_REGISTRY = ModelRegistry()
 
 
 # ---------------------------------------------------------
@@ -17,34 +29,51 @@ from analytics.models import predict_lbw, predict_stunting
 # ---------------------------------------------------------
 def load_latest_cube():
     """
-    Loads district_cube_*.csv from project ROOT.
+    Loads the newest district_cube_* table (Parquet, Feather or CSV) from
+    project ROOT.
     Example: district_cube_2025_11.csv
     """
-    root_path = Path(".")
-    cube_files = sorted(root_path.glob("district_cube_*.csv"))
+    latest = latest_table(Path("."), "district_cube_")
 
-    if not cube_files:
-        raise FileNotFoundError("❌ No district_cube_*.csv found in project root.")
+    if latest is None:
+        raise FileNotFoundError("❌ No district_cube_* table found in project root.")
 
-    latest = cube_files[-1]
     print(f"\n📌 Loading cube: {latest.name}")
 
-    df = pd.read_csv(latest)
+    df = read_table(latest)
     print(f"   → Loaded {df.shape[0]} rows, {df.shape[1]} columns")
 
-    return df, latest.name
+    return df, latest
 
 
 # ---------------------------------------------------------
-# Save model
+# Save model (to the model registry, see analytics/model_registry.py)
 # ---------------------------------------------------------
-def save_model(model, name: str):
-    models_path = Path("models")
-    models_path.mkdir(exist_ok=True)
-
-    save_path = models_path / f"{name}.joblib"
-    joblib.dump(model, save_path)
-    print(f"   ✔ Model saved: {save_path}")
+def save_model(model, name: str, metadata: dict, version: str | None = None) -> Path:
+    """
+    Register model as a version of target `name` (unless it already is
+    `version`) and make it production; returns its object file.
+    """
+    if version is None:
+        version = MODEL_REGISTRY.register(name, model, metadata)
+    MODEL_REGISTRY.set_alias(name, PRODUCTION, version)
+    path = MODEL_REGISTRY.object_path(name, version)
+    print(f"   ✔ Model registered: {name} {version} ({PRODUCTION}) -> {path}")
+    return path
+
+
+def _model_metadata(result, cube_name: str, cube_digest: str, mode: str, **extra) -> dict:
+    return {
+        "target": result.target.target_col,
+        "features": [str(c) for c in result.X.columns],
+        "cube": cube_name,
+        "cube_digest": cube_digest,
+        "mode": mode,
+        "n_estimators": len(result.model.estimators_),
+        "metrics": getattr(result.model, "holdout_scores_", None),
+        "train_seconds": round(getattr(result, "train_seconds", 0.0), 3),
+        **extra,
+    }
 
 
 # ---------------------------------------------------------
@@ -54,7 +83,7 @@ def save_predictions(df: pd.DataFrame, cube_name: str):
     Path("cubes").mkdir(exist_ok=True)  # ensure folder exists
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    output_name = f"predictions_{cube_name.replace('.csv','')}_{timestamp}.csv"
+    output_name = f"predictions_{Path(cube_name).stem}_{timestamp}.csv"
     output_path = Path("cubes") / output_name
 
     df.to_csv(output_path, index=False)
@@ -64,34 +93,157 @@ def save_predictions(df: pd.DataFrame, cube_name: str):
 # ---------------------------------------------------------
 # Runner
 # ---------------------------------------------------------
-def run_all_models():
+def _save_models_and_predictions(df: pd.DataFrame, cube_name: str, trained: dict, metadata: dict,
+                                 registered: dict | None = None) -> pd.DataFrame:
+    """
+    Register each trained model ({name: metadata} for the registry; models
+    reused from the registry are {name: version} in registered) and write
+    df's predictions (per-run CSV + the API's tables).
+    """
+    predicted = {}
+    model_paths = {}
+    for name, result in trained.items():
+        model_paths[name] = save_model(result.model, name, metadata[name], (registered or {}).get(name))
+        predicted[result.target.prediction_col] = pd.Series(result.model.predict(result.X), index=result.X.index)
+    # Rows a model couldn't score (missing features) get NaN.
+    df = pd.concat([df, pd.DataFrame(predicted, index=df.index)], axis=1)
+
+    # --- Save predictions -------------------------------------------
+    save_predictions(df, cube_name)
+
+    # Versioned per-district table the API serves at /district/{name}/predictions
+    model_paths = {key: model_paths[key] for key in ("lbw", "stunting")}
+    table_path = save_prediction_table(df, Path("models"), cube_name, model_paths)
+    print(f"📁 District prediction table saved: {table_path}")
+
+    # Per-feature contributions behind each prediction, for /district/{name}/explain
+    explained = {result.target.name: (result.model, result.X) for result in trained.values()}
+    table_path = save_explanation_table(explanation_table(df["District"], explained), Path("models"),
+                                        cube_name, model_paths)
+    print(f"📁 District explanation table saved: {table_path}")
+    return df
+
+
+def _training_key(df: pd.DataFrame, target, cube_digest: str, tune: bool) -> str:
+    """input_key of training target on this cube; a match in the registry means nothing changed."""
+    return input_key(
+        cube=cube_digest,
+        target=target.target_col,
+        features=[c for c in target.features if c in df.columns],
+        tune=tune,
+        param_grid=tuning.PARAM_GRID if tune else None,
+        sklearn=sklearn.__version__,
+    )
+
+
+def run_all_models(tune: bool = False, force: bool = False):
     print("\n======================================")
     print("      RUNNING PREDICTIVE MODELS")
     print("======================================\n")
 
-    df, cube_name = load_latest_cube()
+    df, cube_path = load_latest_cube()
+    cube_digest = file_digest(cube_path)
+
+    # A target whose training inputs match a registered version reuses it.
+    keys = {name: _training_key(df, target, cube_digest, tune) for name, target in TARGETS.items()}
+    trained, reused = {}, {}
+    for name, key in keys.items():
+        version = None if force else MODEL_REGISTRY.find(name, key)
+        if version is not None:
+            print(f"⏭  {name}: same cube and settings as registered version {version}, not retraining")
+            trained[name] = reuse_target(df, TARGETS[name], MODEL_REGISTRY.load(name, version))
+            reused[name] = version
+
+    # --- Every other registered target (LBW, stunting, ...) in parallel ---
+    todo = [name for name in keys if name not in trained]
+    if todo:
+        print("\n🚀 Training models...")
+        trained.update(train_targets(df, names=todo, tune=tune))
+    trained = {name: trained[name] for name in keys}
+
+    mode = "tuned" if tune else "latest"
+    metadata = {name: _model_metadata(result, cube_path.name, cube_digest, mode, input_key=keys[name])
+                for name, result in trained.items()}
+    df = _save_models_and_predictions(df, cube_path.name, trained, metadata, reused)
 
-    # --- LBW Model --------------------------------------------------
-    print("\n🚀 Training LBW Model...")
-    lbw_model, X_lbw, y_lbw = predict_lbw(df)
-    save_model(lbw_model, "lbw_model")
-    df["LBW_Predicted"] = lbw_model.predict(X_lbw)
+    print("\n======================================")
+    print("   ✔ ALL MODELS TRAINED SUCCESSFULLY")
+    print("======================================\n")
 
-    # --- Stunting Model ---------------------------------------------
-    print("\n🚀 Training Stunting Model...")
-    stunting_model, X_st, y_st = predict_stunting(df)
-    save_model(stunting_model, "stunting_model")
-    df["Stunting_Predicted"] = stunting_model.predict(X_st)
+    return df
 
-    # --- Save predictions -------------------------------------------
-    save_predictions(df, cube_name)
 
+def run_longitudinal(cube_dir: Path = CUBE_DIR, serve_dir: Path = Path(".")):
+    """
+    Monthly refresh over every cube in cube_dir: extend each target's
+    forest with trees for the months it hasn't seen (analytics/longitudinal.py)
+    instead of retraining on the latest cube alone.
+
+    The district prediction and explanation tables are computed on, and
+    tagged with, the newest cube in serve_dir -- the one the API serves
+    (API_CUBE_DIR) -- so the API uses them rather than recomputing online.
+    """
     print("\n======================================")
-    print("   ✔ ALL MODELS TRAINED SUCCESSFULLY")
+    print("   UPDATING LONGITUDINAL MODELS")
+    print("======================================\n")
+
+    months = cube_months(cube_dir)
+    if not months:
+        raise FileNotFoundError(f"❌ No district_cube_* table found in {cube_dir}.")
+    latest = list(months.values())[-1]
+    print(f"\n📌 {len(months)} monthly cube(s) in {cube_dir}, latest: {latest.name}")
+
+    # Each target's forest is extended from its current production version.
+    model_paths = {
+        name: MODEL_REGISTRY.path(name) or Path("models") / f"{target.model_name}.joblib"
+        for name, target in TARGETS.items()
+    }
+    updates = update_targets(cube_dir, Path("models"), model_paths=model_paths)
+    metadata = {
+        name: _model_metadata(update, latest.name, file_digest(latest), "longitudinal",
+                              months=[block["month"] for block in update.state["months"]])
+        for name, update in updates.items()
+    }
+
+    # The API only uses district tables tagged with the cube it serves.
+    served = latest_table(serve_dir, "district_cube_") or latest
+    df = read_cube(served)
+    if any(c not in df.columns for update in updates.values() for c in update.state["features"]):
+        print(f"⚠️  No district_cube_* table with every model feature in {serve_dir}; "
+              f"tagging the district tables with {latest.name}")
+        served, df = latest, read_cube(latest)
+    scored = {name: update._replace(X=df[update.state["features"]].dropna()) for name, update in updates.items()}
+    df = _save_models_and_predictions(df, served.name, scored, metadata)
+
+    # Record what each saved forest holds only once the models are registered.
+    state = load_state(Path("models"))
+    for name, update in updates.items():
+        state[name] = {**update.state, "model": MODEL_REGISTRY.resolve(name)}
+    print(f"📁 Longitudinal state saved: {save_state(Path('models'), state)}")
+
+    print("\n======================================")
+    print("   ✔ ALL MODELS UPDATED SUCCESSFULLY")
     print("======================================\n")
 
     return df
 
 
 if __name__ == "__main__":
-    run_all_models()
+    parser = argparse.ArgumentParser(description="Train the predictive models on the latest cube.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--tune", action="store_true",
+                      help="pick hyperparameters by cross-validated successive halving first")
+    mode.add_argument("--longitudinal", action="store_true",
+                      help="add trees for new months to forests over every monthly cube in --cube-dir")
+    parser.add_argument("--force", action="store_true",
+                        help="retrain even when the registry has a model trained on identical inputs")
+    parser.add_argument("--cube-dir", type=Path, default=CUBE_DIR,
+                        help=f"monthly district_cube_* tables for --longitudinal (default: {CUBE_DIR})")
+    parser.add_argument("--serve-dir", type=Path, default=Path("."),
+                        help="folder of the district_cube_* table the API serves (API_CUBE_DIR) for "
+                             "--longitudinal's district tables (default: .)")
+    args = parser.parse_args()
+    if args.longitudinal:
+        run_longitudinal(args.cube_dir, args.serve_dir)
+    else:
+        run_all_models(tune=args.tune, force=args.force)
@@ -0,0 +1,123 @@
+"""
+End-to-end ETL + cube build for one month in a single pass.
+
+Running etl.run_month and then cubes.run_cube writes every cleaned table
+to the warehouse and immediately reads it back (twice: once per analyzer
+load). run_pipeline_for_month hands the cleaned frames from the ETL step
+straight to the cube build instead, and writes the warehouse artifacts
+(cleaned tables, manifests, the cube) on a background thread pool, so the
+cube is available as soon as it is computed.
+
+Tables that didn't change since the last run are the only ones read from
+the warehouse, as are large CSVs the ETL streamed straight to disk.
+"""
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+import argparse
+import os
+
+import pandas as pd
+
+from cubes.district_cube import build_cube_from_frames
+from cubes.run_cube import cube_is_current, save_cube
+from etl.indicators import match_sources
+from etl.manifest import inputs_digest
+from etl.run_month import RAW_DATA_DIR, WAREHOUSE_DIR, prepare_month, save_month
+from etl.specs import SPECS
+from utils.files import get_latest_month_folder
+from utils.warehouse import read_table, table_path
+
+# Threads for background warehouse writes (pyarrow releases the GIL while encoding).
+WRITE_WORKERS = int(os.getenv("PIPELINE_WRITE_WORKERS", "4"))
+
+
+class PipelineRun(NamedTuple):
+    cube: pd.DataFrame
+    changed: list     # ETL sources that were (re)processed
+    pending: list     # futures of the background warehouse writes
+
+    def wait(self):
+        """Block until every warehouse write has finished; re-raises the first failure."""
+        for future in self.pending:
+            future.result()
+
+
+def run_pipeline_for_month(raw_folder: Path, etl_folder: Path, cubes_out_dir: Path,
+                           fmt: str | None = None, force: bool = False,
+                           executor: Executor | None = None,
+                           record_cube: bool = True) -> PipelineRun:
+    """
+    ETL raw_folder into etl_folder and build its district cube into
+    cubes_out_dir, without reading back what was just cleaned.
+
+    Returns as soon as the cube is built; call .wait() on the result before
+    relying on the warehouse files (the CLI does). Writes go to `executor`
+    (a thread pool) if given, otherwise to a private pool of WRITE_WORKERS
+    threads.
+    Incremental behaviour matches etl.run_month / cubes.run_cube: unchanged
+    sources are not reprocessed, and an up-to-date cube is read from disk
+    rather than rebuilt (force=True redoes both). record_cube=False leaves
+    the shared cube manifest to the caller (see cubes.run_cube.save_cube).
+    """
+    etl_folder = Path(etl_folder)
+    cubes_out_dir = Path(cubes_out_dir)
+    month_tag = etl_folder.name
+
+    own_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=WRITE_WORKERS,
+                                      thread_name_prefix="warehouse-writer")
+    try:
+        changes = prepare_month(raw_folder, etl_folder, fmt, force)
+        etl_writes = save_month(etl_folder, changes, fmt, executor)
+
+        digest = inputs_digest({"files": changes.entries})
+        if not force and cube_is_current(cubes_out_dir, month_tag, digest, fmt):
+            print(f"[PIPELINE] Upstream tables unchanged for {month_tag} — loading the existing cube")
+            cube = read_table(table_path(cubes_out_dir, f"district_cube_{month_tag}", fmt))
+            return PipelineRun(cube, changes.changed, etl_writes)
+
+        # Cube inputs: this run's cleaned frames, plus whatever is already
+        # in the warehouse (unchanged or streamed sources).
+        needed = match_sources(SPECS, changes.entries).values()
+        frames = {
+            name: changes.cleaned[name] if name in changes.cleaned
+            else read_table(etl_folder / changes.entries[name]["output"])
+            for name in needed
+        }
+        cube = build_cube_from_frames(frames)
+
+        # The cube manifest records the ETL digest, so it must not land
+        # before the ETL writes it depends on.
+        def write_cube():
+            for future in etl_writes:
+                future.result()
+            return save_cube(cube, cubes_out_dir, month_tag, digest, fmt, record=record_cube)
+
+        return PipelineRun(cube, changes.changed, etl_writes + [executor.submit(write_cube)])
+    finally:
+        if own_executor:
+            # Queued writes still run; this only stops new submissions.
+            executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ETL + cube build for the latest month in one pass.")
+    parser.add_argument("--force", action="store_true",
+                        help="reprocess every source and rebuild the cube")
+    args = parser.parse_args()
+
+    latest_folder = get_latest_month_folder(RAW_DATA_DIR)
+    month_tag = latest_folder.name
+    print(f"[PIPELINE] Latest month detected: {month_tag}")
+
+    run = run_pipeline_for_month(latest_folder, WAREHOUSE_DIR / "etl" / month_tag,
+                                 WAREHOUSE_DIR / "cubes", force=args.force)
+    print(f"[PIPELINE] Cube ready: {run.cube.shape[0]} districts x {run.cube.shape[1]} columns")
+    run.wait()
+    print("[PIPELINE] Warehouse writes complete")
+
+
+if __name__ == "__main__":
+    main()
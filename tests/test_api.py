@@ -5,9 +5,14 @@ from fastapi.testclient import TestClient
 
 
 @pytest.fixture(scope="module")
-def client():
-    mock_model = MagicMock()
-    mock_model.predict.return_value = np.array([12.5])
+def mock_model():
+    return MagicMock()
+
+
+@pytest.fixture(scope="module")
+def client(mock_model):
+    # One prediction per input row, so batch endpoints see the right shape.
+    mock_model.predict.side_effect = lambda X: np.full(len(X), 12.5)
 
     mock_cube_row = {
         "District": "Khordha",
@@ -85,6 +90,15 @@ def test_district_not_found(client):
     assert r.status_code == 404
 
 
+def test_district_responses_are_the_preserialized_bytes(client):
+    from api import main
+    index = main.registry.current.district_index
+    r = client.get("/district/Khordha")
+    assert r.headers["content-type"] == "application/json"
+    assert r.content == index.row_json[0]
+    assert client.get("/district_structured/Khordha").content == index.structured_json[0]
+
+
 def test_district_structured_found(client):
     r = client.get("/district_structured/Khordha")
     assert r.status_code == 200
@@ -94,3 +108,217 @@ def test_district_structured_found(client):
     assert "maternal_indicators" in body
     assert "service_delivery" in body
     assert "raw" in body
+
+
+BATCH_ROWS = [
+    {"PW_Anaemia_Rate": 45.0, "SAM_Rate_": 3.5},
+    {"PW_Anaemia_Rate": 50.0, "SUW_Rate_": None},
+    {"HV_Percentage": 65.0, "Unknown_Field": 1},
+]
+
+
+def test_predict_lbw_batch_predicts_once_for_all_rows(client, mock_model):
+    mock_model.predict.reset_mock()
+    r = client.post("/predict/lbw/batch", json=BATCH_ROWS)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["LBW_Predicted"] == [12.5, 12.5, 12.5]
+    assert body["count"] == 3
+
+    mock_model.predict.assert_called_once()
+    X = mock_model.predict.call_args.args[0]
+    assert list(X.columns) == [
+        "PW_Anaemia_Rate", "Optimum_WG_Latest_%", "PW_Hb_Measured_%",
+        "Measurement_Efficiency", "HV_Percentage", "SAM_Rate_%", "SUW_Rate_%",
+    ]
+    assert X["PW_Anaemia_Rate"].tolist() == [45.0, 50.0, 0.0]
+    assert X["SAM_Rate_%"].tolist() == [3.5, 0.0, 0.0]
+
+
+def test_predict_batch_accepts_columnar_and_ndjson_bodies(client):
+    columnar = client.post("/predict/stunting/batch", json={"SAM_Rate_": [3.5, 4.0], "LBW_Rate_": [10.0, None]})
+    ndjson = client.post(
+        "/predict/stunting/batch",
+        content='{"SAM_Rate_": 3.5, "LBW_Rate_": 10.0}\n{"SAM_Rate_": 4.0}\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    for r in (columnar, ndjson):
+        assert r.status_code == 200
+        assert r.json()["count"] == 2
+        assert r.json()["features_used"] == ["SAM_Rate_%", "LBW_Rate_%"]
+
+
+@pytest.mark.parametrize("body", [
+    [],
+    [{"Unknown_Field": 1}],
+    {"SAM_Rate_": [1.0, 2.0], "SUW_Rate_": [1.0]},
+    [{"SAM_Rate_": "high"}],
+    {"SAM_Rate_": [[1], [2]]},
+    [{"SAM_Rate_": [1, 2]}, {"SAM_Rate_": [3, 4]}],
+])
+def test_predict_batch_rejects_bad_bodies(client, body):
+    assert client.post("/predict/lbw/batch", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("body", ['[{"SAM_Rate_": 1e400}]', '{"SAM_Rate_": [1.0, -Infinity]}'])
+def test_predict_batch_rejects_non_finite_values(client, body):
+    r = client.post("/predict/stunting/batch", content=body, headers={"Content-Type": "application/json"})
+    assert r.status_code == 400
+    assert "SAM_Rate_" in r.json()["detail"]
+
+
+def test_district_partial_match(client):
+    r = client.get("/district/khor")
+    assert r.status_code == 200
+    assert r.json()["District"] == "Khordha"
+
+
+class TestDistrictIndex:
+    @pytest.fixture
+    def index(self):
+        import pandas as pd
+        from api.district_index import DistrictIndex
+        return DistrictIndex(pd.DataFrame({
+            "District": ["Bargarh Road", " BARGARH ", "Puri", None],
+            "value": [1.0, float("nan"), 3, 4],
+        }))
+
+    def test_exact_match_beats_earlier_substring_match(self, index):
+        assert index.lookup("bargarh") == 1
+
+    def test_substring_fallback_returns_first_row_in_cube_order(self, index):
+        assert index.lookup("arg") == 0
+        assert index.lookup("ur") == 2
+
+    def test_rows_without_a_name_never_match(self, index):
+        assert index.lookup("none") is None
+        assert index.lookup("nan") is None
+
+    def test_match_never_spans_two_names(self, index):
+        assert index.lookup("road\x00bargarh") is None
+        assert index.lookup("roadbarg") is None
+
+    def test_rows_are_json_safe(self, index):
+        assert index.find("bargarh")["value"] is None
+        assert type(index.find("puri")["value"]) is float
+        assert index.available == [" BARGARH ", "Bargarh Road", "Puri"]
+
+    def test_preserialized_responses_match_the_rows(self, index):
+        import json
+        from api.district_index import structured_view
+        for pos, row in enumerate(index.rows):
+            assert json.loads(index.row_json[pos]) == row
+            assert json.loads(index.structured_json[pos]) == structured_view(row)
+        assert b"NaN" not in index.row_json[1]
+
+
+def test_admin_reload_reports_the_serving_version(client):
+    from api import main
+    with patch.object(main.registry, "reload", return_value=True) as reload:
+        r = client.post("/admin/reload?force=true")
+    assert r.status_code == 200
+    assert r.json()["reloaded"] is True
+    assert set(r.json()["artifacts"]) == {"lbw", "stunting", "cube", "predictions", "explanations"}
+    reload.assert_called_once_with(force=True)
+
+
+def test_admin_reload_checks_the_token_when_configured(client, monkeypatch):
+    from api import main
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    with patch.object(main.registry, "reload", return_value=False):
+        assert client.post("/admin/reload").status_code == 403
+        assert client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).status_code == 200
+
+
+def test_repeated_single_predictions_are_served_from_cache(client, mock_model):
+    from api import main
+    versioned = main.registry.current._replace(versions={"lbw": "abc123", "stunting": "def456", "cube": None})
+    payload = {"SAM_Rate_": 3.5, "HV_Percentage": 88.0}
+    with patch.object(main.registry, "_snapshot", versioned):
+        main.prediction_cache.clear()
+        mock_model.predict.reset_mock()
+        first = client.post("/predict/lbw", json=payload).json()
+        second = client.post("/predict/lbw", json=payload).json()
+        client.post("/predict/stunting", json=payload)  # other model: its own entry
+
+    assert first == second
+    assert mock_model.predict.call_count == 2
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] >= 1 and stats["size"] == 2
+
+
+def test_district_predictions_served_from_precomputed_table(client, mock_model):
+    from api import main
+    precomputed = {"Khordha": {"LBW_Predicted": 11.234, "Stunting_Predicted": 33.0}}
+    with patch.object(main.registry, "_snapshot", main.registry.current._replace(predictions=precomputed)):
+        mock_model.predict.reset_mock()
+        r = client.get("/district/khordha/predictions")
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["district"], body["LBW_Predicted"], body["source"]) == ("Khordha", 11.23, "precomputed")
+    mock_model.predict.assert_not_called()
+
+
+def test_district_predictions_fall_back_to_online_without_a_current_table(client):
+    # The mock cube lacks most model features: like the runner, no prediction.
+    r = client.get("/district/Khordha/predictions")
+    assert r.status_code == 200
+    assert r.json()["source"] == "online"
+    assert r.json()["LBW_Predicted"] is None
+    assert client.get("/district/Atlantis/predictions").status_code == 404
+
+
+def test_district_explain_serves_the_loaded_explanations(client):
+    from api import main
+    explanations = {"Khordha": b'{"district":"Khordha","lbw":{"prediction":12.5}}'}
+    with patch.object(main.registry, "_snapshot", main.registry.current._replace(explanations=explanations)):
+        r = client.get("/district/khor/explain")
+    assert r.status_code == 200
+    assert r.json() == {"district": "Khordha", "lbw": {"prediction": 12.5}}
+
+    with patch.object(main.registry, "_snapshot", main.registry.current._replace(explanations={})):
+        assert client.get("/district/Khordha/explain").status_code == 404
+
+
+def test_district_explain_unavailable_for_non_forest_models(client):
+    # The mock models have no trees to attribute over.
+    assert client.get("/district/Khordha/explain").status_code == 503
+    assert client.get("/district/Atlantis/explain").status_code == 404
+
+
+def test_cube_query_streams_the_projection(client):
+    r = client.post("/cube/query", json={
+        "columns": ["District", "LBW_Rate_%"],
+        "filters": [{"column": "LBW_Rate_%", "op": ">=", "value": 10}],
+    })
+    assert r.status_code == 200
+    assert r.headers["x-result-rows"] == "1"
+    assert r.json() == [{"District": "Khordha", "LBW_Rate_%": 10.2}]
+
+    csv = client.post("/cube/query", json={"columns": ["District"], "format": "csv"})
+    assert csv.headers["content-type"].startswith("text/csv")
+    assert csv.text.splitlines() == ["District", "Khordha"]
+
+    assert client.post("/cube/query", json={"columns": ["Nope"]}).status_code == 400
+
+
+def test_cube_query_values_match_the_district_endpoint(client):
+    r = client.post("/cube/query", json={"columns": ["District", "LBW_Rate_%"]})
+    district = client.get("/district/Khordha")
+    assert r.json()[0]["LBW_Rate_%"] == district.json()["LBW_Rate_%"]
+    assert b'"LBW_Rate_%":10.2' in r.content and b'"LBW_Rate_%":10.2' in district.content
+
+
+def test_metrics_endpoint_reports_requests_stages_and_cache(client):
+    client.get("/district/Khordha")
+    client.post("/predict/lbw", json={"SAM_Rate_": 3.5})
+    client.post("/predict/lbw/batch", json=BATCH_ROWS)
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert 'api_requests_total{method="GET",endpoint="/district/{name}",status="200"}' in text
+    assert 'api_stage_duration_seconds_count{endpoint="/predict/lbw",stage="predict"}' in text
+    assert 'api_stage_duration_seconds_count{endpoint="/predict/lbw/batch",stage="parse"}' in text
+    assert "api_prediction_cache_misses_total" in text
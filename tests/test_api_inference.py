@@ -0,0 +1,93 @@
+"""Coverage: api/inference.py -- predictions on the dedicated inference
+pool, and micro-batching of concurrent single-row requests into shared
+predict calls (batch size cap, wait window, per-model batches, errors).
+"""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from api.inference import InferenceExecutor
+
+COLUMNS = ["a", "b"]
+
+
+class SumModel:
+    """Predicts the row sum; records every call's matrix and thread."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append((X.to_numpy(), threading.current_thread().name))
+        return X.to_numpy().sum(axis=1)
+
+
+class FailingModel:
+    def predict(self, X):
+        raise ValueError("boom")
+
+
+@pytest.fixture
+def executor():
+    ex = InferenceExecutor(workers=2, max_batch=4, max_wait=0.05)
+    yield ex
+    ex.shutdown()
+
+
+def test_concurrent_rows_share_one_predict_call(executor):
+    model = SumModel()
+
+    async def scenario():
+        return await asyncio.gather(*(executor.predict_one(model, [i, 10 * i], COLUMNS) for i in range(3)))
+
+    assert asyncio.run(scenario()) == [0.0, 11.0, 22.0]
+    assert len(model.calls) == 1
+    X, thread = model.calls[0]
+    assert X.tolist() == [[0, 0], [1, 10], [2, 20]]
+    assert thread.startswith("inference")
+
+
+def test_full_batch_dispatches_without_waiting(executor):
+    model = SumModel()
+    executor.max_wait = 60  # only a full batch can go out in time
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(executor.predict_one(model, [i, 0], COLUMNS) for i in range(8))), 5
+        )
+
+    assert asyncio.run(scenario()) == [float(i) for i in range(8)]
+    assert [len(X) for X, _ in model.calls] == [4, 4]
+
+
+def test_rows_for_different_models_are_not_mixed(executor):
+    lbw, stunting = SumModel(), SumModel()
+
+    async def scenario():
+        return await asyncio.gather(
+            executor.predict_one(lbw, [1, 1], COLUMNS),
+            executor.predict_one(stunting, [2, 2], COLUMNS),
+            executor.predict_one(lbw, [3, 3], COLUMNS),
+        )
+
+    assert asyncio.run(scenario()) == [2.0, 4.0, 6.0]
+    assert [X.tolist() for X, _ in lbw.calls] == [[[1, 1], [3, 3]]]
+    assert [X.tolist() for X, _ in stunting.calls] == [[[2, 2]]]
+
+
+def test_predict_error_reaches_every_row_in_the_batch(executor):
+    async def scenario():
+        return await asyncio.gather(
+            *(executor.predict_one(FailingModel(), [0, 0], COLUMNS) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(scenario()))
+
+
+def test_whole_matrix_predict(executor):
+    model = SumModel()
+    X = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert asyncio.run(executor.predict(model, X, COLUMNS)).tolist() == [3.0, 7.0]
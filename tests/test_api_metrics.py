@@ -0,0 +1,75 @@
+"""Coverage: api/metrics.py -- Prometheus text rendering of counters,
+gauges and histograms, the ASGI middleware's per-route request/latency/
+in-flight accounting, stage timers, and the disabled (no-op) mode.
+"""
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api.metrics import Counter, Histogram, Metrics, MetricsMiddleware
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "test", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value, "/x")
+    lines = h.render()
+    assert 't_seconds_bucket{endpoint="/x",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{endpoint="/x",le="1.0"} 3' in lines
+    assert 't_seconds_bucket{endpoint="/x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{endpoint="/x"} 4' in lines
+    assert lines[:2] == ["# HELP t_seconds test", "# TYPE t_seconds histogram"]
+
+
+def test_label_values_are_escaped():
+    c = Counter("c_total", "test", ("path",))
+    c.inc('a"b\\c')
+    assert c.render()[-1] == 'c_total{path="a\\"b\\\\c"} 1'
+
+
+def test_collectors_are_read_at_scrape_time():
+    metrics = Metrics()
+    state = {"hits": 1}
+    metrics.collect(lambda: [("x_hits_total", "counter", "hits", state["hits"])])
+    state["hits"] = 5
+    assert "x_hits_total 5" in metrics.render().splitlines()
+
+
+def test_disabled_stage_timer_is_a_shared_no_op():
+    metrics = Metrics(enabled=False)
+    with metrics.stage("/x", "predict"):
+        pass
+    assert metrics.stage("/x", "a") is metrics.stage("/y", "b")
+    assert "api_stage_duration_seconds_count" not in metrics.render()
+
+
+@pytest.fixture
+def instrumented():
+    metrics = Metrics()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get("/item/{name}")
+    def item(name: str):
+        with metrics.stage("/item/{name}", "lookup"):
+            if name == "missing":
+                raise HTTPException(404)
+            return {"name": name, "in_flight": metrics.in_flight._values[()]}
+
+    return metrics, TestClient(app)
+
+
+def test_middleware_records_per_route_template(instrumented):
+    metrics, client = instrumented
+    assert client.get("/item/a").json()["in_flight"] == 1
+    client.get("/item/b")
+    client.get("/item/missing")
+    client.get("/nowhere")
+
+    text = metrics.render().splitlines()
+    assert 'api_requests_total{method="GET",endpoint="/item/{name}",status="200"} 2' in text
+    assert 'api_requests_total{method="GET",endpoint="/item/{name}",status="404"} 1' in text
+    assert 'api_requests_total{method="GET",endpoint="unmatched",status="404"} 1' in text
+    assert 'api_request_duration_seconds_count{method="GET",endpoint="/item/{name}"} 3' in text
+    assert 'api_stage_duration_seconds_count{endpoint="/item/{name}",stage="lookup"} 3' in text
+    assert "api_requests_in_flight 0" in text
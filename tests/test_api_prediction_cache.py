@@ -0,0 +1,130 @@
+"""Coverage: api/prediction_cache.py -- key normalization, LRU eviction,
+TTL expiry, hit/miss accounting, and the sqlite store shared between
+processes (two caches over one file stand in for two uvicorn workers),
+which the async path must never query on the event loop.
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from api.prediction_cache import PredictionCache, SqliteStore, cache_key
+
+
+def test_equal_feature_values_share_a_key():
+    assert cache_key("v1", [3, 0, 1.5]) == cache_key("v1", (3.0, np.float64(0), 1.5))
+    assert cache_key("v1", [3.0]) != cache_key("v2", [3.0])
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(maxsize=2)
+    a, b, c = (cache_key("v1", [x]) for x in (1, 2, 3))
+    cache.put(a, 1.0)
+    cache.put(b, 2.0)
+    assert cache.get(a) == 1.0  # a is now more recent than b
+    cache.put(c, 3.0)
+    assert cache.get(b) is None
+    assert cache.get(a) == 1.0 and cache.get(c) == 3.0
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = PredictionCache(ttl=10)
+    key = cache_key("v1", [1])
+    cache.put(key, 1.0)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get(key) is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = PredictionCache()
+    key = cache_key("v1", [1])
+    assert cache.get(key) is None
+    cache.put(key, 1.0)
+    cache.get(key)
+    cache.get(key)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(maxsize=0)
+    key = cache_key("v1", [1])
+    cache.put(key, 1.0)
+    assert cache.get(key) is None
+    assert cache.stats()["misses"] == 0
+
+
+class TestSqliteStore:
+    def test_workers_share_results_through_the_store(self, tmp_path):
+        db = tmp_path / "predictions.sqlite"
+        worker_a = PredictionCache(store=SqliteStore(db))
+        worker_b = PredictionCache(store=SqliteStore(db))
+        key = cache_key("v1", [1.5, 2.0])
+
+        worker_a.put(key, 12.34)
+        assert worker_b.get(key) == 12.34
+        assert worker_b.stats()["disk_hits"] == 1
+
+    def test_clear_keeps_only_the_served_versions(self, tmp_path):
+        cache = PredictionCache(store=SqliteStore(tmp_path / "predictions.sqlite"))
+        old, new = cache_key("v1", [1]), cache_key("v2", [1])
+        cache.put(old, 1.0)
+        cache.put(new, 2.0)
+
+        cache.clear(keep_versions=("v2",))
+        assert cache.stats()["size"] == 0
+        assert cache.get(old) is None
+        assert cache.get(new) == 2.0
+
+
+class _SlowStore:
+    """Stands in for a locked sqlite file: every query takes `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.rows: dict = {}
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return self.rows.get(key)
+
+    def put(self, key, value, expires):
+        time.sleep(self.delay)
+        self.rows[key] = value
+
+    def close(self):
+        pass
+
+
+def test_async_path_keeps_the_event_loop_free_while_the_store_is_slow():
+    store = _SlowStore(delay=0.2)
+    cache = PredictionCache(store=store)  # type: ignore[arg-type]
+    key = cache_key("v1", [1])
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        assert await cache.get_async(key) is None
+        during_get = ticks
+        started = time.perf_counter()
+        cache.put_async(key, 1.5)
+        put_took = time.perf_counter() - started
+        task.cancel()
+        return during_get, put_took
+
+    during_get, put_took = asyncio.run(scenario())
+    assert during_get >= 5       # the loop kept running while the store was read
+    assert put_took < 0.1        # the write was queued, not waited for
+    assert cache.get(key) == 1.5  # and the value is cached in memory meanwhile
+    cache.close()
+    assert store.rows == {key: 1.5}
@@ -0,0 +1,183 @@
+"""Coverage: api/registry.py -- loading models + cube into one snapshot,
+and swapping in a new snapshot when the artifacts change on disk, without
+disturbing holders of the old one; precomputed vs load-time explanations. Uses real (tiny) artifacts in a temp
+directory, so it lives apart from test_api.py's patched-filesystem client.
+"""
+import threading
+import time
+
+import joblib
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from analytics.compact_forest import CompactForest, compact_path, export_forest
+from analytics.explain import explanation_table, save_explanation_table
+from analytics.predictions import model_version, save_prediction_table
+from api.registry import ArtifactRegistry, artifact_signature, load_model, load_snapshot
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    models = tmp_path / "models"
+    models.mkdir()
+    lbw, stunting = models / "lbw_model.joblib", models / "stunting_model.joblib"
+    joblib.dump({"name": "lbw-v1"}, lbw)
+    joblib.dump({"name": "stunting-v1"}, stunting)
+    pd.DataFrame({"District": ["Khordha"], "x": [1.0]}).to_csv(tmp_path / "district_cube_2025-10.csv", index=False)
+    return lbw, stunting, tmp_path
+
+
+@pytest.fixture
+def registry(artifacts):
+    return ArtifactRegistry(
+        load=lambda: load_snapshot(*artifacts),
+        signature=lambda: artifact_signature(*artifacts),
+    )
+
+
+def test_snapshot_holds_models_cube_and_index(registry):
+    snapshot = registry.current
+    assert snapshot.lbw_model == {"name": "lbw-v1"}
+    assert snapshot.versions["cube"] == "district_cube_2025-10.csv"
+    assert snapshot.district_index.find("khordha")["x"] == 1.0
+
+
+def test_reload_is_a_no_op_when_nothing_changed(registry):
+    before = registry.current
+    assert registry.reload() is False
+    assert registry.current is before
+
+
+def test_new_artifacts_are_swapped_in_and_old_snapshot_is_untouched(registry, artifacts):
+    lbw, _, cube_dir = artifacts
+    held = registry.current  # e.g. a request in flight
+
+    joblib.dump({"name": "lbw-v2"}, lbw)
+    pd.DataFrame({"District": ["Puri"], "x": [2.0]}).to_csv(cube_dir / "district_cube_2025-11.csv", index=False)
+    seen = []
+    registry.on_reload(seen.append)
+
+    assert registry.reload() is True
+    assert registry.current.lbw_model == {"name": "lbw-v2"}
+    assert registry.current.versions["lbw"] != held.versions["lbw"]
+    assert registry.current.district_index.find("puri") is not None
+    assert seen == [registry.current]
+
+    assert held.lbw_model == {"name": "lbw-v1"}
+    assert held.district_index.find("puri") is None
+
+
+def test_failed_reload_keeps_serving_the_previous_snapshot(registry, artifacts):
+    lbw, _, _ = artifacts
+    before = registry.current
+    lbw.unlink()
+    with pytest.raises(RuntimeError):
+        registry.reload(force=True)
+    assert registry.current is before
+
+
+def test_precomputed_predictions_are_used_only_for_the_models_they_came_from(registry, artifacts):
+    lbw, stunting, cube_dir = artifacts
+    table = pd.DataFrame({"District": ["Khordha"], "LBW_Predicted": [9.5], "Stunting_Predicted": [None]})
+    save_prediction_table(table, lbw.parent, "district_cube_2025-10.csv", {"lbw": lbw, "stunting": stunting})
+
+    assert registry.reload() is True  # new table picked up
+    assert registry.current.predictions == {"Khordha": {"LBW_Predicted": 9.5, "Stunting_Predicted": None}}
+    assert registry.current.versions["predictions"] is not None
+
+    joblib.dump({"name": "lbw-v2"}, lbw)  # retrained, table not regenerated yet
+    registry.reload()
+    assert registry.current.predictions is None
+
+
+def test_watcher_picks_up_changes(registry, artifacts):
+    lbw, _, _ = artifacts
+    reloaded = threading.Event()
+    registry.on_reload(lambda snapshot: reloaded.set())
+    registry.start_watcher(0.02)
+    try:
+        time.sleep(0.05)
+        joblib.dump({"name": "lbw-v2"}, lbw)
+        assert reloaded.wait(5)
+        assert registry.current.lbw_model == {"name": "lbw-v2"}
+    finally:
+        registry.stop_watcher()
+
+
+class TestModelFormat:
+    @pytest.fixture
+    def saved_forest(self, tmp_path):
+        rng = np.random.default_rng(0)
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(rng.uniform(size=(30, 3)), rng.uniform(size=30))
+        path = tmp_path / "lbw_model.joblib"
+        joblib.dump(model, path)
+        return path
+
+    def test_auto_uses_the_compact_export_of_the_current_model(self, saved_forest):
+        assert isinstance(load_model(saved_forest, "auto")[0], RandomForestRegressor)  # nothing exported yet
+
+        export_forest(joblib.load(saved_forest), compact_path(saved_forest), model_version(saved_forest))
+        model, version = load_model(saved_forest, "auto")
+        assert isinstance(model, CompactForest)
+        assert version == model_version(saved_forest)
+        assert isinstance(load_model(saved_forest, "joblib")[0], RandomForestRegressor)
+
+    def test_auto_keeps_large_batches_on_the_sklearn_forest(self, saved_forest, monkeypatch):
+        export_forest(joblib.load(saved_forest), compact_path(saved_forest), model_version(saved_forest))
+        model, _ = load_model(saved_forest, "auto", compact_max_rows=4)
+        X = np.random.default_rng(1).uniform(size=(10, 3))
+        expected = model.model.predict(X)
+
+        compact_calls = []
+        monkeypatch.setattr(CompactForest, "predict", lambda self, X: compact_calls.append(len(X)))
+        np.testing.assert_array_equal(model.predict(X), expected)  # 10 rows: sklearn
+        model.predict(X[:4])
+        assert compact_calls == [4]
+
+    def test_auto_ignores_an_export_of_an_older_model(self, saved_forest):
+        export_forest(joblib.load(saved_forest), compact_path(saved_forest), "older-model")
+        assert isinstance(load_model(saved_forest, "auto")[0], RandomForestRegressor)
+        model, version = load_model(saved_forest, "compact")  # explicitly asked for
+        assert isinstance(model, CompactForest) and version == "older-model"
+
+    def test_compact_without_an_export_raises(self, saved_forest):
+        with pytest.raises(RuntimeError):
+            load_model(saved_forest, "compact")
+        with pytest.raises(ValueError):
+            load_model(saved_forest, "onnx")
+
+
+def test_explanations_are_computed_at_load_unless_a_current_table_exists(artifacts):
+    lbw, stunting, cube_dir = artifacts
+    cube = pd.DataFrame({"District": ["Khordha", "Puri", "Cuttack"], "x": [1.0, 2.0, np.nan]})
+    cube.to_csv(cube_dir / "district_cube_2025-10.csv", index=False)
+    for path in (lbw, stunting):
+        joblib.dump(RandomForestRegressor(n_estimators=5, random_state=0).fit(cube[["x"]][:2], [1.0, 3.0]), path)
+
+    snapshot = load_snapshot(lbw, stunting, cube_dir)
+    assert snapshot.versions["explanations"] == "online"
+    assert set(snapshot.explanations) == {"Khordha", "Puri"}  # Cuttack lacks the feature
+    body = orjson.loads(snapshot.explanations["Puri"])
+    assert body["lbw"]["contributions"][0]["feature"] == "x"
+    assert body["lbw"]["bias"] + body["lbw"]["contributions"][0]["contribution"] == \
+        pytest.approx(body["lbw"]["prediction"])
+
+    table = explanation_table(cube["District"], {"lbw": (snapshot.lbw_model, cube[["x"]][:1])})
+    save_explanation_table(table, lbw.parent, "district_cube_2025-10.csv", {"lbw": lbw, "stunting": stunting})
+    snapshot = load_snapshot(lbw, stunting, cube_dir)
+    assert snapshot.versions["explanations"] == "precomputed"
+    assert set(snapshot.explanations) == {"Khordha"}
+
+
+def test_unchanged_model_versions_are_not_loaded_again(artifacts):
+    lbw, _, _ = artifacts
+    first, version = load_model(lbw, "joblib")
+    again, _ = load_model(lbw, "joblib")
+    assert again is first  # same content hash: the loaded object is reused
+
+    joblib.dump({"name": "lbw-v2"}, lbw)
+    changed, new_version = load_model(lbw, "joblib")
+    assert new_version != version and changed == {"name": "lbw-v2"}
@@ -0,0 +1,65 @@
+"""Coverage: backfill.py -- month selection, the process-pool fan-out,
+per-month failure isolation and retries, and that the shared cube
+manifest ends up recording every month built in parallel. Uses copies
+of the real committed data/2025-11 month as several months of history.
+"""
+import shutil
+
+import pytest
+
+from backfill import run_backfill, select_months
+from cubes.run_cube import run_cube_for_month
+from etl.manifest import load_manifest
+
+DATA_DIR = "data/2025-11"
+
+
+@pytest.fixture
+def history(tmp_path):
+    raw = tmp_path / "data"
+    for month in ("2025-09", "2025-10", "2025-11"):
+        shutil.copytree(DATA_DIR, raw / month)
+    return raw, tmp_path / "warehouse"
+
+
+class TestSelectMonths:
+    def test_range_is_inclusive_and_sorted(self, history):
+        raw, _ = history
+        assert select_months(raw, "2025-10", "2025-11") == ["2025-10", "2025-11"]
+        assert select_months(raw) == ["2025-09", "2025-10", "2025-11"]
+
+    def test_missing_only_skips_months_with_a_cube(self, history):
+        raw, warehouse = history
+        run_backfill(["2025-10"], raw, warehouse, workers=1)
+        assert select_months(raw, missing_only=True, cubes_out_dir=warehouse / "cubes") == [
+            "2025-09", "2025-11",
+        ]
+
+    def test_rejects_malformed_bounds(self, history):
+        raw, _ = history
+        with pytest.raises(ValueError):
+            select_months(raw, start="2025-1")
+
+
+class TestRunBackfill:
+    def test_parallel_months_all_land_in_the_cube_manifest(self, history):
+        raw, warehouse = history
+        outcomes = run_backfill(select_months(raw), raw, warehouse, workers=3)
+
+        assert all(o.ok and o.attempts == 1 for o in outcomes.values())
+        assert set(load_manifest(warehouse / "cubes")["files"]) == {"2025-09", "2025-10", "2025-11"}
+        for month in outcomes:
+            # Recorded against the right inputs: nothing left to rebuild.
+            assert run_cube_for_month(warehouse / "etl" / month, warehouse / "cubes") is None
+
+    def test_failing_month_is_retried_and_isolated(self, history):
+        raw, warehouse = history
+        shutil.rmtree(raw / "2025-10")
+        (raw / "2025-10").mkdir()  # no sources: the cube build fails
+
+        outcomes = run_backfill(select_months(raw), raw, warehouse, workers=2, retries=1)
+
+        assert not outcomes["2025-10"].ok
+        assert outcomes["2025-10"].attempts == 2
+        assert "FileNotFoundError" in outcomes["2025-10"].error
+        assert outcomes["2025-09"].ok and outcomes["2025-11"].ok
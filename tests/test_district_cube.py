@@ -1,7 +1,7 @@
 """Coverage: cubes/district_cube.py -- clean_district (the district-name
 normalization every source table goes through before merging) and
-build_district_cube (the actual 10-table left-merge that produces the
-district cube). Previously untested despite being the pipeline's
+build_district_cube (the actual 10-table left join that produces the
+district cube, via align_join). Previously untested despite being the pipeline's
 central join.
 
 TestBuildDistrictCubeAgainstRealNovemberData runs against the actual
@@ -14,7 +14,7 @@ repo.
 import pandas as pd
 import pytest
 
-from cubes.district_cube import build_district_cube, clean_district
+from cubes.district_cube import align_join, build_district_cube, clean_district
 
 DATA_DIR = "data/2025-11"
 
@@ -48,6 +48,26 @@ class TestCleanDistrict:
         assert "-" in result["district"].iloc[0]
 
 
+class TestAlignJoin:
+    def test_matches_chained_left_merges(self):
+        base = pd.DataFrame({"district": ["A", "B", "C"], "x": [1, 2, 3]})
+        other = pd.DataFrame({"district": ["C", "A", "Z"], "y": [30.0, 10.0, 99.0]})
+        expected = base.merge(other, on="district", how="left")
+        pd.testing.assert_frame_equal(align_join({"base": base, "other": other}), expected)
+
+    def test_colliding_columns_get_source_prefixes(self):
+        a = pd.DataFrame({"district": ["A"], "total_pw": [1], "a_only": [0]})
+        b = pd.DataFrame({"district": ["A"], "total_pw": [2]})
+        result = align_join({"gwg": a, "snp": b})
+        assert list(result.columns) == ["district", "gwg_total_pw", "a_only", "snp_total_pw"]
+
+    def test_repeated_keys_outside_the_anchor_raise(self):
+        base = pd.DataFrame({"district": ["A"], "x": [1]})
+        other = pd.DataFrame({"district": ["A", "A"], "y": [1, 2]})
+        with pytest.raises(ValueError, match="more than one row"):
+            align_join({"base": base, "other": other})
+
+
 class TestBuildDistrictCubeAgainstRealNovemberData:
     def test_one_row_per_district_no_duplicates(self, cube):
         assert cube["district"].duplicated().sum() == 0
@@ -3,10 +3,16 @@ loaded source table goes through before analysis. Distinct from
 utils/cleaner.py (tested in test_utils.py): that one is used by
 cubes/district_cube.py's district-name normalization; this one is the
 loader-stage pass over raw, not-yet-analyzed tables. Previously untested.
+Also covers clean_file_streaming, the chunked variant for sources too
+large to load whole, and optimize_dtypes, the category/int32 pass.
 """
 import pandas as pd
+import pytest
 
-from etl.cleaner import basic_clean, clean_all, standardize_column_names
+from etl.cleaner import (
+    basic_clean, clean_all, clean_file_streaming, optimize_dtypes, standardize_column_names,
+)
+from utils.warehouse import read_table, write_table
 
 
 class TestStandardizeColumnNames:
@@ -22,6 +28,11 @@ class TestStandardizeColumnNames:
 
 
 class TestBasicClean:
+    def test_missing_string_cells_stay_missing(self):
+        df = pd.DataFrame({"district": ["Khordha", None], "value": [1, 2]})
+        result = basic_clean(df)
+        assert result["district"].isna().tolist() == [False, True]
+
     def test_strips_whitespace_in_string_columns(self):
         df = pd.DataFrame({"district": ["  Khordha ", "Cuttack"], "value": [1, 2]})
         result = basic_clean(df)
@@ -53,3 +64,115 @@ class TestCleanAll:
         assert set(cleaned.keys()) == {"awc", "anaemia"}
         assert list(cleaned["awc"].columns) == ["district"]
         assert len(cleaned["awc"]) == 1  # duplicate row dropped
+
+
+class TestCleanFileStreaming:
+    """The streaming mode must produce what basic_clean produces on the
+    whole file, however the file is split into chunks."""
+
+    def _write_source(self, tmp_path):
+        df = pd.DataFrame({
+            " District ": [" Khordha", "Cuttack ", " Khordha", "Puri", "Cuttack ", "Puri"],
+            "Count": [1, 2, 1, None, 2, None],
+        })
+        path = tmp_path / "source.csv"
+        df.to_csv(path, index=False)
+        return path, df
+
+    @pytest.mark.parametrize("fmt", ["parquet", "feather", "csv"])
+    def test_matches_in_memory_clean_across_chunk_boundaries(self, tmp_path, fmt):
+        path, df = self._write_source(tmp_path)
+        rows, _ = clean_file_streaming(path, tmp_path / "out", "t", fmt, chunksize=2)
+
+        expected = basic_clean(pd.read_csv(path)).reset_index(drop=True)
+        result = read_table(next((tmp_path / "out").iterdir()))
+        assert rows == len(expected) == 3
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_returns_raw_schema_of_source(self, tmp_path):
+        path, _ = self._write_source(tmp_path)
+        _, raw_schema = clean_file_streaming(path, tmp_path / "out", "t", "csv", chunksize=2)
+        assert list(raw_schema.columns) == [" District ", "Count"]
+        assert len(raw_schema) == 0
+
+    @pytest.mark.parametrize("fmt", ["parquet", "feather"])
+    def test_columns_typed_by_a_sparse_first_chunk_are_widened(self, tmp_path, fmt):
+        path = tmp_path / "sparse.csv"
+        path.write_text("district,remarks,count\nKhordha,,1\nPuri,,2\nCuttack,late,2.5\n")
+        rows, _ = clean_file_streaming(path, tmp_path / "out", "t", fmt, chunksize=2)
+
+        result = read_table(next((tmp_path / "out").iterdir()))
+        assert rows == 3
+        assert result["remarks"].tolist()[2] == "late"
+        assert result["remarks"].isna().tolist() == [True, True, False]
+        assert result["count"].tolist() == [1.0, 2.0, 2.5]
+
+    @pytest.mark.parametrize("chunksize", [2, 3, 4])
+    def test_duplicate_across_a_dtype_changing_chunk_boundary_is_dropped(self, tmp_path, chunksize):
+        # With chunksize=2 "remarks" is all-NaN float in the first chunk and
+        # text in the second, where the repeated Khordha row lands.
+        path = tmp_path / "sparse.csv"
+        path.write_text("district,remarks,count\nKhordha,,1\nPuri,,2\nKhordha,,1\nCuttack,late,3\n")
+        rows, _ = clean_file_streaming(path, tmp_path / "out", "t", "parquet", chunksize=chunksize)
+
+        expected = basic_clean(pd.read_csv(path)).reset_index(drop=True)
+        result = read_table(next((tmp_path / "out").iterdir()))
+        assert rows == len(expected) == 3
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_failed_stream_leaves_no_partial_output(self, tmp_path, monkeypatch):
+        import etl.cleaner
+
+        path, _ = self._write_source(tmp_path)
+        calls = []
+
+        def fail_on_second_chunk(chunk):
+            calls.append(len(chunk))
+            if len(calls) == 2:
+                raise OSError("disk full")
+
+        monkeypatch.setattr(etl.cleaner, "_strip_string_columns", fail_on_second_chunk)
+        with pytest.raises(OSError):
+            clean_file_streaming(path, tmp_path / "out", "t", "parquet", chunksize=2)
+        assert list((tmp_path / "out").iterdir()) == []
+
+
+class TestOptimizeDtypes:
+    def _frame(self):
+        return pd.DataFrame({
+            "district": ["Khordha", "Cuttack", "Puri"],
+            "awc_name": ["a", "b", "c"],
+            "category_col": ["x", "x", "x"],
+            "count": [1, 2, 3],
+            "big": [1, 2, 2**40],
+            "rate": [0.1, 0.2, 0.3],
+        })
+
+    def test_geography_and_low_cardinality_strings_become_category(self):
+        result = optimize_dtypes(self._frame())
+        assert result["district"].dtype == "category"
+        assert result["category_col"].dtype == "category"
+        assert result["awc_name"].dtype != "category"  # every value distinct
+
+    def test_integers_downcast_only_when_they_fit(self):
+        result = optimize_dtypes(self._frame())
+        assert result["count"].dtype == "int32"
+        assert result["big"].dtype == "int64"
+
+    def test_floats_are_left_alone(self):
+        result = optimize_dtypes(self._frame())
+        assert result["rate"].dtype == "float64"
+
+    def test_values_unchanged_and_input_not_mutated(self):
+        df = self._frame()
+        result = optimize_dtypes(df)
+        assert df["district"].dtype != "category"
+        pd.testing.assert_frame_equal(result, df, check_dtype=False, check_categorical=False)
+
+    def test_sidecar_schema_restores_dtypes_from_csv(self, tmp_path):
+        optimized = optimize_dtypes(self._frame())
+        path = write_table(optimized, tmp_path, "t", "csv", schema=True)
+        result = read_table(path)
+        assert result["district"].dtype == "category"
+        assert result["count"].dtype == "int32"
+        assert read_table(path, columns=["count"])["count"].dtype == "int32"
@@ -0,0 +1,33 @@
+"""Coverage: etl/loader.py -- month-folder discovery and the concurrent
+loading mode of load_all_files. The concurrent path must be a drop-in
+replacement for the sequential one: same keys, same frames, same order.
+Runs against the real committed data/2025-11 files, same convention as
+test_district_cube.py.
+"""
+import pandas as pd
+
+from etl.loader import list_source_files, load_all_files
+
+DATA_DIR = "data/2025-11"
+
+
+class TestListSourceFiles:
+    def test_skips_unsupported_files_and_sorts_by_name(self, tmp_path):
+        for fname in ["b.csv", "a.csv", "notes.txt"]:
+            (tmp_path / fname).write_text("district\nKhordha\n")
+        files = list_source_files(tmp_path)
+        assert list(files) == ["a", "b"]
+
+
+class TestLoadAllFilesConcurrent:
+    def test_matches_sequential_load_in_content_and_order(self):
+        sequential = load_all_files(DATA_DIR, max_workers=1)
+        concurrent = load_all_files(DATA_DIR, max_workers=4)
+
+        assert list(concurrent) == list(sequential)
+        for key in sequential:
+            pd.testing.assert_frame_equal(concurrent[key], sequential[key])
+
+    def test_key_order_is_stable_and_sorted(self):
+        data = load_all_files(DATA_DIR, max_workers=4)
+        assert list(data) == sorted(data)
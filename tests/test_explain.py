@@ -0,0 +1,98 @@
+"""Coverage: tree-path attributions (CompactForest.contributions) and
+analytics/explain.py -- agreement with a per-tree reference walk,
+contributions adding up to the prediction (NaNs included), the long
+explanation table, the per-district payload and the saved table (and
+when a saved table counts as current for the loaded models and cube).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from analytics.compact_forest import CompactForest
+from analytics.explain import (district_explanations, explain_rows, explanation_table, load_explanation_table,
+                               save_explanation_table)
+from analytics.predictions import is_current
+
+FEATURES = ["a", "b", "c"]
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.uniform(0, 10, (60, len(FEATURES))), columns=FEATURES)
+    X.iloc[::7, 2] = np.nan
+    y = X["a"] * 2 - X["b"] + rng.normal(0, 0.5, 60)
+    return X, RandomForestRegressor(n_estimators=15, random_state=0).fit(X, y)
+
+
+def reference_contributions(model, X):
+    """Per row and tree, walk decision_path and credit value changes to the split feature."""
+    result = np.zeros(X.shape)
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        paths = estimator.decision_path(X.to_numpy())
+        for i in range(len(X)):
+            nodes = paths.indices[paths.indptr[i]:paths.indptr[i + 1]]
+            for parent, child in zip(nodes[:-1], nodes[1:]):
+                result[i, tree.feature[parent]] += tree.value[child, 0, 0] - tree.value[parent, 0, 0]
+    return result / len(model.estimators_)
+
+
+def test_contributions_match_a_per_tree_walk_and_add_up_to_the_prediction(data):
+    X, model = data
+    bias, contributions = CompactForest.from_model(model).contributions(X)
+    np.testing.assert_allclose(contributions, reference_contributions(model, X), atol=1e-10)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.predict(X), atol=1e-10)
+
+
+def test_explain_rows_is_one_row_per_row_and_feature(data):
+    X, model = data
+    rows = explain_rows(model, X.iloc[:4][["c", "a", "b"]])  # columns matched by name
+    assert len(rows) == 4 * len(FEATURES)
+    assert list(rows["Feature"][:3]) == FEATURES
+    first = rows[rows["Row"] == X.index[0]]
+    assert first["Bias"].iloc[0] + first["Contribution"].sum() == pytest.approx(model.predict(X.iloc[:1])[0])
+
+
+def test_district_payload_lists_largest_contributions_first(data):
+    X, model = data
+    districts = pd.Series([f"D{i}" for i in range(len(X))], index=X.index)
+    table = explanation_table(districts, {"lbw": (model, X.iloc[:3])})
+    payload = district_explanations(table)
+
+    assert sorted(payload) == ["D0", "D1", "D2"]
+    lbw = payload["D1"]["lbw"]
+    sizes = [abs(c["contribution"]) for c in lbw["contributions"]]
+    assert sizes == sorted(sizes, reverse=True)
+    assert {c["feature"] for c in lbw["contributions"]} == set(FEATURES)
+    assert lbw["prediction"] == pytest.approx(model.predict(X.iloc[1:2])[0], abs=1e-4)
+
+
+def test_saved_table_round_trips_with_model_versions(data, tmp_path):
+    X, model = data
+    model_file = tmp_path / "lbw_model.joblib"
+    model_file.write_bytes(b"model")
+    table = explanation_table(pd.Series(["D0", "D1"], index=X.index[:2]), {"lbw": (model, X.iloc[:2])})
+    save_explanation_table(table, tmp_path, "district_cube_2025-11.csv", {"lbw": model_file})
+
+    loaded, metadata = load_explanation_table(tmp_path)
+    pd.testing.assert_frame_equal(loaded, table)
+    assert metadata["cube"] == "district_cube_2025-11.csv"
+    assert len(metadata["models"]["lbw"]) == 16
+    assert load_explanation_table(tmp_path / "missing") is None
+
+
+def test_saved_table_is_current_only_for_its_cube_and_models(data, tmp_path):
+    X, model = data
+    model_file = tmp_path / "lbw_model.joblib"
+    model_file.write_bytes(b"model")
+    table = explanation_table(pd.Series(["D0"], index=X.index[:1]), {"lbw": (model, X.iloc[:1])})
+    save_explanation_table(table, tmp_path, "district_cube_2025-11.csv", {"lbw": model_file})
+    _, metadata = load_explanation_table(tmp_path)
+
+    versions = {"cube": "district_cube_2025-11.csv", "lbw": metadata["models"]["lbw"], "stunting": "other"}
+    assert is_current(metadata, versions)
+    assert not is_current(metadata, {**versions, "cube": "district_cube_2025-12.csv"})
+    assert not is_current(metadata, {**versions, "lbw": "0123456789abcdef"})
+    assert not is_current({**metadata, "models": {}}, versions)
@@ -0,0 +1,84 @@
+"""Coverage: etl/indicators.py (the spec engine) and etl/specs.py (the ten
+report specs). The engine's derived columns are checked against the
+hand-written pandas expressions the analyze_* modules used before they
+became spec entries, including their inf/NaN handling, and the specs are
+checked to resolve the committed month's files by pattern rather than by
+a hardcoded month.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.indicators import IndicatorSpec, Ratio, Score, Share, Sum, evaluate, match_sources
+from etl.specs import HOME_VISIT, LBW, SPECS
+
+DATA_DIR = "data/2025-11"
+
+
+def _spec(*derived, **kwargs):
+    return IndicatorSpec(key="t", title="Test", source=r"test", derived=derived, **kwargs)
+
+
+class TestDerivedIndicators:
+    def test_safe_ratio_matches_replace_zero_fillna(self):
+        df = pd.DataFrame({"district": ["a", "b", "c"], "num": [1, 5, np.nan], "den": [3, 0, 4]})
+        result = evaluate(_spec(Ratio("r", "num", "den")), df)
+        expected = (df["num"] / df["den"].replace(0, np.nan)).fillna(0).round(2)
+        assert result["r"].tolist() == expected.tolist()
+
+    def test_ratio_can_keep_inf_and_nan(self):
+        df = pd.DataFrame({"district": ["a", "b"], "num": [1.0, 0.0], "den": [0.0, 0.0]})
+        result = evaluate(_spec(Ratio("r", "num", "den", scale=100, inf=None, nan=None)), df)
+        assert np.isinf(result["r"].iloc[0]) and np.isnan(result["r"].iloc[1])
+
+    def test_sum_keeps_integer_dtype(self):
+        df = pd.DataFrame({"district": ["a"], "x": [1], "y": [2]})
+        result = evaluate(_spec(Sum("total", ("x", "y"))), df)
+        assert result["total"].dtype == np.int64 and result["total"].iloc[0] == 3
+
+    def test_share_of_column_total(self):
+        df = pd.DataFrame({"district": ["a", "b"], "x": [1, 3]})
+        assert evaluate(_spec(Share("s", "x")), df)["s"].tolist() == [0.25, 0.75]
+
+    def test_ratio_can_use_an_earlier_derived_column(self):
+        df = pd.DataFrame({"district": ["a"], "x": [1], "y": [1], "den": [4]})
+        spec = _spec(Sum("total", ("x", "y")), Ratio("r", "total", "den"),
+                     Score("score", (("r", 1.0),)))
+        assert evaluate(spec, df)["score"].iloc[0] == 0.5
+
+    def test_input_frame_is_not_modified(self):
+        df = pd.DataFrame({"District": [" a "], "Num": [1], "Den": [2]})
+        evaluate(_spec(Ratio("r", "num", "den")), df)
+        assert list(df.columns) == ["District", "Num", "Den"]
+        assert df["District"].iloc[0] == " a "
+
+
+class TestSpecs:
+    def test_missing_required_columns_raise(self):
+        with pytest.raises(KeyError):
+            evaluate(LBW, pd.DataFrame({"district": ["a"], "total_children_0_6m": [1]}))
+
+    def test_home_visit_headers_match_any_reporting_window(self):
+        df = pd.DataFrame({
+            "District": ["a"],
+            "Total AWW between 01-31 Dec 2025": [10],
+            "AWW Completed 60% HV between 01-31 Dec 2025": [5],
+            "% of Visits Made between 01-31 Dec 2025": ["80"],
+        })
+        result = evaluate(HOME_VISIT, df)
+        assert result["aww_60pct_hv_pct"].iloc[0] == 0.5
+        assert result["visit_coverage_pct"].iloc[0] == 80.0
+
+    def test_every_spec_matches_one_committed_file(self):
+        names = [os.path.splitext(f)[0] for f in os.listdir(DATA_DIR)]
+        assert set(match_sources(SPECS, names)) == {spec.key for spec in SPECS}
+
+    def test_patterns_are_month_independent(self):
+        assert LBW.matches("Low_Birth_Weight_1_2026")
+        assert not LBW.matches("Low_Birth_Weight_Summary")
+
+    def test_ambiguous_match_raises(self):
+        with pytest.raises(ValueError):
+            match_sources([LBW], ["Low_Birth_Weight_11_2025", "Low_Birth_Weight_12_2025"])
@@ -0,0 +1,165 @@
+"""Coverage: analytics/longitudinal.py -- stacking monthly cubes, adding a
+month's trees giving the same forest as a rebuild, the month window, and
+when a saved forest is rebuilt instead of extended -- and training on
+the committed warehouse cube (snake_case ETL columns) through the column
+mapping.
+"""
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.longitudinal import cube_months, read_cube, stack_cubes, update_target, update_targets
+from analytics.models import TARGETS
+from analytics.predictions import model_version
+from tests.test_models import _make_cube
+
+MONTHS = ["2025-09", "2025-10", "2025-11"]
+WAREHOUSE_CUBE = "warehouse/cubes/district_cube_2025-11.csv"
+PIPELINE_CUBE = "district_cube_2025_11.csv"  # the same month, under the pipeline's column names
+
+
+@pytest.fixture
+def cubes(tmp_path):
+    folder = tmp_path / "cubes"
+    folder.mkdir()
+    for i, month in enumerate(MONTHS):
+        _make_cube(n=30, seed=i).to_csv(folder / f"district_cube_{month}.csv", index=False)
+    return folder
+
+
+def save(update, path):
+    """What the runner does: save the model, then record it in the state."""
+    joblib.dump(update.model, path)
+    return {**update.state, "model": model_version(path)}
+
+
+def months_upto(folder, last):
+    return {m: p for m, p in cube_months(folder).items() if m <= last}
+
+
+def test_stack_cubes_tags_each_month(cubes):
+    assert list(cube_months(cubes)) == MONTHS
+    stacked = stack_cubes(cubes, columns=["District", "LBW_Rate_%"])
+    assert len(stacked) == 90
+    assert list(stacked["Month"].unique()) == MONTHS
+    assert list(stacked.columns) == ["District", "LBW_Rate_%", "Month"]
+
+
+def test_new_month_adds_trees_equal_to_a_rebuild(cubes, tmp_path):
+    path = tmp_path / "lbw_model.joblib"
+    first = update_target(months_upto(cubes, "2025-10"), TARGETS["lbw"], path, None, trees_per_month=10)
+    assert first.rebuilt and first.added == MONTHS[:2]
+    entry = save(first, path)
+
+    monthly = update_target(cube_months(cubes), TARGETS["lbw"], path, entry, trees_per_month=10)
+    assert not monthly.rebuilt and monthly.added == ["2025-11"]
+    assert len(monthly.model.estimators_) == 30
+
+    rebuild = update_target(cube_months(cubes), TARGETS["lbw"], path, None, trees_per_month=10)
+    assert rebuild.rebuilt
+    np.testing.assert_array_equal(monthly.model.predict(monthly.X), rebuild.model.predict(rebuild.X))
+    assert len(monthly.X) == 30
+
+
+def test_window_drops_the_oldest_month(cubes, tmp_path):
+    path = tmp_path / "lbw_model.joblib"
+    entry = save(update_target(months_upto(cubes, "2025-10"), TARGETS["lbw"], path, None,
+                               trees_per_month=10, window=2), path)
+
+    monthly = update_target(cube_months(cubes), TARGETS["lbw"], path, entry, trees_per_month=10, window=2)
+    assert (monthly.added, monthly.dropped) == (["2025-11"], ["2025-09"])
+    assert [b["month"] for b in monthly.state["months"]] == MONTHS[1:]
+    assert len(monthly.model.estimators_) == 20
+
+    # A rebuild only fits the window, and gives the same forest.
+    rebuild = update_target(cube_months(cubes), TARGETS["lbw"], path, None, trees_per_month=10, window=2)
+    assert rebuild.added == MONTHS[1:]
+    np.testing.assert_array_equal(monthly.model.predict(monthly.X), rebuild.model.predict(rebuild.X))
+
+
+def test_no_new_month_fits_nothing(cubes, tmp_path):
+    path = tmp_path / "lbw_model.joblib"
+    first = update_target(cube_months(cubes), TARGETS["lbw"], path, None, trees_per_month=10)
+    again = update_target(cube_months(cubes), TARGETS["lbw"], path, save(first, path), trees_per_month=10)
+    assert (again.rebuilt, again.added) == (False, [])
+    assert again.state == first.state
+
+
+@pytest.mark.parametrize("change", ["rewrite_past_month", "replace_model", "trees_per_month"])
+def test_stale_state_triggers_rebuild(cubes, tmp_path, change):
+    path = tmp_path / "lbw_model.joblib"
+    entry = save(update_target(months_upto(cubes, "2025-10"), TARGETS["lbw"], path, None,
+                               trees_per_month=10), path)
+    trees = 10
+    if change == "rewrite_past_month":
+        _make_cube(n=30, seed=99).to_csv(cubes / "district_cube_2025-09.csv", index=False)
+    elif change == "replace_model":
+        joblib.dump("another model", path)
+    else:
+        trees = 5
+
+    result = update_target(cube_months(cubes), TARGETS["lbw"], path, entry, trees_per_month=trees)
+    assert result.rebuilt and result.added == MONTHS
+
+
+def test_month_with_too_few_rows_adds_no_trees(cubes, tmp_path):
+    _make_cube(n=5, seed=7).to_csv(cubes / "district_cube_2025-12.csv", index=False)
+    result = update_target(cube_months(cubes), TARGETS["lbw"], tmp_path / "m.joblib", None, trees_per_month=10)
+    assert result.state["months"][-1] == {**result.state["months"][-1], "month": "2025-12", "trees": 0}
+    assert len(result.model.estimators_) == 30
+
+
+def test_update_targets_in_parallel_matches_sequential(cubes, tmp_path):
+    parallel = update_targets(cubes, tmp_path, cores=2, trees_per_month=10)
+    sequential = update_targets(cubes, tmp_path, cores=1, trees_per_month=10)
+    assert list(parallel) == ["lbw", "stunting"]
+    for name, result in parallel.items():
+        np.testing.assert_array_equal(result.model.predict(result.X),
+                                      sequential[name].model.predict(sequential[name].X))
+
+
+def test_warehouse_cube_is_read_under_the_model_column_names():
+    mapped = read_cube(WAREHOUSE_CUBE)
+    pipeline = pd.read_csv(PIPELINE_CUBE)
+    columns = sorted({c for t in TARGETS.values() for c in (*t.features, t.target_col)})
+    merged = pipeline.merge(mapped[["District", *columns]], on="District", suffixes=("", "_warehouse"))
+    assert len(merged) == len(pipeline) == 30
+    for column in columns:
+        np.testing.assert_allclose(merged[f"{column}_warehouse"], merged[column], atol=0.01, err_msg=column)
+
+
+def test_update_targets_trains_on_the_warehouse_cubes(tmp_path):
+    folder = tmp_path / "cubes"
+    folder.mkdir()
+    shutil.copy(WAREHOUSE_CUBE, folder)
+    updates = update_targets(folder, tmp_path, cores=1, trees_per_month=5)
+    for name, update in updates.items():
+        assert update.added == ["2025-11"]
+        assert set(update.state["features"]) == set(TARGETS[name].features)
+        assert len(update.X) == 30
+
+
+def test_longitudinal_run_writes_tables_the_api_accepts(tmp_path, monkeypatch):
+    import models_runner
+    from analytics.model_registry import ModelRegistry
+    from api.registry import load_snapshot
+
+    (tmp_path / "warehouse" / "cubes").mkdir(parents=True)
+    shutil.copy(WAREHOUSE_CUBE, tmp_path / "warehouse" / "cubes")
+    shutil.copy(PIPELINE_CUBE, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(models_runner, "MODEL_REGISTRY", ModelRegistry(tmp_path / "models" / "registry"))
+
+    models_runner.run_longitudinal(Path("warehouse/cubes"))
+
+    registry = models_runner.MODEL_REGISTRY
+    snapshot = load_snapshot(registry.path("lbw"), registry.path("stunting"), Path("."),
+                             predictions_dir=Path("models"), model_format="joblib")
+    assert snapshot.versions["cube"] == PIPELINE_CUBE
+    assert snapshot.versions["predictions"] is not None
+    assert snapshot.versions["explanations"] == "precomputed"
+    assert len(snapshot.predictions) == 30
@@ -0,0 +1,81 @@
+"""Coverage: analytics/model_registry.py -- content-addressed storage
+(identical models stored once, versions matching model_version), compact
+exports per object, alias / version / prefix lookups, finding a version by
+its training input key, deduplicated loads, and another process's index
+changes being picked up.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from analytics.compact_forest import compact_path, current_export
+from analytics.model_registry import PRODUCTION, ModelRegistry, input_key
+from analytics.predictions import model_version
+
+
+def forest(seed=0):
+    X = pd.DataFrame({"a": np.arange(20.0), "b": np.arange(20.0) % 3})
+    return RandomForestRegressor(n_estimators=5, random_state=seed).fit(X, X["a"] * 2)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path / "registry")
+
+
+def test_identical_models_are_stored_once(registry):
+    first = registry.register("lbw", forest(), {"cube": "district_cube_2025-10.csv"})
+    again = registry.register("lbw", forest(), {"cube": "district_cube_2025-11.csv"})
+
+    assert first == again
+    assert list(registry.versions("lbw")) == [first]
+    assert registry.metadata("lbw", first)["cube"] == "district_cube_2025-10.csv"  # first registration kept
+    obj = registry.object_path("lbw", first)
+    assert model_version(obj) == first
+    assert current_export(compact_path(obj)) == first
+    assert len(list(registry.objects.glob("*.joblib"))) == 1
+
+
+def test_aliases_versions_and_prefixes_resolve(registry):
+    v1 = registry.register("lbw", forest(0))
+    v2 = registry.register("lbw", forest(1))
+    registry.set_alias("lbw", PRODUCTION, v1)
+
+    assert registry.resolve("lbw") == v1
+    assert registry.resolve("lbw", v2) == v2
+    assert registry.resolve("lbw", v2[:8]) == v2
+    assert registry.resolve("lbw", "nope") is None
+    assert registry.path("stunting") is None
+    with pytest.raises(KeyError):
+        registry.set_alias("lbw", PRODUCTION, "0" * 16)
+
+    registry.set_alias("lbw", PRODUCTION, v2)
+    assert registry.path("lbw") == registry.object_path("lbw", v2)
+
+
+def test_find_returns_the_version_trained_on_the_same_inputs(registry):
+    key = input_key(cube="abc", features=["a", "b"], tune=False)
+    assert key == input_key(tune=False, features=["a", "b"], cube="abc")
+    version = registry.register("lbw", forest(), {"input_key": key})
+
+    assert registry.find("lbw", key) == version
+    assert registry.find("lbw", input_key(cube="def", features=["a", "b"], tune=False)) is None
+
+
+def test_loads_are_deduplicated(registry):
+    version = registry.register("lbw", forest())
+    fresh = ModelRegistry(registry.root)  # e.g. another process
+    model = fresh.load("lbw", version)
+    assert fresh.load("lbw", version) is model
+    X = pd.DataFrame({"a": [1.0, 7.0], "b": [0.0, 2.0]})
+    np.testing.assert_array_equal(model.predict(X), forest().predict(X))
+
+
+def test_index_changes_by_another_writer_are_seen(registry):
+    reader = ModelRegistry(registry.root)
+    assert reader.resolve("lbw") is None
+
+    version = registry.register("lbw", forest())
+    registry.set_alias("lbw", PRODUCTION, version)
+    assert reader.resolve("lbw") == version
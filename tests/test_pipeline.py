@@ -0,0 +1,66 @@
+"""Coverage: pipeline.py -- the single-pass ETL + cube entry point. The
+cube it builds from in-memory frames must equal the one built from the
+warehouse, and once its background writes finish the warehouse must be
+in the same state run_month + run_cube would leave it in.
+"""
+import shutil
+
+import pandas as pd
+import pytest
+
+from cubes.district_cube import build_district_cube
+from cubes.run_cube import run_cube_for_month
+from etl.run_month import run_etl_for_month
+from pipeline import run_pipeline_for_month
+from utils.warehouse import read_table
+
+DATA_DIR = "data/2025-11"
+LBW = "Low_Birth_Weight_11_2025"
+
+
+@pytest.fixture
+def month(tmp_path):
+    raw = tmp_path / "data" / "2025-11"
+    shutil.copytree(DATA_DIR, raw)
+    return raw, tmp_path / "warehouse" / "etl" / "2025-11", tmp_path / "warehouse" / "cubes"
+
+
+def test_in_memory_cube_matches_cube_built_from_disk(month):
+    raw, etl, cubes = month
+    run = run_pipeline_for_month(raw, etl, cubes)
+    run.wait()
+
+    pd.testing.assert_frame_equal(run.cube, build_district_cube(etl))
+    pd.testing.assert_frame_equal(read_table(cubes / "district_cube_2025-11.parquet"), run.cube)
+
+
+def test_warehouse_is_left_up_to_date(month):
+    raw, etl, cubes = month
+    run_pipeline_for_month(raw, etl, cubes).wait()
+
+    assert run_etl_for_month(raw, etl) == []
+    assert run_cube_for_month(etl, cubes) is None
+
+
+def test_rerun_reuses_unchanged_tables(month):
+    raw, etl, cubes = month
+    first = run_pipeline_for_month(raw, etl, cubes)
+    first.wait()
+
+    with open(raw / f"{LBW}.csv", "a", encoding="utf-8") as fh:
+        fh.write("Test District,100,10\n")
+    second = run_pipeline_for_month(raw, etl, cubes)
+    second.wait()
+
+    assert second.changed == [LBW]
+    pd.testing.assert_frame_equal(second.cube, build_district_cube(etl))
+
+
+def test_unchanged_month_loads_the_existing_cube(month):
+    raw, etl, cubes = month
+    first = run_pipeline_for_month(raw, etl, cubes)
+    first.wait()
+
+    second = run_pipeline_for_month(raw, etl, cubes)
+    assert second.changed == [] and second.pending == []
+    pd.testing.assert_frame_equal(second.cube, first.cube)
@@ -0,0 +1,56 @@
+"""Coverage: analytics/training.py and the target registry in
+analytics/models.py -- core budget split, parallel training giving the
+same forests as sequential training, registering an extra target, and
+reusing an already trained model.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import models
+from analytics.models import register_target, train_target
+from analytics.training import plan_cores, reuse_target, train_targets
+from tests.test_models import _make_cube
+
+
+@pytest.mark.parametrize("n_targets, cores, expected", [
+    (2, 8, (2, 4)),
+    (2, 1, (1, 1)),
+    (5, 4, (4, 1)),
+    (1, 6, (1, 6)),
+])
+def test_plan_cores_splits_the_budget(n_targets, cores, expected):
+    assert plan_cores(n_targets, cores) == expected
+
+
+def test_parallel_training_matches_sequential():
+    df = _make_cube()
+    trained = train_targets(df, cores=4)  # 2 processes x 2 cores per forest
+
+    assert list(trained) == ["lbw", "stunting"]
+    for name, result in trained.items():
+        sequential, X, _ = train_target(df, models.TARGETS[name])
+        assert result.X.index.equals(X.index)
+        assert np.array_equal(result.model.predict(X), sequential.predict(X))
+        assert result.model.n_jobs is None  # training parallelism isn't saved with the model
+
+
+def test_registered_targets_are_trained():
+    target = register_target("sam", "SAM_Rate_%", ["Measurement_Efficiency", "HV_Percentage", "Not_In_Cube"])
+    try:
+        assert (target.model_name, target.prediction_col) == ("sam_model", "SAM_Predicted")
+        trained = train_targets(_make_cube(), cores=3)
+        assert list(trained) == ["lbw", "stunting", "sam"]
+        assert list(trained["sam"].X.columns) == ["Measurement_Efficiency", "HV_Percentage"]
+    finally:
+        del models.TARGETS["sam"]
+
+
+def test_reuse_target_gives_the_training_rows_without_fitting():
+    df = _make_cube()
+    df.loc[:4, "LBW_Rate_%"] = np.nan
+    model, X, y = train_target(df, models.TARGETS["lbw"])
+    reused = reuse_target(df, models.TARGETS["lbw"], model)
+    assert reused.model is model
+    pd.testing.assert_frame_equal(reused.X, X)
+    pd.testing.assert_series_equal(reused.y, y)
@@ -0,0 +1,98 @@
+"""Coverage: analytics/tuning.py -- successive-halving schedule, grouped
+folds, parallel fold fits matching sequential ones, the fold-model cache
+(full reuse, warm-started growth, partial reuse after a data change), and
+_train_model(tune=True).
+"""
+import numpy as np
+import pytest
+
+from analytics import tuning
+from analytics.models import TARGETS, train_target
+from analytics.tuning import _folds, tune_forest
+from tests.test_models import _make_cube
+
+GRID = {"max_depth": [None, 3], "min_samples_leaf": [1, 4], "max_features": [1.0, "sqrt"]}
+
+
+@pytest.fixture(scope="module")
+def data():
+    cube = _make_cube(n=40)
+    X = cube[["PW_Anaemia_Rate", "HV_Percentage", "SAM_Rate_%", "SUW_Rate_%"]]
+    y = X["PW_Anaemia_Rate"] * 0.2 + X["SAM_Rate_%"] + np.random.default_rng(1).normal(0, 1, 40)
+    return X, y
+
+
+def search(X, y, **kwargs):
+    kwargs = {"param_grid": GRID, "k": 4, "factor": 2, "min_estimators": 10, "max_estimators": 40,
+              "n_jobs": 1, **kwargs}
+    return tune_forest(X, y, **kwargs)
+
+
+def test_candidates_are_halved_while_forests_grow(data):
+    result = search(*data)
+    assert [r["n_estimators"] for r in result.rounds] == [10, 20, 40]
+    assert [len(r["scores"]) for r in result.rounds] == [8, 4, 2]
+    assert result.best_params["n_estimators"] == 40
+    assert result.best_mae == result.rounds[-1]["scores"][0][1]
+    assert result.fits == (8 + 4 + 2) * 4
+
+
+def test_grouped_folds_keep_groups_together():
+    groups = np.repeat(["a", "b", "c", "d", "e"], 3)
+    for train_idx, test_idx in _folds(len(groups), 5, groups):
+        assert not set(groups[train_idx]) & set(groups[test_idx])
+
+
+def test_parallel_folds_match_sequential(data):
+    assert search(*data, n_jobs=3).rounds == search(*data).rounds
+
+
+def test_cache_reuses_fold_models(data, tmp_path):
+    uncached = search(*data)
+    first = search(*data, cache_dir=tmp_path)
+    assert first.rounds == uncached.rounds  # warm-started growth == fresh fits
+    assert first.cache_hits == 0
+
+    again = search(*data, cache_dir=tmp_path)
+    assert (again.fits, again.cache_hits) == (0, first.fits)
+    assert again.rounds == first.rounds
+
+
+def test_small_data_change_reuses_untouched_folds(data, tmp_path):
+    X, y = data
+    search(X, y, cache_dir=tmp_path)
+    changed = y.copy()
+    changed.iloc[0] += 5  # only folds that train on row 0 must refit
+
+    result = search(X, changed, cache_dir=tmp_path)
+    assert result.cache_hits > 0 and result.fits > 0
+
+
+def test_train_model_tune_uses_the_best_params(monkeypatch, tmp_path):
+    monkeypatch.setattr(tuning, "PARAM_GRID", {"max_depth": [2, None]})
+    monkeypatch.setattr(tuning, "TUNE_CACHE_DIR", tmp_path)
+    model, _, _ = train_target(_make_cube(), TARGETS["lbw"], n_jobs=1, tune=True)
+    assert model.max_depth in (2, None)
+    assert model.n_estimators == 200
+    assert any(tmp_path.iterdir())
+
+
+def test_train_model_tunes_on_the_training_split_only(monkeypatch):
+    from sklearn.model_selection import train_test_split
+
+    seen = {}
+
+    def fake_tune(X, y, groups=None, **kwargs):
+        seen.update(X=X, y=y, groups=groups)
+        return tuning.TuneResult({"n_estimators": 10}, 0.0, [], 0, 0)
+
+    monkeypatch.setattr(tuning, "tune_forest", fake_tune)
+    cube = _make_cube()
+    train_target(cube, TARGETS["lbw"], n_jobs=1, tune=True)
+
+    data = cube.dropna(subset=list(seen["X"].columns) + [TARGETS["lbw"].target_col])
+    _, X_test = train_test_split(data, test_size=0.3, random_state=42)
+    assert not set(seen["X"].index) & set(X_test.index)
+    assert len(seen["X"]) == len(data) - len(X_test)
+    assert seen["y"].index.equals(seen["X"].index)
+    assert seen["groups"].index.equals(seen["X"].index)
@@ -1,6 +1,8 @@
 import pandas as pd
 import pytest
-from utils.cleaner import standardize_columns, normalize_awc_code, fill_missing
+from utils.cleaner import (
+    standardize_columns, normalize_awc_code, fill_missing, normalize_header, normalize_name,
+)
 from utils.stats import safe_corr, top_bottom
 
 
@@ -26,6 +28,43 @@ class TestStandardizeColumns:
         assert "awc_code" in result.columns
 
 
+class TestNormalizeHeader:
+    @pytest.mark.parametrize("raw, expected", [
+        ("Measurement efficiency (%)", "measurement_efficiency_pct"),
+        ("Total SAM with SUW Children (6m-3y)", "total_sam_with_suw_children_6m_3y"),
+        ("TOTAL ACTIVE  PREGNANT WOMEN", "total_active_pregnant_women"),
+        ("NO. OF PW DUE ANC 1", "no_of_pw_due_anc_1"),
+        ("Anaemic.1", "anaemic_1"),
+        ("Total AWW Between 01 -  30 Nov, 2025", "total_aww_between_01_30_nov_2025"),
+        ("% of AG measured", "pct_of_ag_measured"),
+    ])
+    def test_canonical_form(self, raw, expected):
+        assert normalize_name(raw) == expected
+
+    def test_is_idempotent(self):
+        once = normalize_header(("Severely stunted (%)", " District "))
+        assert normalize_header(once) == once
+
+    def test_cached_per_distinct_header(self):
+        normalize_header.cache_clear()
+        header = ("District", "Total AWC")
+        normalize_header(header)
+        normalize_header(tuple(header))
+        assert normalize_header.cache_info().hits == 1
+
+    def test_all_column_standardizers_agree(self):
+        from cubes.district_cube import standardize_columns as cube_standardize
+        from etl.cleaner import standardize_column_names
+
+        columns = [" District ", "Measurement efficiency (%)", "Not stunted (N)"]
+        results = [
+            list(standardize_columns(pd.DataFrame(columns=columns)).columns),
+            list(cube_standardize(pd.DataFrame(columns=columns)).columns),
+            list(standardize_column_names(pd.DataFrame(columns=columns)).columns),
+        ]
+        assert results[0] == results[1] == results[2]
+
+
 class TestNormalizeAwcCode:
     def test_pads_to_11_digits(self):
         df = pd.DataFrame({"awc_code": ["123", "45678"]})
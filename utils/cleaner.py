@@ -1,15 +1,44 @@
+import re
+from functools import lru_cache
+
 import pandas as pd
 
-def standardize_columns(df: pd.DataFrame):
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.replace(" ", "_")
-        .str.replace(r"[^A-Za-z0-9_]", "", regex=True)
-        .str.lower()
-    )
+# Canonical header form shared by the loader-stage cleaner, every
+# analyze_* module and the cube builder: strip, lowercase, "%" -> "pct",
+# then every run of other non-alphanumeric characters ("(", " ", "-",
+# ".", "&", ...) collapses to a single "_", trimmed at both ends.
+#   "Measurement efficiency (%)"   -> "measurement_efficiency_pct"
+#   "Total SAM with SUW (6m-3y)"   -> "total_sam_with_suw_6m_3y"
+#   "Anaemic.1" (pandas dup name)  -> "anaemic_1"
+# The form is idempotent, so normalizing an already-normalized header
+# (e.g. a warehouse table re-read by the cube stage) is a no-op.
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_PERCENT = str.maketrans({"%": "pct"})
+
+
+def normalize_name(name) -> str:
+    return _NON_ALNUM.sub("_", str(name).strip().lower().translate(_PERCENT)).strip("_")
+
+
+@lru_cache(maxsize=1024)
+def normalize_header(header: tuple) -> tuple:
+    """
+    Canonical form of a whole header, cached on the header tuple: monthly
+    exports repeat the same few headers, so each distinct one is only
+    normalized once per process.
+    """
+    return tuple(normalize_name(name) for name in header)
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize df's column names in place (see normalize_header) and return df."""
+    df.columns = list(normalize_header(tuple(df.columns)))
     return df
 
+
+def standardize_columns(df: pd.DataFrame):
+    return normalize_columns(df)
+
 def normalize_awc_code(df, col="awc_code"):
     df[col] = df[col].astype(str).str.zfill(11)
     return df
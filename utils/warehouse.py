@@ -0,0 +1,390 @@
+"""
+Warehouse table storage.
+
+Every stage that persists a table (etl.run_month, cubes.run_cube,
+models_runner) writes through write_table, and every stage that reads one
+back goes through read_table, so the on-disk format is a single switch
+instead of a to_csv/read_csv pair scattered across the pipeline.
+
+Parquet is the default: it keeps dtypes, so downstream readers don't
+re-infer them from text, and it supports column projection. CSV stays
+available as an export format (WAREHOUSE_FORMAT=csv).
+"""
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+import pandas as pd
+
+
+class TableFormat(NamedTuple):
+    extension: str
+    reader: Callable[..., pd.DataFrame]
+    writer: Callable[[pd.DataFrame, Path], None]
+    # Factory for an incremental writer (see open_table_writer); None if
+    # the format can't be appended to.
+    appender: Optional[Callable[[Path], "TableAppender"]] = None
+
+
+class TableAppender(ABC):
+    """Writes a table chunk by chunk; the first chunk fixes the schema."""
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+def _read_parquet(path, columns=None):
+    return pd.read_parquet(path, columns=columns)
+
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False)
+
+
+def _read_feather(path, columns=None):
+    return pd.read_feather(path, columns=columns)
+
+
+def _write_feather(df, path):
+    # Feather can't store a non-default index; warehouse tables never need one.
+    df.reset_index(drop=True).to_feather(path)
+
+
+def _read_csv(path, columns=None):
+    # Text has no types of its own: use the sidecar schema when there is one,
+    # so dtypes chosen at write time (category, int32, ...) survive the trip.
+    dtypes = read_schema(path)
+    if dtypes and columns is not None:
+        dtypes = {c: t for c, t in dtypes.items() if c in columns}
+    return pd.read_csv(path, usecols=columns, dtype=dtypes or None)
+
+
+def _write_csv(df, path):
+    df.to_csv(path, index=False)
+
+
+class _CsvAppender(TableAppender):
+    def __init__(self, path):
+        self.path = path
+        self._columns = None
+
+    def write(self, df):
+        if self._columns is None:
+            self._columns = list(df.columns)
+            df.to_csv(self.path, index=False)
+        else:
+            df[self._columns].to_csv(self.path, mode="a", header=False, index=False)
+
+    def close(self):
+        if self._columns is None:
+            Path(self.path).write_text("")
+
+
+class _ArrowAppender(TableAppender):
+    """
+    Parquet / Feather (Arrow IPC file) appender. Later chunks are cast to
+    the first chunk's schema, so a count column that picks up a NaN in a
+    later chunk is stored as a nullable integer rather than failing.
+
+    A column a later chunk can't be cast into is widened instead: to
+    float64 for numbers (an int column meeting 2.5), to string otherwise
+    (typically a sparse text column that was all empty, hence inferred as
+    double, in the first chunk). The chunks written so far are copied once
+    into a file with the widened schema and writing carries on.
+    """
+
+    def __init__(self, path, open_writer, read_batches):
+        self.path = Path(path)
+        self._open_writer = open_writer
+        self._read_batches = read_batches
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = self._open_writer(self.path, table.schema)
+        else:
+            table = self._conform(df)
+        self._writer.write_table(table)
+
+    def _conform(self, df):
+        """df as a table of the current schema, widening the schema first if it must."""
+        import pyarrow as pa
+
+        try:
+            return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        columns, widened = [], {}
+        for field in self._schema:
+            values = pa.array(df[field.name], from_pandas=True)
+            try:
+                columns.append(values.cast(field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                wider = pa.float64() if _is_number(field.type) and _is_number(values.type) else pa.string()
+                columns.append(values.cast(wider))
+                widened[field.name] = wider
+        if widened:
+            print(f"[WAREHOUSE] Widening {', '.join(f'{c} to {t}' for c, t in widened.items())}")
+            self._widen(widened)
+        return pa.Table.from_arrays(columns, schema=self._schema)
+
+    def _widen(self, types: dict):
+        import pyarrow as pa
+
+        schema = self._schema
+        for name, wider in types.items():
+            schema = schema.set(schema.get_field_index(name), pa.field(name, wider))
+        # The pandas metadata still records the old dtypes; let readers infer them.
+        schema = schema.remove_metadata()
+
+        self._writer.close()
+        narrow = self.path.with_name(self.path.name + ".narrow")
+        os.replace(self.path, narrow)
+        try:
+            self._writer = self._open_writer(self.path, schema)
+            for batch in self._read_batches(narrow):
+                self._writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+        finally:
+            narrow.unlink()
+        self._schema = schema
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _is_number(arrow_type) -> bool:
+    import pyarrow.types as pat
+
+    return pat.is_integer(arrow_type) or pat.is_floating(arrow_type)
+
+
+def _parquet_appender(path):
+    import pyarrow.parquet as pq
+
+    return _ArrowAppender(path, pq.ParquetWriter, lambda p: pq.ParquetFile(p).iter_batches())
+
+
+def _feather_batches(path):
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def _feather_appender(path):
+    import pyarrow as pa
+
+    return _ArrowAppender(path, pa.ipc.new_file, _feather_batches)
+
+
+# Registry of supported formats. New backends plug in via register_format.
+FORMATS: dict[str, TableFormat] = {
+    "parquet": TableFormat(".parquet", _read_parquet, _write_parquet, _parquet_appender),
+    "feather": TableFormat(".feather", _read_feather, _write_feather, _feather_appender),
+    "csv": TableFormat(".csv", _read_csv, _write_csv, _CsvAppender),
+}
+
+DEFAULT_FORMAT = os.getenv("WAREHOUSE_FORMAT", "parquet")
+
+
+SCHEMA_SUFFIX = ".schema.json"
+
+# Dtypes a sidecar schema may hand back to pd.read_csv. Anything else
+# (datetimes, intervals, ...) is left to normal inference.
+_SIDECAR_DTYPES = re.compile(r"^(category|object|str|string|bool|boolean|u?int\d+|U?Int\d+|[fF]loat\d+)$")
+
+
+def schema_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.stem + SCHEMA_SUFFIX)
+
+
+@contextmanager
+def _atomic_path(path: Path):
+    """
+    Yield a temporary path next to path to write to; it is moved over path
+    only once the block completes, so readers (and a crashed run's
+    successor) never see a half-written file.
+    """
+    tmp = path.with_name(path.name + ".partial")
+    try:
+        yield tmp
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+
+
+def write_json(path, data, sort_keys: bool = True) -> Path:
+    """
+    Write data as indented JSON to path, atomically (see _atomic_path):
+    manifests, metadata sidecars and indexes are read by other processes
+    while they are being replaced. Values JSON can't encode are written
+    as str().
+    """
+    path = Path(path)
+    with _atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=sort_keys, default=str)
+    return path
+
+
+def write_schema(df: pd.DataFrame, path) -> Path:
+    """Record df's column dtypes next to the table at path."""
+    dtypes = {str(col): str(dtype) for col, dtype in df.dtypes.items()}
+    return write_json(schema_path(path), {"columns": dtypes}, sort_keys=False)
+
+
+def read_schema(path) -> dict | None:
+    """{column: dtype} from the sidecar schema of the table at path, if any."""
+    try:
+        with open(schema_path(path), encoding="utf-8") as fh:
+            dtypes = json.load(fh).get("columns", {})
+    except FileNotFoundError:
+        return None
+    return {
+        col: dtype for col, dtype in dtypes.items()
+        if _SIDECAR_DTYPES.match(dtype)
+    }
+
+
+def register_format(name: str, extension: str, reader, writer, appender=None):
+    """Add (or replace) a storage backend."""
+    FORMATS[name] = TableFormat(extension, reader, writer, appender)
+
+
+def _format_for(fmt: str | None) -> TableFormat:
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown warehouse format: {fmt} (expected one of {sorted(FORMATS)})")
+    return FORMATS[fmt]
+
+
+def _format_for_path(path) -> TableFormat:
+    ext = Path(path).suffix.lower()
+    for table_format in FORMATS.values():
+        if table_format.extension == ext:
+            return table_format
+    raise ValueError(f"Unsupported warehouse file type: {ext}")
+
+
+def is_table_file(path) -> bool:
+    ext = Path(path).suffix.lower()
+    return any(f.extension == ext for f in FORMATS.values())
+
+
+def table_path(folder, name: str, fmt: str | None = None) -> Path:
+    return Path(folder) / f"{name}{_format_for(fmt).extension}"
+
+
+def write_table(df: pd.DataFrame, folder, name: str, fmt: str | None = None,
+                schema: bool = False) -> Path:
+    """
+    Write df to folder/<name>.<ext> in the given (or default) format.
+    schema=True also writes folder/<name>.schema.json with df's dtypes,
+    which read_table uses for formats that don't store types (CSV).
+    The file is written under a temporary name and moved into place, so
+    an interrupted write leaves the previous version intact.
+    Returns the path written.
+    """
+    path = table_path(folder, name, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _atomic_path(path) as tmp:
+        _format_for(fmt).writer(df, tmp)
+    if schema:
+        write_schema(df, path)
+    else:
+        # A sidecar left by an earlier write would now describe the wrong table.
+        schema_path(path).unlink(missing_ok=True)
+    return path
+
+
+@contextmanager
+def open_table_writer(folder, name: str, fmt: str | None = None):
+    """
+    Incremental counterpart of write_table, for tables too large to build
+    in memory:
+
+        with open_table_writer(out, "awc_level") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+
+    The file only appears under its final name once every chunk has been
+    written, so readers never see a half-written table.
+    """
+    table_format = _format_for(fmt)
+    if table_format.appender is None:
+        raise ValueError(f"Warehouse format {fmt or DEFAULT_FORMAT} does not support incremental writes")
+
+    path = table_path(folder, name, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    schema_path(path).unlink(missing_ok=True)
+    with _atomic_path(path) as tmp:
+        appender = table_format.appender(tmp)
+        try:
+            yield appender
+        finally:
+            appender.close()
+
+
+def read_table(path, columns: list | None = None) -> pd.DataFrame:
+    """
+    Read a warehouse table, picking the backend from the file extension.
+    columns projects the read down to just those columns.
+    """
+    return _format_for_path(path).reader(path, columns=columns)
+
+
+def _preference(path: Path) -> int:
+    # Columnar formats first: if a table exists in several formats (e.g. an
+    # old CSV export next to the current Parquet), read the cheaper one.
+    ext = path.suffix.lower()
+    for rank, table_format in enumerate(FORMATS.values()):
+        if table_format.extension == ext:
+            return rank
+    return len(FORMATS)
+
+
+def list_tables(folder, extra_extensions: tuple = ()) -> dict:
+    """
+    Return {"name_without_ext": path} for every table in folder, sorted by
+    name. When one name exists in several formats, the columnar one wins.
+    extra_extensions admits non-warehouse source files (e.g. ".xlsx").
+    """
+    found: dict[str, Path] = {}
+    for path in sorted(Path(folder).iterdir()):
+        if not (is_table_file(path) or path.suffix.lower() in extra_extensions):
+            continue
+        current = found.get(path.stem)
+        if current is None or _preference(path) < _preference(current):
+            found[path.stem] = path
+    return found
+
+
+def latest_table(folder, prefix: str) -> Path | None:
+    """
+    Newest table in folder whose name starts with prefix, by name
+    (month/timestamp tags sort lexicographically). None if there is none.
+    """
+    candidates = [Path(p) for p in Path(folder).glob(f"{prefix}*")]
+    candidates = [p for p in candidates if is_table_file(p)]
+    if not candidates:
+        return None
+    latest_stem = max(p.stem for p in candidates)
+    return min((p for p in candidates if p.stem == latest_stem), key=_preference)